@@ -1,126 +1,145 @@
 # main.py
-import pandas as pd
 import os
-import sys
-import io
-
-from src.valid_voc_data import (
-    load_voc_code_mappings,
-    validate_voc_data,
-    validate_voc_type_only,
-    filter_valid_voc_rows
-)
-from src.config.config import (
-    VOC_TYPE_FILE_PATH, VOC_RECV_TYPE_FILE_PATH, VOC_SERVICE_FILE_PATH, VOC_DATA_FILE_PATH
-)
-from src.insert_voc import set_qry_params 
+import argparse
+import functools
+
+from src.config.config import VOC_DATA_FILE_PATH, DAEMON_MAX_CONCURRENT_FILES, DAEMON_DB_POOL_MAX
+from src.run_summary import RunSummary
+from src.resilience import add_resilience_stats
+from src.ai.model_tiers import add_tier_stats, print_tier_stats
+from src.ai.inference_scheduler import PendingInferenceQueue
+from src.voc_pipeline import load_resources, load_voc_file, process_voc_dataframe, is_voc_file
+from src.voc_daemon import VocDaemon
+from src.stream_pipeline import process_voc_dataframe_streaming
+from src.profiler import StageProfiler, NullProfiler
 
 from src.db.repository import Repository 
-from src.ai.gemini_api import infer_voc_type_with_gemini 
 from src.auth import AuthService 
 from src.session_manager import SessionManager 
-from src.insert_voc import send_voc_data_to_api
 
-def main():
+def parse_args(argv=None):
+    parser = argparse.ArgumentParser(description="VOC 자동 등록 프로그램")
+    parser.add_argument("csv_path", nargs="?", help="처리할 VOC 파일 경로 - CSV 또는 Excel(.xlsx/.xls) (생략 시 VOC_DATA_FILE_PATH 폴더에서 탐색)")
+    parser.add_argument("--workers", type=int, default=1,
+                        help="검증~폼 생성 단계를 나누어 실행할 프로세스 수 (기본 1: 단일 프로세스, 0: CPU 코어 수)")
+    parser.add_argument("--watch", action="store_true",
+                        help="데몬 모드: VOC_DATA_FILE_PATH 폴더를 감시하며 새 파일을 계속 처리 (Ctrl+C로 종료)")
+    parser.add_argument("--max-files", type=int, default=DAEMON_MAX_CONCURRENT_FILES,
+                        help="데몬 모드에서 동시에 처리할 최대 파일 수")
+    parser.add_argument("--stream", action="store_true",
+                        help="스트림 모드: 유형 추론/폼 생성/전송 단계를 큐로 연결해 동시에 실행 (VOC유형이 없는 행은 Gemini로 추론)")
+    parser.add_argument("--profile", action="store_true",
+                        help="단계별 CPU 프로파일(.prof)과 메모리 할당 리포트를 PROFILE_DIR에 저장 "
+                             "(--stream의 동시 단계 CPU 프로파일은 Python 3.12 이상에서 하나의 stream.prof로 저장)")
+    return parser.parse_args(argv)
+
+def main(args=None):
+    args = args or parse_args()
+    run_summary = RunSummary()
+
     # SessionManager 인스턴스 가져오기 (싱글톤)
     session_manager = SessionManager()
     
     # 이 애플리케이션의 주 세션 생성
     main_session = session_manager.create_session()
     auth_service = AuthService(main_session) # 인증서비스 인스턴스 생성
-    AuthService.authenticate(auth_service) # 인증 시도
-
-    # 📋 인사 정보 조회: DatabaseRepository 클래스의 인스턴스를 생성하여 사용
-    db_repo = Repository() # 클래스의 인스턴스 생성
-    insa_info_map = db_repo.get_insa_info() # 인스턴스의 메서드 호출
-    if not insa_info_map:
-        print("❌ 인사 정보를 불러오지 못했습니다. 프로그램을 종료합니다.")
+    # 인증 시도: 승인되지 않은 사용자면 인사 정보/파일 로딩 전에 종료
+    if not auth_service.authenticate():
+        print("❌ 승인되지 않은 사용자입니다. 프로그램을 종료합니다.")
+        session_manager.close_all_sessions()
         return
 
-    # 📁 파일 경로 설정
-    voc_type_file_path = VOC_TYPE_FILE_PATH
-    voc_recv_type_file_path = VOC_RECV_TYPE_FILE_PATH
-    voc_service_file_path = VOC_SERVICE_FILE_PATH
-    voc_data_dir = VOC_DATA_FILE_PATH
-
-    # ✅ 필수 필드 정의
-    required_fields = [
-        '제기자', '접수유형', '소분류',
-        '요청일시/등록일시', '완료일시', '작업시간', 'VOC내용'
-    ]
+    # 데몬 모드는 여러 파일을 동시에 처리하므로 DB 연결 풀을 사용
+    if args.watch:
+        Repository.init_pool(1, DAEMON_DB_POOL_MAX)
 
-    # 🔄 코드 매핑 로딩
-    try:
-        voc_type_map, voc_recv_map, voc_service_map = load_voc_code_mappings(
-            voc_type_file_path,
-            voc_recv_type_file_path,
-            voc_service_file_path
-        )
-    except Exception as e:
-        print(f"❌ 코드 매핑 로딩 실패, 프로그램을 종료합니다.: {e}")
+    # 📋 인사 정보 조회 및 🔄 코드 매핑 로딩 (데몬 모드에서는 한 번만 불러와 계속 재사용)
+    db_repo = Repository() # 클래스의 인스턴스 생성
+    resources = load_resources(db_repo)
+    if resources is None:
+        print("❌ 실행에 필요한 자료를 불러오지 못했습니다. 프로그램을 종료합니다.")
+        session_manager.close_all_sessions()
+        Repository.close_pool()
         return
 
-    # 📄 VOC CSV 파일 탐색 및 로딩 (수정: 명령줄 인수 또는 표준 입력 지원)
-    if len(sys.argv) > 1:
-        # 명령줄 인수로 CSV 파일 경로 받기
-        voc_data_file_path = sys.argv[1]
-        try:
-            df_voc = pd.read_csv(voc_data_file_path)
-        except Exception as e:
-            print(f"❌ CSV 파일 로딩 실패: {e}")
-            return
-    else:
-        # 기존 레거시 방식 (로컬 디렉토리에서 csv파일 불러오기)
-        try:
-            csv_files = [f for f in os.listdir(voc_data_dir) if f.lower().endswith('.csv')]
-
-            if len(csv_files) == 0:
-                print(f"❌ '{voc_data_dir}' 디렉토리에 CSV 파일이 없습니다. 프로그램을 종료합니다.")
-                exit()
-            elif len(csv_files) > 1:
-                print(f"❌ '{voc_data_dir}' 디렉토리에 CSV 파일이 2개 이상 존재합니다. 하나만 존재해야 합니다. 프로그램을 종료합니다.")
-                exit()
+    if args.watch:
+        if args.profile:
+            print("⚠️ 데몬 모드에서는 --profile을 지원하지 않습니다. 프로파일 없이 실행합니다.")
+        # 👀 데몬 모드: 폴더를 감시하며 들어오는 파일을 처리 (완료 파일은 archive, 실패 파일은 failed 폴더로 이동)
+        daemon = VocDaemon(VOC_DATA_FILE_PATH, resources, db_repo, max_concurrent=args.max_files,
+                           workers=args.workers, stream=args.stream)
+        daemon.run()
+        session_manager.close_all_sessions()
+        Repository.close_pool()
+        return
 
-            voc_data_file_path = os.path.join(voc_data_dir, csv_files[0])
-            df_voc = pd.read_csv(voc_data_file_path)
+    # 로그인은 처음 필요할 때 한 번만 수행 (대기열 처리와 파일 처리가 같은 세션 사용)
+    active_session = functools.cache(auth_service.login_and_fetch_voc_page)
 
+    # 🗓️ 이전 실행에서 Gemini 할당량 부족으로 미룬 행이 있고 할당량이 생겼으면 먼저 처리 (유형 추론이 필요하므로 스트림 처리)
+    pending_queue = PendingInferenceQueue()
+    df_pending = pending_queue.take()
+    if df_pending is not None:
+        print(f"\n🗓️ 추론 대기열('{pending_queue.path}')의 {len(df_pending)}건을 먼저 처리합니다.")
+        try:
+            process_voc_dataframe_streaming(df_pending, resources, db_repo, run_summary, active_session, workers=args.workers)
         except Exception as e:
-            print(f"❌ VOC 데이터 파일 로딩 실패, 프로그램을 종료합니다.: {e}")
-            exit()
-
-    # 🔍 데이터 검증
-    invalid_indexes = validate_voc_data(df_voc, required_fields, voc_recv_map, voc_service_map, voc_type_map, insa_info_map)
-
-    # ❗ 유효하지 않은 행 출력
-    if invalid_indexes:
-        print("\n❗ 제외된 유효하지 않은 행들:")
-        invalid_rows = df_voc.loc[list(invalid_indexes)].copy()
-        invalid_rows.index = invalid_rows.index + 2
-        print(invalid_rows)
-    else:
-        print("\n✅ 모든 VOC 행이 유효합니다.")
+            print(f"❌ 추론 대기열 처리 실패, 대기열에 다시 저장합니다: {e}")
+            pending_queue.release()
+        else:
+            pending_queue.complete()
 
-    # ✅ 유효한 행만 남기기
-    df_voc = filter_valid_voc_rows(df_voc, invalid_indexes)
-
-    # 🔍 VOC유형 추론 (Gemini API 사용, 필요시 주석 해제)
-    # df_voc = infer_voc_type_with_gemini(df_voc, voc_type_map)
-
-    # ❗ VOC유형만 검증 (추론 이후 VOC 유형 코드가 유효한지 확인)
-    invalid_voc_type_indexes = validate_voc_type_only(df_voc, voc_type_map)
-    df_voc = filter_valid_voc_rows(df_voc, invalid_voc_type_indexes)
+    voc_data_dir = VOC_DATA_FILE_PATH
+    # ⏱️ 프로파일 모드: 단계별 cProfile/tracemalloc 기록 (메모리 추적 부하가 있으므로 필요할 때만 사용)
+    profiler = StageProfiler() if args.profile else NullProfiler()
 
-    # 📊 API 전송을 위한 폼 데이터 추출
-    voc_form_data_list = set_qry_params(df_voc, voc_type_map, voc_recv_map, voc_service_map, insa_info_map)
-    print(f"\n✅ 입력 준비 완료된 VOC 목록: {len(voc_form_data_list)}건")
+    try:
+        # 📄 VOC 파일(CSV/Excel) 탐색 및 로딩 (수정: 명령줄 인수 또는 표준 입력 지원)
+        if args.csv_path:
+            # 명령줄 인수로 VOC 파일 경로 받기
+            voc_data_file_path = args.csv_path
+            try:
+                with profiler.stage("loading"):
+                    df_voc = load_voc_file(voc_data_file_path)
+            except Exception as e:
+                print(f"❌ VOC 파일 로딩 실패: {e}")
+                return
+        else:
+            # 기존 레거시 방식 (로컬 디렉토리에서 csv파일 불러오기)
+            try:
+                csv_files = [f for f in os.listdir(voc_data_dir) if is_voc_file(f)]
+
+                if len(csv_files) == 0:
+                    print(f"❌ '{voc_data_dir}' 디렉토리에 VOC 파일(CSV/Excel)이 없습니다. 프로그램을 종료합니다.")
+                    exit()
+                elif len(csv_files) > 1:
+                    print(f"❌ '{voc_data_dir}' 디렉토리에 VOC 파일(CSV/Excel)이 2개 이상 존재합니다. 하나만 존재해야 합니다. 프로그램을 종료합니다.")
+                    exit()
+
+                voc_data_file_path = os.path.join(voc_data_dir, csv_files[0])
+                with profiler.stage("loading"):
+                    df_voc = load_voc_file(voc_data_file_path)
+
+            except Exception as e:
+                print(f"❌ VOC 데이터 파일 로딩 실패, 프로그램을 종료합니다.: {e}")
+                exit()
 
-    # 웹 로그인 및 VOC 페이지 요청 (AuthService 인스턴스 생성 및 사용)
-    successful_session = auth_service.login_and_fetch_voc_page() 
-    # input("계속하려면 Enter를 누르세요...")
-    send_voc_data_to_api(voc_form_data_list, successful_session)
+        # 검증 -> 중복 검사 -> 유형 검증 -> 폼 생성 -> 웹 로그인 및 VOC 페이지 요청 -> 전송
+        process = process_voc_dataframe_streaming if args.stream else process_voc_dataframe
+        process(
+            df_voc, resources, db_repo, run_summary,
+            active_session, workers=args.workers, profiler=profiler
+        )
+    finally:
+        # 파일 로딩 실패로 일찍 끝나도 요약을 저장하고 메모리 추적을 종료
+        profiler.close()
 
     session_manager.close_all_sessions()
+    add_resilience_stats(run_summary)
+    add_tier_stats(run_summary)
+    print_tier_stats()
+    run_summary.print_summary()
 
 
 if __name__ == "__main__":
-    main()
\ No newline at end of file
+    main()
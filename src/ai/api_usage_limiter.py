@@ -1,26 +1,93 @@
+import datetime
+import json
+import os
+import threading
 import time
+from zoneinfo import ZoneInfo, ZoneInfoNotFoundError
 
 from src.config.config import (
-    USE_FREE_TIER, MAX_RPM, MAX_RPD ,MAX_TPM
+    USE_FREE_TIER, MAX_RPM, MAX_RPD ,MAX_TPM, GEMINI_QUOTA_STATE_PATH, GEMINI_QUOTA_RESET_TZ
 )
 
+
+class RateLimitExceeded(RuntimeError):
+    """프리티어 RPM/RPD/TPM 제한 초과 (회로 차단 등 다른 RuntimeError와 구분하여 다음 구간까지 기다릴 때 사용)"""
+
+
 _request_count_minute = 0
 _request_count_day = 0
 _token_count_minute = 0
-_last_minute = time.localtime().tm_min
-_last_day = time.localtime().tm_yday
+_last_minute = None # 'YYYY-MM-DD HH:MM'
+_last_day = None    # 'YYYY-MM-DD' (GEMINI_QUOTA_RESET_TZ 기준 날짜)
+_lock = threading.Lock() # 데몬 모드에서 여러 파일을 동시에 처리할 때 카운터 보호
 
-def rate_limit_guard(tokens_used=0):
+
+def _load_reset_tz():
+    """일일 사용량(RPD)이 초기화되는 시간대. 찾을 수 없으면 None (로컬 시간 기준)"""
+    try:
+        return ZoneInfo(GEMINI_QUOTA_RESET_TZ)
+    except (ZoneInfoNotFoundError, ValueError) as e:
+        print(f"경고: GEMINI_QUOTA_RESET_TZ '{GEMINI_QUOTA_RESET_TZ}' 시간대를 찾을 수 없어 로컬 시간 0시를 기준으로 "
+              f"일일 사용량을 초기화합니다. (Windows는 tzdata 패키지 필요) {e}")
+        return None
+
+
+_RESET_TZ = _load_reset_tz()
+
+
+def _quota_now() -> datetime.datetime:
+    """일일 사용량 초기화 시간대 기준의 현재 시각"""
+    return datetime.datetime.now(_RESET_TZ)
+
+
+def next_quota_reset() -> float:
+    """다음 일일 사용량(RPD) 초기화 시각(epoch 초). Gemini 일일 할당량은 태평양 시간 0시에 초기화됩니다."""
+    now = _quota_now()
+    next_day = datetime.datetime.combine(now.date() + datetime.timedelta(days=1), datetime.time(), tzinfo=now.tzinfo)
+    return next_day.timestamp()
+
+
+def _load_state():
+    """이전 실행의 사용량 카운터를 불러옵니다. (같은 분/같은 날이면 이어서 계산)"""
     global _request_count_minute, _request_count_day, _token_count_minute
     global _last_minute, _last_day
-
-    if not USE_FREE_TIER:
+    if not os.path.exists(GEMINI_QUOTA_STATE_PATH):
         return
+    try:
+        with open(GEMINI_QUOTA_STATE_PATH, "r", encoding="utf-8") as f:
+            state = json.load(f)
+        _last_minute = state.get("minute")
+        _last_day = state.get("day")
+        _request_count_minute = int(state.get("requests_minute", 0))
+        _token_count_minute = int(state.get("tokens_minute", 0))
+        _request_count_day = int(state.get("requests_day", 0))
+    except (OSError, ValueError) as e:
+        print(f"경고: Gemini 사용량 상태를 읽지 못했습니다: {e}")
 
-    now = time.localtime()
-    minute = now.tm_min
-    day = now.tm_yday
 
+def _save_state():
+    """사용량 카운터를 저장합니다. 프로그램을 다시 실행해도 일일 사용량(RPD)이 이어집니다."""
+    state = {
+        "minute": _last_minute, "requests_minute": _request_count_minute, "tokens_minute": _token_count_minute,
+        "day": _last_day, "requests_day": _request_count_day,
+    }
+    try:
+        os.makedirs(os.path.dirname(GEMINI_QUOTA_STATE_PATH) or ".", exist_ok=True)
+        tmp_path = f"{GEMINI_QUOTA_STATE_PATH}.tmp"
+        with open(tmp_path, "w", encoding="utf-8") as f:
+            json.dump(state, f)
+        os.replace(tmp_path, GEMINI_QUOTA_STATE_PATH)
+    except OSError as e:
+        print(f"경고: Gemini 사용량 상태 저장 실패: {e}")
+
+
+def _roll_windows():
+    """분/일 구간이 바뀌었으면 해당 카운터를 초기화합니다. (일 구간은 GEMINI_QUOTA_RESET_TZ 기준 날짜)"""
+    global _request_count_minute, _request_count_day, _token_count_minute
+    global _last_minute, _last_day
+
+    minute = time.strftime("%Y-%m-%d %H:%M", time.localtime())
+    day = _quota_now().strftime("%Y-%m-%d")
     if minute != _last_minute:
         _last_minute = minute
         _request_count_minute = 0
@@ -29,13 +96,75 @@ def rate_limit_guard(tokens_used=0):
         _last_day = day
         _request_count_day = 0
 
+
+if USE_FREE_TIER:
+    _load_state()
+
+
+def rate_limit_guard(tokens_used=0):
+    if not USE_FREE_TIER:
+        return
+
+    with _lock:
+        _check_and_count(tokens_used)
+
+def try_rate_limit(tokens_used=0) -> bool:
+    """
+    rate_limit_guard와 같지만 제한에 걸리면 예외 대신 False를 반환합니다.
+    필수가 아닌 추가 호출(헤지 요청 등)을 사용량 여유가 있을 때만 보낼 때 사용합니다.
+    """
+    try:
+        rate_limit_guard(tokens_used)
+        return True
+    except RuntimeError:
+        return False
+
+def _check_and_count(tokens_used):
+    global _request_count_minute, _request_count_day, _token_count_minute
+
+    _roll_windows()
+
     if _request_count_minute >= MAX_RPM:
-        raise RuntimeError("❌ 프리티어 RPM(분당 요청) 초과")
+        raise RateLimitExceeded("❌ 프리티어 RPM(분당 요청) 초과")
     if _request_count_day >= MAX_RPD:
-        raise RuntimeError("❌ 프리티어 RPD(일일 요청) 초과")
+        raise RateLimitExceeded("❌ 프리티어 RPD(일일 요청) 초과")
     if _token_count_minute + tokens_used > MAX_TPM:
-        raise RuntimeError("❌ 프리티어 TPM(분당 토큰 수) 초과")
+        raise RateLimitExceeded("❌ 프리티어 TPM(분당 토큰 수) 초과")
 
     _request_count_minute += 1
     _request_count_day += 1
-    _token_count_minute += tokens_used
\ No newline at end of file
+    _token_count_minute += tokens_used
+    _save_state()
+
+def remaining_budget() -> dict:
+    """
+    현재 분/일 구간에 남은 사용량. 프리티어 제한을 쓰지 않으면 None 값으로 반환합니다.
+
+    Returns:
+        dict: {'rpm': 남은 분당 요청, 'tpm': 남은 분당 토큰, 'rpd': 남은 일일 요청}
+    """
+    if not USE_FREE_TIER:
+        return {"rpm": None, "tpm": None, "rpd": None}
+    with _lock:
+        _roll_windows()
+        return {
+            "rpm": max(MAX_RPM - _request_count_minute, 0),
+            "tpm": max(MAX_TPM - _token_count_minute, 0),
+            "rpd": max(MAX_RPD - _request_count_day, 0),
+        }
+
+def seconds_until_budget(tokens_used=0) -> float:
+    """
+    tokens_used 토큰을 쓰는 요청 하나를 보낼 수 있을 때까지 남은 시간(초). 지금 보낼 수 있으면 0.
+    일일 요청(RPD)을 다 쓴 경우 다음 초기화 시각(GEMINI_QUOTA_RESET_TZ 0시)까지, 분당 제한에 걸린 경우 다음 분까지의 시간입니다.
+    """
+    if not USE_FREE_TIER:
+        return 0.0
+    with _lock:
+        _roll_windows()
+        seconds_into_minute = time.time() % 60
+        if _request_count_day >= MAX_RPD:
+            return max(next_quota_reset() - time.time(), 0.0)
+        if _request_count_minute >= MAX_RPM or _token_count_minute + tokens_used > MAX_TPM:
+            return 60 - seconds_into_minute
+        return 0.0
@@ -1,84 +1,445 @@
 # gemini_api.py
 import google.generativeai as genai
-import time
-import os
+import json
 import pandas as pd
 import src.ai.prompt_builder as prompt_builder
-from src.ai.api_usage_limiter import rate_limit_guard
-
-REASON_LOG_PATH = "log/"
+from src.resilience import get_caller
+from src.ai.voc_clustering import cluster_near_duplicates
+from src.ai.model_tiers import generate_with_hedge, resolve_tiers, tier_stats
+from src.ai.inference_log import InferenceAuditLog, prediction_key, lookup_predictions
+from src.ai.inference_scheduler import order_by_request_date, print_inference_plan, wait_for_quota, defer_rows, pace_call
+from src.date_parser import format_datetime_column
+from src.dedup_voc import excel_row_numbers
 
 # config.py에서 필요한 전역 변수들 임포트
 from src.config.config import (
     GEMINI_MODEL, # GEMINI_MODEL은 여기서 사용하지만, config에서 초기화만 할 것
+    GEMINI_MIN_CONFIDENCE, GEMINI_RETRY_BATCH_SIZE,
+    GEMINI_CLUSTER_ENABLED, GEMINI_CLUSTER_THRESHOLD, GEMINI_REUSE_PREDICTIONS
 )
 
-def infer_voc_type_with_gemini(df_voc, voc_type_map, ):
+def _voc_type_schema(valid_types):
+    """단건 응답 스키마: VOC 유형은 voc_type_map의 키 중 하나로 제한"""
+    return {
+        "type": "OBJECT",
+        "properties": {
+            "voc_type": {"type": "STRING", "format": "enum", "enum": list(valid_types)},
+            "confidence": {"type": "NUMBER"},
+            "reason": {"type": "STRING"},
+        },
+        "required": ["voc_type", "confidence", "reason"],
+    }
+
+def _voc_type_list_schema(valid_types):
+    """재시도(다건) 응답 스키마"""
+    item = _voc_type_schema(valid_types)
+    item["properties"]["row_id"] = {"type": "INTEGER"}
+    item["required"] = ["row_id"] + item["required"]
+    return {"type": "ARRAY", "items": item}
+
+def _generate_json(prompt, schema, model=None):
+    """
+    사용량 제한 확인 후 JSON 스키마가 지정된 Gemini 호출을 수행하고 응답 텍스트를 반환합니다.
+    분당 제한에 걸리면 호출마다 다음 구간까지 기다립니다. (wait_for_quota, GEMINI_SCHEDULER_MAX_WAIT 이내)
+    일시 오류(429/5xx, 시간 초과)는 공용 재시도 호출기로 재시도하며, 재시도도 사용량에 포함됩니다.
+    응답이 늦으면 사용량 여유 안에서 헤지 요청을 함께 보냅니다. (generate_with_hedge)
+    model을 지정하지 않으면 config의 GEMINI_MODEL을 사용합니다. (부하 테스트용 가짜 모델 등)
+    """
+    model = model or GEMINI_MODEL
+    token_estimate = len(prompt) // 2 # 대략적인 토큰 수 계산 (보수적 추정)
+    generation_config = genai.GenerationConfig(
+        response_mime_type="application/json",
+        response_schema=schema,
+    )
+
+    def attempt():
+        wait_for_quota(tokens_used=token_estimate)
+        return generate_with_hedge(model, prompt, generation_config, token_estimate)
+
+    response = get_caller('gemini').call(attempt)
+    return response.text.strip()
+
+def _parse_prediction(item, valid_types):
+    """
+    JSON 응답 항목에서 (유형, 확신도, 이유)를 추출합니다.
+    유형이 목록에 정확히 일치하지 않으면 유형은 None입니다.
+    """
+    if not isinstance(item, dict):
+        return None, 0.0, ''
+    voc_type = str(item.get('voc_type', '')).strip()
+    try:
+        confidence = min(max(float(item.get('confidence', 0)), 0.0), 1.0)
+    except (TypeError, ValueError):
+        confidence = 0.0
+    reason = str(item.get('reason', '')).strip()
+    return (voc_type if voc_type in valid_types else None), confidence, reason
+
+def parse_voc_type_response(text, valid_types):
+    """
+    단건 JSON 응답을 해석합니다.
+
+    Returns:
+        tuple: (유형 또는 None, 확신도, 이유). JSON이 아니면 (None, 0.0, '')
+    """
+    try:
+        return _parse_prediction(json.loads(text), valid_types)
+    except (json.JSONDecodeError, TypeError):
+        return None, 0.0, ''
+
+def classify_voc_type(voc_content, voc_action, valid_types, model=None):
+    """
+    VOC 한 건을 분류합니다. 기다릴 수 없는 호출 제한(RateLimitExceeded), 회로 차단(RuntimeError)과 호출 오류는 호출자에게 그대로 전달됩니다.
+    모델 단계(GEMINI_MODEL_TIERS)의 가벼운 모델부터 호출하고, 확신도가 GEMINI_MIN_CONFIDENCE 미만이거나
+    응답을 해석할 수 없으면 다음 모델로 다시 분류합니다. model에 모델 목록을 주면 그 순서를 단계로 사용합니다.
+
+    Returns:
+        tuple: (유형 또는 None, 확신도, 이유, 응답 텍스트) - 마지막으로 호출한 모델의 결과
+    """
+    prompt = prompt_builder.build_voc_type_prompt(voc_content, voc_action, valid_types)
+    schema = _voc_type_schema(valid_types)
+    tiers = resolve_tiers(model)
+    for level, tier_model in enumerate(tiers):
+        text = _generate_json(prompt, schema, tier_model)
+        predicted_type, confidence, reason = parse_voc_type_response(text, valid_types)
+        if (predicted_type and confidence >= GEMINI_MIN_CONFIDENCE) or level == len(tiers) - 1:
+            return predicted_type, confidence, reason, text
+        tier_stats(tier_model).record_escalation()
+
+def classify_voc_type_batch(batch, valid_types, model=None) -> dict:
+    """
+    여러 건을 한 번의 호출로 재분류합니다. 모델 단계 중 마지막(가장 강한) 모델을 사용합니다.
+
+    Args:
+        batch (list): (row_id, VOC내용, 조치계획) 목록
+
+    Returns:
+        dict: row_id -> (유형 또는 None, 확신도, 이유). 응답에 없거나 batch에 없는 row_id는 제외
+    """
+    prompt = prompt_builder.build_voc_type_retry_prompt(batch, valid_types)
+    batch_idx = {idx for idx, _, _ in batch}
+    # 재시도 대상은 확신도가 낮았던 행이므로 가장 강한(마지막 단계) 모델로 분류
+    text = _generate_json(prompt, _voc_type_list_schema(valid_types), resolve_tiers(model)[-1])
+    try:
+        items = json.loads(text)
+    except json.JSONDecodeError:
+        items = []
+    results = {}
+    for item in items if isinstance(items, list) else []:
+        try:
+            row_id = int(item.get('row_id'))
+        except (AttributeError, TypeError, ValueError):
+            continue
+        if row_id not in batch_idx or row_id in results:
+            continue
+        results[row_id] = _parse_prediction(item, valid_types)
+    return results
+
+def _cell_text(row, column) -> str:
+    value = row.get(column, "")
+    return "" if pd.isna(value) else str(value).strip()
+
+def row_prediction_keys(df) -> dict:
+    """행 인덱스 -> 예측 색인용 행 해시 (VOC내용 + 조치계획)"""
+    return {
+        idx: prediction_key(_cell_text(row, 'VOC내용'), _cell_text(row, '조치계획 및 진행상황'))
+        for idx, row in df.iterrows()
+    }
+
+def row_request_dates(df) -> dict:
+    """행 인덱스 -> 요청일(YYYY-MM-DD, 해석할 수 없으면 빈 문자열). 예측 색인의 날짜 기준"""
+    if '요청일시/등록일시' not in df.columns:
+        return {}
+    return format_datetime_column(df['요청일시/등록일시'], '%Y-%m-%d').to_dict()
+
+def reusable_predictions(keys: dict, valid_types) -> dict:
+    """
+    색인에 있는 이전 예측 중 현재 유형 목록에 있고 확신도가 GEMINI_MIN_CONFIDENCE 이상인 것을 찾습니다.
+
+    Args:
+        keys (dict): 행 인덱스 -> 행 해시
+
+    Returns:
+        dict: 행 인덱스 -> (유형, 확신도, 이유)
+    """
+    if not GEMINI_REUSE_PREDICTIONS or not keys:
+        return {}
+    found = lookup_predictions(keys.values())
+    reusable = {}
+    for idx, key in keys.items():
+        hit = found.get(key)
+        if hit and hit[0] in valid_types and hit[1] >= GEMINI_MIN_CONFIDENCE:
+            reusable[idx] = hit
+    return reusable
+
+def cluster_untyped_rows(df_untyped) -> list[list]:
+    """
+    VOC유형이 없는 행을 VOC내용 + 조치계획이 거의 같은 것끼리 묶습니다.
+    GEMINI_CLUSTER_ENABLED가 꺼져 있으면 모든 행이 단독 군집입니다.
+
+    Returns:
+        list[list]: 군집별 행 인덱스 목록 (첫 번째가 Gemini에 보낼 대표 행)
+    """
+    if not GEMINI_CLUSTER_ENABLED:
+        return [[idx] for idx in df_untyped.index]
+    texts = {
+        idx: f"{_cell_text(row, 'VOC내용')} {_cell_text(row, '조치계획 및 진행상황')}"
+        for idx, row in df_untyped.iterrows()
+    }
+    return cluster_near_duplicates(texts, GEMINI_CLUSTER_THRESHOLD)
+
+def row_texts(row) -> tuple[str, str]:
+    """행의 (VOC내용, 조치계획 및 진행상황). NaN이면 빈 문자열"""
+    return _cell_text(row, 'VOC내용'), _cell_text(row, '조치계획 및 진행상황')
+
+class VocTypeInference:
+    """
+    VOC유형 추론 한 번의 공통 처리. 배치 처리(infer_voc_type_with_gemini)와 스트림 모드의 추론 단계가 함께 사용합니다.
+
+    - 이전 예측 재사용, 유사 VOC 군집 구성, 대표 행 분류, 해석 실패/확신도 낮은 행의 묶음 재시도를 수행하고 감사 로그에 기록합니다.
+    - 분당 제한에 걸리면 다음 구간까지 기다렸다가 이어서 호출하고, 기다릴 수 없는 호출 제한이나 회로 차단이 발생하면
+      rate_limited를 설정하여 이후 호출을 멈춥니다. 예측 결과를 DataFrame에 반영하고 남은 행을 대기열로 넘기는 것은 호출자가 처리합니다.
+    """
+    def __init__(self, valid_types, audit: InferenceAuditLog, model=None):
+        self.valid_types = list(valid_types)
+        self.audit = audit
+        self.model = model # None이면 config의 GEMINI_MODEL
+        self.rate_limited = False
+        self.cluster_members = {} # 대표 행 -> 군집 전체 행
+        self._cluster_count = 0
+        self._row_keys = {}
+        self._request_dates = {}
+        self._excel_rows = {}
+
+    def log(self, line, **fields):
+        self.audit.write(line, **fields)
+        print(line)
+
+    def excel_row(self, idx) -> int:
+        """원본 Excel 행 번호 (중복 제외 등으로 인덱스가 바뀌어도 유지)"""
+        return self._excel_rows.get(idx, idx + 2)
+
+    def _prediction_fields(self, idx, predicted_type, confidence, reason, source):
+        return dict(excel_row=self.excel_row(idx), row_hash=self._row_keys.get(idx),
+                    request_date=self._request_dates.get(idx, ''),
+                    voc_type=predicted_type, confidence=confidence, reason=reason, source=source)
+
+    def estimate_tokens(self, row) -> int:
+        """행 하나의 프롬프트 길이로 호출당 토큰 수를 추정합니다. (예상 소요 시간 출력용)"""
+        voc_content, voc_action = row_texts(row)
+        return len(prompt_builder.build_voc_type_prompt(voc_content, voc_action, self.valid_types)) // 2
+
+    def reuse(self, df_untyped) -> dict:
+        """
+        유형이 없는 행을 추론 대상으로 등록하고, 내용이 같은 행의 이전 예측을 색인에서 찾아 기록합니다.
+
+        Returns:
+            dict: 행 인덱스 -> (유형, 확신도, 이유) 호출 없이 재사용할 예측
+        """
+        keys = row_prediction_keys(df_untyped)
+        self._row_keys.update(keys)
+        self._request_dates.update(row_request_dates(df_untyped))
+        self._excel_rows.update(excel_row_numbers(df_untyped).to_dict())
+        reused = reusable_predictions(keys, self.valid_types)
+        for idx, (predicted_type, confidence, reason) in reused.items():
+            self.audit.write(f"[Excel 행 {self.excel_row(idx)}] 이전 예측 재사용: {predicted_type} (확신도 {confidence:.2f})",
+                             **self._prediction_fields(idx, predicted_type, confidence, reason, "reuse"))
+        if reused:
+            print(f"♻️ 이전에 예측한 같은 내용의 VOC {len(reused)}건은 Gemini 호출 없이 유형을 재사용합니다.")
+        return reused
+
+    def cluster(self, df_untyped) -> list[list]:
+        """
+        행을 거의 같은 내용끼리 군집으로 묶고 요청일시가 오래된 군집부터 정렬합니다. 여러 행 군집은 감사 로그에 기록합니다.
+
+        Returns:
+            list[list]: 군집별 행 인덱스 목록 (첫 번째가 Gemini에 보낼 대표 행)
+        """
+        df_untyped = order_by_request_date(df_untyped)
+        position = {idx: pos for pos, idx in enumerate(df_untyped.index)}
+        clusters = sorted(cluster_untyped_rows(df_untyped), key=lambda members: min(position[i] for i in members))
+        self.cluster_members.update({members[0]: members for members in clusters})
+        grouped = [members for members in clusters if len(members) > 1]
+        if grouped:
+            print(f"🧩 유사 VOC {sum(len(m) for m in grouped)}건을 {len(grouped)}개 군집으로 묶어 대표 행만 호출합니다. (호출 {len(df_untyped)}건 -> {len(clusters)}건)")
+            for members in grouped:
+                self._cluster_count += 1
+                excel_rows = [self.excel_row(i) for i in members]
+                self.log(f"[군집 {self._cluster_count}] 대표 Excel 행 {excel_rows[0]} / 구성 Excel 행: {', '.join(map(str, excel_rows))}",
+                         cluster=self._cluster_count, excel_rows=excel_rows)
+        return clusters
+
+    def record(self, idx, predicted_type, confidence, reason, label, source) -> list:
+        """
+        대표 행의 예측을 기록하고 같은 군집의 다른 행에도 반영했음을 기록합니다.
+
+        Returns:
+            list: 예측을 반영할 군집 전체 행 인덱스
+        """
+        members = self.cluster_members.get(idx, [idx])
+        self.log(f"[Excel 행 {self.excel_row(idx)}] {label}: {predicted_type} (확신도 {confidence:.2f}) / 이유: {reason}",
+                 **self._prediction_fields(idx, predicted_type, confidence, reason, source))
+        if len(members) > 1:
+            print(f"  ↳ 같은 군집 Excel 행 {', '.join(str(self.excel_row(i)) for i in members[1:])}에도 반영")
+            for member in members[1:]:
+                self.audit.write(f"[Excel 행 {self.excel_row(member)}] 군집 대표 Excel 행 {self.excel_row(idx)}의 유형 반영: {predicted_type}",
+                                 **self._prediction_fields(member, predicted_type, confidence, reason, "cluster"))
+        return members
+
+    def classify_row(self, idx, voc_content, voc_action):
+        """
+        대표 행 한 건을 분류하고 결과를 기록합니다.
+
+        Returns:
+            tuple | None: 확신도가 GEMINI_MIN_CONFIDENCE 이상이면 (유형, 확신도, 이유), 재시도 대상이면 None
+
+        Raises:
+            RuntimeError: 기다릴 수 없는 호출 제한(RateLimitExceeded) 또는 회로 차단(CircuitOpenError). rate_limited를 설정
+        """
+        excel_row = self.excel_row(idx)
+        try:
+            # 🔍 Gemini API 호출 (JSON 스키마 지정) 및 ✅ 결과 파싱
+            predicted_type, confidence, reason, text = classify_voc_type(voc_content, voc_action, self.valid_types, self.model)
+        except RuntimeError as e:
+            self.log(f"[Excel 행 {excel_row}] ❌ Gemini 호출 제한: {e}", excel_row=excel_row, error=str(e))
+            self.rate_limited = True
+            raise
+        except Exception as e:
+            self.log(f"[Excel 행 {excel_row}] ❌ Gemini 호출 오류, 재시도 대상: {e}", excel_row=excel_row, error=str(e))
+            return None
+        pace_call() # API 호출 간 짧은 지연 추가 (프리티어 제한을 쓸 때만, 과도한 요청 방지)
+        if predicted_type and confidence >= GEMINI_MIN_CONFIDENCE:
+            self.record(idx, predicted_type, confidence, reason, "예측된 유형", "gemini")
+            return predicted_type, confidence, reason
+        if predicted_type:
+            self.log(f"[Excel 행 {excel_row}] ⚠️ 확신도 낮음({confidence:.2f}), 재시도 대상 / 응답: {text}",
+                     excel_row=excel_row, response=text)
+        else:
+            self.log(f"[Excel 행 {excel_row}] ⚠️ 응답 해석 실패, 재시도 대상 / 응답: {text}", excel_row=excel_row, response=text)
+        return None
+
+    def retry(self, retry_rows):
+        """
+        재시도 대상을 GEMINI_RETRY_BATCH_SIZE건씩 묶어 다시 분류합니다. (이미 분류된 행은 다시 호출하지 않음)
+
+        Args:
+            retry_rows (list): (행 인덱스, VOC내용, 조치계획) 목록
+
+        Yields:
+            tuple: (묶음의 행 인덱스 목록, 행 인덱스 -> (유형, 확신도, 이유) 확신도 기준 이상으로 분류된 행)
+                호출 제한 이후의 묶음은 호출하지 않고 빈 결과를 돌려주므로, 호출자는 rate_limited를 확인하여 대기열로 넘깁니다.
+        """
+        if retry_rows and not self.rate_limited:
+            print(f"\n🔁 재분류 대상 {len(retry_rows)}건을 {GEMINI_RETRY_BATCH_SIZE}건 단위로 재시도합니다.")
+        for start in range(0, len(retry_rows), GEMINI_RETRY_BATCH_SIZE):
+            batch = retry_rows[start:start + GEMINI_RETRY_BATCH_SIZE]
+            batch_idx = [idx for idx, _, _ in batch]
+            accepted = {}
+            if not self.rate_limited:
+                try:
+                    results = classify_voc_type_batch(batch, self.valid_types, self.model)
+                    for row_id, (predicted_type, confidence, reason) in results.items():
+                        if predicted_type and confidence >= GEMINI_MIN_CONFIDENCE:
+                            self.record(row_id, predicted_type, confidence, reason, "재시도 예측 유형", "retry")
+                            accepted[row_id] = (predicted_type, confidence, reason)
+                        else:
+                            self.log(f"[Excel 행 {self.excel_row(row_id)}] ❌ 재시도 후에도 유형 예측 실패 (유형: {predicted_type}, 확신도 {confidence:.2f})",
+                                     excel_row=self.excel_row(row_id))
+                    for idx in sorted(set(batch_idx) - results.keys()):
+                        self.log(f"[Excel 행 {self.excel_row(idx)}] ❌ 재시도 응답에 결과 없음", excel_row=self.excel_row(idx))
+                    pace_call()
+                except RuntimeError as e: # 기다릴 수 없는 호출 제한 또는 회로 차단
+                    self.log(f"❌ 재시도 중 Gemini 호출 제한: {e}", error=str(e))
+                    self.rate_limited = True
+                except Exception as e:
+                    excel_rows = [self.excel_row(i) for i in sorted(batch_idx)]
+                    self.log(f"❌ 재시도 중 Gemini 호출 오류 (Excel 행 {', '.join(map(str, excel_rows))}): {e}",
+                             excel_rows=excel_rows, error=str(e))
+            yield batch_idx, accepted
+
+def infer_voc_type_with_gemini(df_voc, voc_type_map, model=None):
     """
     Gemini 모델을 사용하여 VOC유형이 NaN인 경우 내용 기반으로 추론합니다.
     이 함수는 GEMINI_MODEL을 직접 사용하며, config.py에서 미리 초기화되어 있어야 합니다.
+
+    응답은 voc_type_map 키로 제한된 JSON(유형, 확신도, 이유)으로 받으며,
+    해석할 수 없거나 확신도가 GEMINI_MIN_CONFIDENCE 미만인 행만 모아서 압축된 재시도 호출로 한 번 더 분류합니다.
+
+    내용이 거의 같은 행(GEMINI_CLUSTER_THRESHOLD 이상 유사)은 하나의 군집으로 묶어 대표 행만 호출하고,
+    예측된 유형을 군집의 모든 행에 반영합니다. 군집 구성은 추론 감사 로그에 함께 기록됩니다.
+
+    추론 과정은 InferenceAuditLog(JSONL)에 바로바로 기록되며, 내용이 같은 행의 이전 예측은 색인에서 찾아 재사용합니다.
+
+    호출은 요청일시가 오래된 군집부터 보내며, 시작 전에 RPM/TPM/RPD 기준 예상 소요 시간을 출력합니다.
+    분당 제한에 걸리면 다음 구간까지 기다렸다가(GEMINI_SCHEDULER_MAX_WAIT 이내) 이어서 추론하고,
+    일일 한도 소진이나 회로 차단으로 더 진행할 수 없으면 남은 행을 대기열(GEMINI_PENDING_QUEUE_PATH)에 저장하고
+    반환하는 DataFrame에서 제외합니다. 대기열은 다음 실행에서 할당량이 생기면 이어서 처리됩니다.
+    (행 단위 처리는 스트림 모드와 같은 VocTypeInference를 사용)
     """
     print("\n🔍 Gemini를 이용한 VOC유형 추론 시작")
 
-    valid_types = list(voc_type_map.keys())
     updated_count = 0
-    reasons = []
-    # 로그 파일 경로를 함수 호출 시점에서 동적으로 생성
-    # 디렉토리가 없으면 생성
-    os.makedirs(REASON_LOG_PATH, exist_ok=True)
-    # 현재 날짜와 시간을 'YYYYMMDD_HHMMSS' 형식으로 포맷팅
-    timestamp = time.strftime("%Y%m%d_%H%M%S", time.localtime())
-    reason_log_path = os.path.join(REASON_LOG_PATH, f"voc_infer_log_{timestamp}.txt")
+    retry_rows = [] # (idx, voc_content, voc_action)
+    deferred = [] # 할당량 부족으로 대기열에 넘길 대표 행
+    audit = InferenceAuditLog()
+    inference = VocTypeInference(voc_type_map.keys(), audit, model)
 
     # 'VOC유형' 컬럼이 존재하지 않으면 추가 (DataFrame이 비어있을 경우를 대비)
     if 'VOC유형' not in df_voc.columns:
         df_voc['VOC유형'] = None # 또는 적절한 기본값
 
-    # VOC 유형이 NaN인 행만 필터링하여 순회
-    for idx, row in df_voc[df_voc['VOC유형'].isna()].iterrows():
-        voc_content = str(row.get("VOC내용", "")).strip() # NaN이면 빈 문자열로
-        voc_action = str(row.get("조치계획 및 진행상황", "")).strip() # NaN이면 빈 문자열로
+    def apply_type(members, predicted_type):
+        nonlocal updated_count
+        for member in members:
+            df_voc.at[member, 'VOC유형'] = predicted_type
+        updated_count += len(members)
 
-        prompt = prompt_builder.build_voc_type_prompt(voc_content, voc_action, valid_types)
+    try:
+        # ♻️ 내용이 같은 행의 이전 예측은 호출 없이 재사용
+        df_untyped = df_voc[df_voc['VOC유형'].isna()]
+        reused = inference.reuse(df_untyped)
+        for idx, (predicted_type, _, _) in reused.items():
+            apply_type([idx], predicted_type)
+        df_untyped = df_untyped.drop(index=list(reused))
 
-        try:
-            # ✅ 사용량 제한 체크
-            token_estimate = len(prompt) // 2 # 대략적인 토큰 수 계산 (보수적 추정)
-            rate_limit_guard(tokens_used=token_estimate)
-
-            # 🔍 Gemini API 호출
-            response = GEMINI_MODEL.generate_content(prompt) # config에서 임포트한 GEMINI_MODEL 사용
-            text = response.text.strip()
-
-            # ✅ 결과 파싱
-            predicted_type = next((t for t in valid_types if t in text), None)
-            if predicted_type:
-                df_voc.at[idx, 'VOC유형'] = predicted_type
-                updated_count += 1
-                reason_line = f"[Excel 행 {idx + 2}] 예측된 유형: {predicted_type} / 이유: {text}\n"
-                reasons.append(reason_line)
-                print(reason_line.strip())
+        # 남은 행은 거의 같은 내용끼리 군집으로 묶고, 요청일시가 오래된 군집부터 호출
+        clusters = inference.cluster(df_untyped)
+
+        # 🗓️ 호출 건수와 사용량 제한 기준 예상 소요 시간
+        if clusters:
+            print_inference_plan(len(clusters), inference.estimate_tokens(df_voc.loc[clusters[0][0]]))
+
+        # 군집 대표 행만 순회
+        for pos, members in enumerate(clusters):
+            idx = members[0]
+            voc_content, voc_action = row_texts(df_voc.loc[idx])
+            try:
+                prediction = inference.classify_row(idx, voc_content, voc_action)
+            except RuntimeError: # 기다릴 수 없는 호출 제한(RateLimitExceeded) 또는 회로 차단(CircuitOpenError)
+                deferred = [m[0] for m in clusters[pos:]]
+                break # 제한에 걸리면 더 이상 진행하지 않고 남은 행은 대기열로
+            if prediction:
+                apply_type(members, prediction[0])
             else:
-                reason_line = f"[Excel 행 {idx + 2}] ❌ 유형 예측 실패 / 응답: {text}\n"
-                reasons.append(reason_line)
-                print(reason_line.strip())
-            time.sleep(1) # API 호출 간 짧은 지연 추가 (과도한 요청 방지)
-
-        except RuntimeError as e: # rate_limit_guard에서 발생시키는 예외
-            reason_line = f"[Excel 행 {idx + 2}] ❌ Gemini 호출 제한: {e}\n"
-            reasons.append(reason_line)
-            print(reason_line.strip())
-            break # 제한에 걸리면 더 이상 진행하지 않음
-        except Exception as e:
-            reason_line = f"[Excel 행 {idx + 2}] ❌ Gemini 호출 오류: {e}\n"
-            reasons.append(reason_line)
-            print(reason_line.strip())
+                retry_rows.append((idx, voc_content, voc_action))
 
-    print(f"✅ VOC유형이 없는 {updated_count}건에 대해 유형을 추론하여 반영했습니다.")
+        # 🔁 해석 실패/확신도 낮음 행만 모아서 재시도
+        for batch_idx, accepted in inference.retry(retry_rows):
+            for row_id, (predicted_type, _, _) in accepted.items():
+                apply_type(inference.cluster_members.get(row_id, [row_id]), predicted_type)
+            if inference.rate_limited:
+                deferred += batch_idx
 
-    if reasons:
-        with open(reason_log_path, "w", encoding="utf-8") as f:
-            f.writelines(reasons)
-        print(f"📁 추론 이유는 '{reason_log_path}'에 저장되었습니다.")
+        # 🗓️ 할당량 부족으로 추론하지 못한 군집 전체를 대기열에 저장하고 이번 처리에서는 제외
+        deferred_rows = [member for idx in deferred for member in inference.cluster_members.get(idx, [idx])
+                         if pd.isna(df_voc.at[member, 'VOC유형'])]
+        if deferred_rows:
+            audit.write(f"할당량 부족으로 {len(deferred_rows)}건을 대기열에 저장",
+                        deferred_excel_rows=[inference.excel_row(i) for i in deferred_rows])
+            defer_rows(df_voc.loc[deferred_rows], "Gemini 호출 할당량 부족")
+            df_voc = df_voc.drop(index=deferred_rows)
+    finally:
+        audit.close()
+
+    print(f"✅ VOC유형이 없는 {updated_count}건에 대해 유형을 추론하여 반영했습니다.")
 
-    return df_voc
\ No newline at end of file
+    return df_voc
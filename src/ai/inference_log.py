@@ -0,0 +1,210 @@
+# inference_log.py
+import hashlib
+import json
+import os
+import queue
+import re
+import sqlite3
+import threading
+import time
+
+from src.config.config import INFER_LOG_DIR, INFER_LOG_FLUSH_SECONDS, INFER_INDEX_PATH
+from src.log_paths import unique_log_path
+
+_STOP = object()
+_SPACE_RE = re.compile(r"\s+")
+_LOOKUP_CHUNK = 500 # sqlite IN (...) 파라미터 수 제한 대비
+
+_SCHEMA = """
+CREATE TABLE IF NOT EXISTS predictions (
+    row_hash TEXT PRIMARY KEY,
+    request_date TEXT,
+    voc_type TEXT NOT NULL,
+    confidence REAL,
+    reason TEXT,
+    source TEXT,
+    predicted_at TEXT,
+    log_path TEXT
+);
+CREATE INDEX IF NOT EXISTS idx_predictions_request_date ON predictions (request_date);
+"""
+
+
+def prediction_key(voc_content, voc_action) -> str:
+    """VOC내용 + 조치계획을 공백 정규화하여 만든 행 해시 (같은 내용이면 이전 예측을 재사용하는 기준)"""
+    text = f"{_SPACE_RE.sub(' ', str(voc_content or '')).strip()}\n{_SPACE_RE.sub(' ', str(voc_action or '')).strip()}"
+    return hashlib.sha1(text.encode("utf-8")).hexdigest()
+
+
+def new_infer_log_path() -> str:
+    """추론 감사 로그 파일 경로 (log/voc_infer_log_<timestamp>_<pid>_<순번>.jsonl, 동시 실행끼리 겹치지 않음)"""
+    return unique_log_path(INFER_LOG_DIR, "voc_infer_log", "jsonl")
+
+
+class InferenceAuditLog:
+    """
+    VOC유형 추론 과정(예측 유형, 확신도, 이유, 군집, 오류)을 JSONL로 한 줄씩 기록하는 감사 로그입니다.
+
+    - write()는 큐에 넣기만 하고, 백그라운드 스레드가 버퍼링하여 기록한 뒤 flush_interval초마다 디스크에 반영(fsync)합니다.
+      실행 도중 종료되어도 마지막 반영 이후의 기록만 잃습니다.
+    - 유형이 있는 예측(row_hash, voc_type 필드)은 sqlite 색인(INFER_INDEX_PATH)에도 행 해시/요청일 기준으로 저장되어
+      lookup_predictions / find_predictions로 로그 파일을 다시 읽지 않고 조회할 수 있습니다.
+    """
+    def __init__(self, path=None, index_path=INFER_INDEX_PATH, flush_interval=INFER_LOG_FLUSH_SECONDS):
+        self.path = path or new_infer_log_path()
+        self.index_path = index_path
+        self.flush_interval = max(0.1, flush_interval)
+        self.count = 0
+        self._queue = queue.Queue()
+        self._thread = threading.Thread(target=self._run, name="voc-infer-log", daemon=True)
+        self._thread.start()
+
+    def write(self, message, **fields):
+        """
+        기록 한 건을 추가합니다.
+
+        Args:
+            message (str): 콘솔에 출력한 것과 같은 설명
+            **fields: 구조화된 값 (excel_row, row_hash, request_date, voc_type, confidence, reason, source 등)
+        """
+        self._queue.put({"ts": time.strftime("%Y-%m-%dT%H:%M:%S", time.localtime()), "message": message, **fields})
+
+    def close(self):
+        """남은 기록을 모두 반영하고 기록 스레드를 종료합니다."""
+        if self._thread.is_alive():
+            self._queue.put(_STOP)
+            self._thread.join()
+        if self.count:
+            print(f"📁 추론 이유는 '{self.path}'에 저장되었습니다.")
+
+    def __enter__(self):
+        return self
+
+    def __exit__(self, exc_type, exc, tb):
+        self.close()
+
+    # ---------- 기록 스레드 ----------
+    def _open_index(self):
+        try:
+            os.makedirs(os.path.dirname(self.index_path) or ".", exist_ok=True)
+            db = sqlite3.connect(self.index_path)
+            db.execute("PRAGMA journal_mode=WAL") # 기록 중에도 다른 실행에서 조회 가능
+            db.executescript(_SCHEMA)
+            return db
+        except sqlite3.Error as e:
+            print(f"경고: 추론 색인을 열지 못했습니다. 로그 파일에만 기록합니다: {e}")
+            return None
+
+    def _flush(self, f, db, pending):
+        if f is not None:
+            f.flush()
+            os.fsync(f.fileno())
+        if db is not None and pending:
+            try:
+                db.executemany(
+                    "INSERT OR REPLACE INTO predictions "
+                    "(row_hash, request_date, voc_type, confidence, reason, source, predicted_at, log_path) "
+                    "VALUES (?, ?, ?, ?, ?, ?, ?, ?)", pending
+                )
+                db.commit()
+            except sqlite3.Error as e:
+                print(f"경고: 추론 색인 기록 실패: {e}")
+        pending.clear()
+
+    def _run(self):
+        f = None
+        db = None
+        pending = [] # 색인에 넣을 예측
+        last_flush = time.monotonic()
+        stop = False
+        while not stop:
+            timeout = max(0.0, self.flush_interval - (time.monotonic() - last_flush))
+            try:
+                item = self._queue.get(timeout=timeout)
+            except queue.Empty:
+                item = None
+            if item is _STOP:
+                stop = True
+            elif item is not None:
+                if f is None:
+                    os.makedirs(os.path.dirname(self.path) or ".", exist_ok=True)
+                    f = open(self.path, "a", encoding="utf-8", buffering=1 << 16)
+                    db = self._open_index()
+                f.write(json.dumps(item, ensure_ascii=False, default=str) + "\n")
+                self.count += 1
+                # 재사용한 예측은 이미 색인에 있으므로 원래 기록(출처, 로그 파일)을 유지
+                if item.get("row_hash") and item.get("voc_type") and item.get("source") != "reuse":
+                    pending.append((
+                        item["row_hash"], item.get("request_date") or None, item["voc_type"],
+                        item.get("confidence"), item.get("reason"), item.get("source"), item["ts"], self.path
+                    ))
+            if stop or time.monotonic() - last_flush >= self.flush_interval:
+                self._flush(f, db, pending)
+                last_flush = time.monotonic()
+        if f is not None:
+            f.close()
+        if db is not None:
+            db.close()
+
+
+def _connect_readonly(index_path):
+    if not os.path.exists(index_path):
+        return None
+    try:
+        return sqlite3.connect(f"file:{index_path}?mode=ro", uri=True)
+    except sqlite3.Error as e:
+        print(f"경고: 추론 색인을 열지 못했습니다: {e}")
+        return None
+
+
+def lookup_predictions(row_hashes, index_path=INFER_INDEX_PATH) -> dict:
+    """
+    행 해시로 이전 예측을 조회합니다.
+
+    Returns:
+        dict: row_hash -> (유형, 확신도, 이유). 색인에 없는 해시는 제외
+    """
+    row_hashes = list(dict.fromkeys(row_hashes))
+    db = _connect_readonly(index_path)
+    if db is None or not row_hashes:
+        return {}
+    results = {}
+    try:
+        for start in range(0, len(row_hashes), _LOOKUP_CHUNK):
+            chunk = row_hashes[start:start + _LOOKUP_CHUNK]
+            rows = db.execute(
+                f"SELECT row_hash, voc_type, confidence, reason FROM predictions WHERE row_hash IN ({','.join('?' * len(chunk))})",
+                chunk
+            )
+            for row_hash, voc_type, confidence, reason in rows:
+                results[row_hash] = (voc_type, confidence or 0.0, reason or '')
+    except sqlite3.Error as e:
+        print(f"경고: 추론 색인 조회 실패: {e}")
+    finally:
+        db.close()
+    return results
+
+
+def find_predictions(start_date=None, end_date=None, index_path=INFER_INDEX_PATH) -> list[dict]:
+    """
+    요청일(YYYY-MM-DD) 범위로 이전 예측을 조회합니다. 범위를 지정하지 않으면 전체를 반환합니다.
+    """
+    db = _connect_readonly(index_path)
+    if db is None:
+        return []
+    query = "SELECT row_hash, request_date, voc_type, confidence, reason, source, predicted_at, log_path FROM predictions WHERE 1=1"
+    params = []
+    if start_date:
+        query += " AND request_date >= ?"
+        params.append(start_date)
+    if end_date:
+        query += " AND request_date <= ?"
+        params.append(end_date)
+    try:
+        db.row_factory = sqlite3.Row
+        return [dict(row) for row in db.execute(query + " ORDER BY request_date", params)]
+    except sqlite3.Error as e:
+        print(f"경고: 추론 색인 조회 실패: {e}")
+        return []
+    finally:
+        db.close()
@@ -0,0 +1,217 @@
+# inference_scheduler.py
+import math
+import os
+import threading
+import time
+
+import pandas as pd
+
+from src.ai.api_usage_limiter import (
+    RateLimitExceeded, rate_limit_guard, remaining_budget, seconds_until_budget, next_quota_reset
+)
+from src.date_parser import format_datetime_column
+from src.dedup_voc import VOC_KEY_COLUMN
+from src.config.config import (
+    USE_FREE_TIER, MAX_RPM, MAX_RPD, MAX_TPM, GEMINI_SCHEDULER_MAX_WAIT, GEMINI_PENDING_QUEUE_PATH
+)
+
+# 프리티어 제한을 쓰면 호출마다 1초씩 쉬어 분당 요청이 한꺼번에 몰리지 않도록 함 (제한을 쓰지 않으면 쉬지 않음)
+_MIN_CALL_INTERVAL = 1.0 if USE_FREE_TIER else 0.0
+_queue_lock = threading.Lock() # 데몬 모드에서 여러 파일이 동시에 대기열에 추가하는 경우 보호
+
+
+def order_by_request_date(df_voc) -> pd.DataFrame:
+    """
+    요청일시가 오래된 행부터 정렬합니다. (인덱스 유지, 요청일시를 해석할 수 없는 행은 맨 뒤)
+    할당량이 부족해 일부만 추론할 수 있을 때 오래된 VOC부터 등록되도록 추론 순서로 사용합니다.
+    """
+    if df_voc.empty or '요청일시/등록일시' not in df_voc.columns:
+        return df_voc
+    dates = format_datetime_column(df_voc['요청일시/등록일시'])
+    order = sorted(df_voc.index, key=lambda idx: (dates[idx] == '', dates[idx]))
+    return df_voc.loc[order]
+
+
+def pace_call():
+    """Gemini 호출 후 다음 호출까지 최소 간격만큼 쉽니다. (GEMINI_USE_FREE_TIER=N이면 바로 반환)"""
+    if _MIN_CALL_INTERVAL:
+        time.sleep(_MIN_CALL_INTERVAL)
+
+
+def estimate_inference_eta(n_calls, tokens_per_call) -> dict:
+    """
+    Gemini 호출 n_calls건을 RPM/TPM/RPD 제한 안에서 처리하는 데 걸리는 시간을 추정합니다.
+
+    Returns:
+        dict: {'per_minute': 분당 처리 가능 건수, 'today': 오늘 처리 가능 건수,
+               'later': 다음 할당량 초기화 이후로 넘어가는 건수, 'days': 추가로 필요한 일 수, 'seconds': 오늘 처리분 예상 소요 시간(초)}
+            사용량 제한과 호출 간격이 없으면(GEMINI_USE_FREE_TIER=N) per_minute와 seconds는 None (응답 시간에만 좌우됨)
+    """
+    if not USE_FREE_TIER:
+        return {"per_minute": None, "today": n_calls, "later": 0, "days": 0, "seconds": None}
+    per_minute = 60 / _MIN_CALL_INTERVAL
+    today = n_calls
+    per_minute = min(per_minute, MAX_RPM, MAX_TPM // max(tokens_per_call, 1))
+    today = min(n_calls, remaining_budget()["rpd"])
+    later = n_calls - today
+    return {
+        "per_minute": per_minute,
+        "today": today,
+        "later": later,
+        "days": math.ceil(later / MAX_RPD) if later else 0,
+        "seconds": today / per_minute * 60 if per_minute else 0.0,
+    }
+
+
+def print_inference_plan(n_calls, tokens_per_call):
+    """추론 시작 전에 호출 건수와 예상 소요 시간(ETA)을 출력합니다."""
+    if n_calls <= 0:
+        return
+    eta = estimate_inference_eta(n_calls, tokens_per_call)
+    if eta["per_minute"] is None:
+        print(f"🗓️ 추론 계획: 호출 {n_calls}건 (호출당 약 {tokens_per_call:,}토큰), 사용량 제한 없음")
+        return
+    finish_at = time.strftime("%H:%M", time.localtime(time.time() + eta["seconds"]))
+    print(f"🗓️ 추론 계획: 호출 {n_calls}건 (호출당 약 {tokens_per_call:,}토큰), 분당 최대 {eta['per_minute']:.0f}건 "
+          f"-> 오늘 {eta['today']}건, 약 {eta['seconds'] / 60:.1f}분 소요 (예상 완료 {finish_at})")
+    if eta["later"]:
+        reset_at = time.strftime("%m-%d %H:%M", time.localtime(next_quota_reset()))
+        print(f"🗓️ 일일 요청 한도(RPD {MAX_RPD}건)로 나머지 {eta['later']}건은 대기열에 저장되어 "
+              f"한도가 초기화되는 {reset_at}부터 약 {eta['days']}일에 걸쳐 이어서 처리됩니다.")
+
+
+def wait_for_budget(tokens_used=0, max_wait=GEMINI_SCHEDULER_MAX_WAIT) -> bool:
+    """
+    호출 제한에 걸렸을 때 다음 분 구간이 max_wait초 안에 열리면 그때까지 기다립니다.
+
+    Returns:
+        bool: 기다린 뒤 호출할 수 있으면 True, 더 오래 기다려야 하면(예: 일일 한도 소진) 기다리지 않고 False
+    """
+    wait = seconds_until_budget(tokens_used)
+    if wait > max_wait:
+        return False
+    if wait > 0:
+        print(f"⏳ Gemini 호출 제한 구간이 {wait:.0f}초 후 열립니다. 기다렸다가 이어서 추론합니다.")
+        time.sleep(wait + 0.5) # 구간 경계 직후에 호출되도록 약간 여유
+    return seconds_until_budget(tokens_used) == 0
+
+
+def wait_for_quota(tokens_used=0):
+    """
+    Gemini 호출 한 건의 사용량을 확인하고 기록합니다. (rate_limit_guard)
+    분당 제한(RateLimitExceeded)에 걸리면 wait_for_budget으로 다음 구간까지 기다렸다가 다시 확인합니다.
+    모델 단계마다, 재시도마다 호출 직전에 사용하므로 이미 끝난 단계의 호출을 다시 보내지 않습니다.
+    기다릴 수 없으면(일일 한도 소진 등) RateLimitExceeded를 그대로 전달합니다.
+    """
+    while True:
+        try:
+            return rate_limit_guard(tokens_used)
+        except RateLimitExceeded:
+            if not wait_for_budget(tokens_used):
+                raise
+
+
+class PendingInferenceQueue:
+    """
+    할당량 부족으로 유형을 추론하지 못한 VOC 행을 CSV 대기열로 보관합니다.
+    다음 실행(또는 데몬의 다음 감시 주기)에서 할당량이 생기면 take()로 꺼내 처음부터 다시 처리합니다.
+    (다시 처리할 때 중복 검사를 거치므로 그사이 등록된 건은 보내지 않음)
+
+    - 원본 Excel 행 번호는 `_excel_row` 컬럼으로 함께 저장되어, 다시 처리할 때의 로그/리포트에도 원래 행 번호가 표시됩니다.
+    - take()는 대기열 파일을 `<경로>.claimed`로 옮겨 두고 꺼내며, 처리가 끝나면 complete()로 삭제하고
+      실패하면 release()로 대기열에 되돌립니다. 처리 중 프로그램이 종료되어 남은 파일은 다음 take()에서 대기열로 되돌립니다.
+    """
+    def __init__(self, path=GEMINI_PENDING_QUEUE_PATH):
+        self.path = path
+        self.claimed_path = f"{path}.claimed"
+
+    @staticmethod
+    def _read(path) -> pd.DataFrame | None:
+        if not os.path.exists(path):
+            return None
+        try:
+            return pd.read_csv(path, encoding="utf-8-sig")
+        except (OSError, ValueError) as e:
+            print(f"경고: 추론 대기열을 읽지 못했습니다: {e}")
+            return None
+
+    def load(self) -> pd.DataFrame | None:
+        return self._read(self.path)
+
+    def _write(self, df):
+        os.makedirs(os.path.dirname(self.path) or ".", exist_ok=True)
+        tmp_path = f"{self.path}.tmp"
+        # utf-8-sig: Excel에서 바로 열어도 한글이 깨지지 않도록 BOM 포함
+        # (인덱스는 저장하지 않으므로 원본 Excel 행 번호는 _excel_row 컬럼으로 보관)
+        df.to_csv(tmp_path, index=False, encoding="utf-8-sig")
+        os.replace(tmp_path, self.path)
+
+    def _add(self, df_rows) -> int:
+        existing = self.load()
+        merged = df_rows if existing is None else pd.concat([existing, df_rows], ignore_index=True)
+        if VOC_KEY_COLUMN in merged.columns:
+            merged = merged.drop_duplicates(subset=VOC_KEY_COLUMN, keep='first')
+        self._write(merged)
+        return len(merged)
+
+    def add(self, df_rows) -> int:
+        """
+        행을 대기열에 추가합니다. 이미 대기 중인 같은 VOC(중복 판단 키 기준)는 한 번만 보관합니다.
+
+        Returns:
+            int: 추가 후 대기열의 전체 건수
+        """
+        with _queue_lock:
+            return self._add(df_rows)
+
+    def _restore_claimed(self):
+        """꺼낸 뒤 처리하지 못한 행(.claimed)을 대기열에 되돌립니다. _queue_lock 안에서 호출합니다."""
+        df_claimed = self._read(self.claimed_path)
+        if df_claimed is not None and not df_claimed.empty:
+            self._add(df_claimed)
+        if os.path.exists(self.claimed_path):
+            os.remove(self.claimed_path)
+
+    def take(self) -> pd.DataFrame | None:
+        """
+        Gemini 호출 할당량이 있으면 대기열 전체를 꺼냅니다. (다시 할당량이 부족해진 행은 처리 중 다시 추가됨)
+        꺼낸 행은 complete() 또는 release()를 호출할 때까지 `<경로>.claimed` 파일에 남아 있습니다.
+        대기열이 비어 있거나 아직 할당량이 없으면 None
+        """
+        with _queue_lock:
+            if os.path.exists(self.claimed_path):
+                # 이전 처리 중 종료되어 남은 행은 대기열로 되돌린 뒤 함께 꺼냄
+                print(f"🗓️ 처리 중 종료된 추론 대기열('{self.claimed_path}')을 대기열에 되돌립니다.")
+                self._restore_claimed()
+            if not os.path.exists(self.path) or seconds_until_budget() > 0:
+                return None
+            os.replace(self.path, self.claimed_path)
+            df_rows = self._read(self.claimed_path)
+            if df_rows is None or df_rows.empty:
+                os.remove(self.claimed_path)
+                return None
+        return df_rows.drop(columns=[VOC_KEY_COLUMN], errors='ignore')
+
+    def complete(self):
+        """take()로 꺼낸 행의 처리가 끝났으면 꺼내 둔 파일을 삭제합니다."""
+        with _queue_lock:
+            if os.path.exists(self.claimed_path):
+                os.remove(self.claimed_path)
+
+    def release(self):
+        """take()로 꺼낸 행을 처리하지 못했으면 대기열에 되돌립니다. (처리 중 새로 추가된 행과 합쳐짐)"""
+        with _queue_lock:
+            self._restore_claimed()
+
+
+def defer_rows(df_rows, reason) -> int:
+    """할당량 부족으로 추론하지 못한 행을 대기열에 저장하고 안내를 출력합니다. 저장한 건수를 반환합니다."""
+    if df_rows is None or df_rows.empty:
+        return 0
+    queue = PendingInferenceQueue()
+    total = queue.add(df_rows)
+    wait = seconds_until_budget()
+    resume_at = time.strftime("%Y-%m-%d %H:%M", time.localtime(time.time() + wait))
+    print(f"🗓️ {reason}: 추론하지 못한 {len(df_rows)}건을 대기열('{queue.path}', 전체 {total}건)에 저장했습니다. "
+          f"{resume_at} 이후 다음 실행에서 이어서 처리합니다.")
+    return len(df_rows)
@@ -0,0 +1,199 @@
+# model_tiers.py
+import math
+import threading
+import time
+from collections import deque
+from concurrent.futures import FIRST_COMPLETED, ThreadPoolExecutor, wait
+
+from src.ai.api_usage_limiter import try_rate_limit
+from src.config.config import (
+    GEMINI_TIER_MODELS, GEMINI_MODEL_TIERS, GEMINI_MODEL_COSTS,
+    GEMINI_HEDGE_ENABLED, GEMINI_HEDGE_PERCENTILE, GEMINI_HEDGE_MIN_SAMPLES, GEMINI_HEDGE_MAX_RATIO
+)
+
+# 기준 지연(p95)과 통계 출력에 사용하는 모델별 최근 지연 표본 수
+_LATENCY_WINDOW = 200
+
+# 헤지 요청은 먼저 보낸 요청과 동시에 실행되어야 하므로 호출을 별도 스레드에서 수행
+# (데몬 모드에서 여러 파일이 동시에 추론해도 충분하도록 여유 있게 설정)
+_executor = ThreadPoolExecutor(max_workers=16, thread_name_prefix="gemini-call")
+
+
+def model_name(model) -> str:
+    """통계 키로 쓰는 모델 이름 (genai.GenerativeModel은 'models/...' 접두어 제거)"""
+    name = str(getattr(model, "model_name", None) or type(model).__name__)
+    return name[len("models/"):] if name.startswith("models/") else name
+
+
+def _percentile(ordered, pct) -> float:
+    """최근접 순위 방식 백분위 (정렬된 목록, 값이 없으면 0)"""
+    if not ordered:
+        return 0.0
+    return ordered[max(1, math.ceil(len(ordered) * pct / 100)) - 1]
+
+
+class TierStats:
+    """모델 하나의 호출/헤지/오류/상위 모델 전환 횟수, 최근 지연, 추정 토큰/비용"""
+    def __init__(self, name, cost_per_million: float = 0.0):
+        self.name = name
+        self.cost_per_million = cost_per_million
+        self.calls = 0          # 요청 수 (헤지 사본 제외)
+        self.hedged = 0         # 헤지 사본을 보낸 요청 수
+        self.hedge_wins = 0     # 헤지 사본이 먼저 응답한 요청 수
+        self.errors = 0
+        self.escalated = 0      # 확신도가 낮아 다음 모델로 넘긴 요청 수
+        self.tokens = 0         # 헤지 사본을 포함한 추정 입력 토큰 수
+        self._recent = deque(maxlen=_LATENCY_WINDOW)
+        self._lock = threading.Lock()
+
+    @property
+    def cost(self) -> float:
+        return self.tokens * self.cost_per_million / 1_000_000
+
+    def latencies(self) -> list[float]:
+        with self._lock:
+            return sorted(self._recent)
+
+    def hedge_delay(self) -> float | None:
+        """헤지 요청을 보낼 기준 지연(초). 표본이 부족하거나 헤지를 끈 경우 None"""
+        if not GEMINI_HEDGE_ENABLED:
+            return None
+        ordered = self.latencies()
+        if len(ordered) < GEMINI_HEDGE_MIN_SAMPLES:
+            return None
+        return _percentile(ordered, GEMINI_HEDGE_PERCENTILE)
+
+    def start_call(self, tokens):
+        with self._lock:
+            self.calls += 1
+            self.tokens += tokens
+
+    def reserve_hedge(self, tokens) -> bool:
+        """헤지 비율 상한 안이면 헤지 사본 하나를 기록하고 True"""
+        with self._lock:
+            if self.hedged + 1 > self.calls * GEMINI_HEDGE_MAX_RATIO:
+                return False
+            self.hedged += 1
+            self.tokens += tokens
+            return True
+
+    def release_hedge(self, tokens):
+        """reserve_hedge 후 실제로 보내지 못한 헤지 사본의 기록을 되돌립니다."""
+        with self._lock:
+            self.hedged -= 1
+            self.tokens -= tokens
+
+    def record(self, seconds, hedge_won=False):
+        with self._lock:
+            self._recent.append(seconds)
+            if hedge_won:
+                self.hedge_wins += 1
+
+    def record_error(self):
+        with self._lock:
+            self.errors += 1
+
+    def record_escalation(self):
+        with self._lock:
+            self.escalated += 1
+
+
+_stats = {}
+_stats_lock = threading.Lock()
+
+
+def tier_stats(model) -> TierStats:
+    """모델별 통계 객체 (처음 사용할 때 생성). 비용은 GEMINI_MODEL_COSTS 또는 모델의 cost_per_million 속성"""
+    name = model_name(model)
+    with _stats_lock:
+        stats = _stats.get(name)
+        if stats is None:
+            cost = getattr(model, "cost_per_million", None)
+            if cost is None and name in GEMINI_MODEL_TIERS and GEMINI_MODEL_TIERS.index(name) < len(GEMINI_MODEL_COSTS):
+                cost = GEMINI_MODEL_COSTS[GEMINI_MODEL_TIERS.index(name)]
+            stats = _stats[name] = TierStats(name, cost or 0.0)
+        return stats
+
+
+def reset_tier_stats():
+    """모든 모델 통계를 초기화합니다. 부하 테스트에서 단계마다 새로 측정할 때 사용합니다."""
+    with _stats_lock:
+        _stats.clear()
+
+
+def resolve_tiers(model=None) -> list:
+    """
+    호출할 모델 단계 목록. 지정하지 않으면 config의 GEMINI_TIER_MODELS,
+    모델 하나를 주면 그 모델만, 목록을 주면 그 순서대로 사용합니다. (부하 테스트용 가짜 모델 등)
+    """
+    if model is None:
+        return list(GEMINI_TIER_MODELS)
+    if isinstance(model, (list, tuple)):
+        return list(model)
+    return [model]
+
+
+def generate_with_hedge(model, prompt, generation_config, token_estimate):
+    """
+    model.generate_content를 호출합니다. 응답이 이 모델의 최근 p95 지연을 넘도록 오지 않으면
+    사용량 제한 여유(try_rate_limit)와 헤지 비율 상한 안에서 같은 요청을 한 번 더 보내고, 먼저 성공한 응답을 반환합니다.
+    늦게 온 응답은 버립니다. 두 요청이 모두 실패하면 마지막 오류를 그대로 전달합니다. (재시도는 호출자의 재시도 계층에서 처리)
+    """
+    stats = tier_stats(model)
+    stats.start_call(token_estimate)
+    delay = stats.hedge_delay()
+    started = time.perf_counter()
+
+    if delay is None:
+        try:
+            response = model.generate_content(prompt, generation_config=generation_config)
+        except Exception:
+            stats.record_error()
+            raise
+        stats.record(time.perf_counter() - started)
+        return response
+
+    primary = _executor.submit(model.generate_content, prompt, generation_config=generation_config)
+    pending = {primary}
+    done, _ = wait(pending, timeout=delay)
+    if not done and stats.reserve_hedge(token_estimate):
+        if try_rate_limit(token_estimate):
+            pending.add(_executor.submit(model.generate_content, prompt, generation_config=generation_config))
+        else:
+            stats.release_hedge(token_estimate) # 사용량 제한 여유가 없으면 헤지하지 않음
+
+    error = None
+    while pending:
+        done, pending = wait(pending, return_when=FIRST_COMPLETED)
+        for future in done:
+            if future.exception() is None:
+                stats.record(time.perf_counter() - started, hedge_won=future is not primary)
+                return future.result()
+            error = future.exception()
+    stats.record_error()
+    raise error
+
+
+def print_tier_stats():
+    """모델별 호출 수, 헤지, 상위 모델 전환, 지연 백분위(최근 표본), 추정 비용을 출력합니다."""
+    with _stats_lock:
+        all_stats = list(_stats.values())
+    if not all_stats:
+        return
+    print("\n🤖 Gemini 모델별 통계")
+    for stats in all_stats:
+        ordered = stats.latencies()
+        print(f" - {stats.name}: 호출 {stats.calls}건 (오류 {stats.errors}), 헤지 {stats.hedged}건 (헤지 응답 사용 {stats.hedge_wins}), "
+              f"상위 모델 전환 {stats.escalated}건, 지연 p50/p95/p99 {_percentile(ordered, 50) * 1000:.0f}/"
+              f"{_percentile(ordered, 95) * 1000:.0f}/{_percentile(ordered, 99) * 1000:.0f}ms, "
+              f"추정 토큰 {stats.tokens:,} (약 ${stats.cost:.4f})")
+
+
+def add_tier_stats(run_summary):
+    """모델별 호출/헤지/상위 모델 전환 횟수를 실행 요약에 기록합니다."""
+    with _stats_lock:
+        all_stats = list(_stats.values())
+    for stats in all_stats:
+        run_summary.set(f"[{stats.name}] 호출", stats.calls)
+        run_summary.set(f"[{stats.name}] 헤지", stats.hedged)
+        run_summary.set(f"[{stats.name}] 상위 모델 전환", stats.escalated)
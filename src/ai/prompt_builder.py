@@ -21,10 +21,37 @@ def build_voc_type_prompt(voc_content, voc_action, valid_types):
         f"- 조치계획: {voc_action}\n\n"
         "VOC 유형은 아래 목록 중에서 가장 적절한 것을 하나만 선택하세요:\n"
         f"{', '.join(valid_types)}\n"
-        "선택한 VOC 유형과 그 이유를 설명해주세요.\n\n"
+        "선택한 VOC 유형, 0~1 사이의 확신도, 그 이유를 JSON으로 답하세요.\n\n"
         "형식:\n"
-        "VOC 유형: [여기에 유형]\n"
-        "이유: [여기에 이유]\n"
+        '{"voc_type": "[여기에 유형]", "confidence": [0~1], "reason": "[여기에 이유]"}\n'
+    )
+
+    return prompt
+
+
+def build_voc_type_retry_prompt(items, valid_types):
+    """
+    첫 응답을 해석할 수 없었거나 확신도가 낮았던 VOC들을 한 번에 재분류하기 위한 압축 프롬프트를 생성합니다.
+
+    Parameters:
+        items (List[Tuple[int, str, str]]): (row_id, VOC 내용, 조치계획) 목록
+        valid_types (List[str]): 분류 가능한 VOC 유형 목록
+
+    Returns:
+        str: LLM에게 전달할 프롬프트 문자열
+    """
+    lines = []
+    for row_id, voc_content, voc_action in items:
+        voc_content = voc_content.strip() if voc_content else ""
+        voc_action = voc_action.strip() if voc_action else ""
+        lines.append(f"[{row_id}] 내용: {voc_content} / 조치계획: {voc_action}")
+
+    prompt = (
+        "다음 VOC 각각에 대해 VOC 유형을 아래 목록 중 하나로만 선택하세요:\n"
+        f"{', '.join(valid_types)}\n\n"
+        + "\n".join(lines) + "\n\n"
+        "각 VOC의 번호(row_id), 유형, 0~1 사이의 확신도, 짧은 이유를 JSON 배열로 답하세요.\n"
+        '형식: [{"row_id": 번호, "voc_type": "유형", "confidence": 0~1, "reason": "이유"}]\n'
     )
 
     return prompt
@@ -0,0 +1,131 @@
+# voc_clustering.py
+import re
+import zlib
+
+import numpy as np
+
+_TAG_RE = re.compile(r"<[^>]+>")
+_NON_WORD_RE = re.compile(r"[\W_]+")
+
+# MinHash 해시 함수 계수 (실행마다 같은 결과가 나오도록 고정 시드 사용)
+_MERSENNE_PRIME = (1 << 61) - 1
+_MAX_HASH = (1 << 32) - 1
+
+
+def _normalize(text) -> str:
+    """HTML 태그 제거, 소문자 변환, 공백/문장부호 제거"""
+    text = _TAG_RE.sub(" ", str(text or ""))
+    return _NON_WORD_RE.sub("", text).lower()
+
+
+def shingles(text, size: int = 3) -> set[str]:
+    """
+    정규화한 텍스트의 문자 n-gram 집합. 한글은 띄어쓰기가 제각각이라 단어 대신 문자 단위로 자릅니다.
+    size보다 짧은 텍스트는 텍스트 전체를 하나의 shingle로 사용합니다.
+    """
+    text = _normalize(text)
+    if not text:
+        return set()
+    if len(text) <= size:
+        return {text}
+    return {text[i:i + size] for i in range(len(text) - size + 1)}
+
+
+def jaccard(a: set, b: set) -> float:
+    if not a or not b:
+        return 0.0
+    return len(a & b) / len(a | b)
+
+
+class _UnionFind:
+    def __init__(self, n):
+        self.parent = list(range(n))
+
+    def find(self, x):
+        while self.parent[x] != x:
+            self.parent[x] = self.parent[self.parent[x]]
+            x = self.parent[x]
+        return x
+
+    def union(self, a, b):
+        ra, rb = self.find(a), self.find(b)
+        if ra != rb:
+            # 작은 번호(먼저 나온 행)를 대표로 유지
+            if rb < ra:
+                ra, rb = rb, ra
+            self.parent[rb] = ra
+
+
+class MinHasher:
+    """
+    shingle 집합을 num_perm개의 최소 해시 값(서명)으로 요약합니다.
+    두 서명에서 같은 위치의 값이 일치하는 비율은 Jaccard 유사도의 추정치입니다.
+    """
+    def __init__(self, num_perm: int = 64, seed: int = 1):
+        rng = np.random.RandomState(seed)
+        self.num_perm = num_perm
+        self._a = rng.randint(1, _MERSENNE_PRIME, size=num_perm, dtype=np.uint64)
+        self._b = rng.randint(0, _MERSENNE_PRIME, size=num_perm, dtype=np.uint64)
+
+    def signature(self, shingle_set: set[str]) -> np.ndarray:
+        hashes = np.fromiter(
+            (zlib.crc32(s.encode("utf-8")) for s in shingle_set), dtype=np.uint64, count=len(shingle_set)
+        )
+        # (a * h + b) mod p 를 해시 함수별로 계산 후 최솟값 (uint64 오버플로는 해시 섞기로 허용)
+        permuted = (np.outer(self._a, hashes) + self._b[:, None]) % _MERSENNE_PRIME
+        return (permuted & _MAX_HASH).min(axis=1)
+
+
+def cluster_near_duplicates(texts: dict, threshold: float = 0.8, num_perm: int = 64) -> list[list]:
+    """
+    유사한(문자 shingle Jaccard 유사도 threshold 이상) 텍스트끼리 묶습니다.
+
+    MinHash 서명을 밴드로 나눈 LSH 버킷에서 같은 버킷에 들어간 쌍만 후보로 보고,
+    후보 쌍은 실제 Jaccard 유사도로 한 번 더 확인한 뒤 union-find로 병합합니다.
+
+    Args:
+        texts (dict): 키(행 인덱스) -> 비교할 텍스트. 입력 순서가 유지됩니다.
+        threshold (float): 같은 군집으로 볼 최소 유사도 (0~1)
+        num_perm (int): MinHash 해시 함수 수
+
+    Returns:
+        list[list]: 군집별 키 목록. 각 군집의 첫 번째 키가 대표(가장 먼저 나온 행)이며,
+                    군집은 대표의 입력 순서대로 정렬됩니다. 텍스트가 비어 있으면 단독 군집입니다.
+    """
+    keys = list(texts.keys())
+    shingle_sets = [shingles(texts[k]) for k in keys]
+    uf = _UnionFind(len(keys))
+
+    # 임계값에 맞춰 밴드 수 결정: 밴드 b개 x 행 r개, 후보가 되는 유사도 기준 ≈ (1/b)^(1/r)
+    # (임계값 근처 쌍을 놓치지 않도록 후보 기준은 임계값보다 낮게 잡고, 실제 유사도로 다시 확인)
+    rows_per_band = 1
+    for r in range(1, num_perm + 1):
+        if num_perm % r == 0 and (1 / (num_perm // r)) ** (1 / r) <= threshold * 0.85:
+            rows_per_band = r
+    bands = num_perm // rows_per_band
+
+    hasher = MinHasher(num_perm)
+    buckets = {}
+    for i, s in enumerate(shingle_sets):
+        if not s:
+            continue
+        sig = hasher.signature(s)
+        for band in range(bands):
+            band_key = (band, sig[band * rows_per_band:(band + 1) * rows_per_band].tobytes())
+            buckets.setdefault(band_key, []).append(i)
+
+    checked = set()
+    for members in buckets.values():
+        for pos, j in enumerate(members):
+            for i in members[:pos]:
+                # 이미 같은 군집이거나 다른 밴드에서 확인한 쌍은 건너뜀
+                if uf.find(i) == uf.find(j) or (i, j) in checked:
+                    continue
+                checked.add((i, j))
+                if jaccard(shingle_sets[i], shingle_sets[j]) >= threshold:
+                    uf.union(i, j)
+
+    clusters = {}
+    for i in range(len(keys)):
+        clusters.setdefault(uf.find(i), []).append(keys[i])
+    return [clusters[root] for root in sorted(clusters)]
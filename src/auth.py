@@ -1,8 +1,13 @@
 # src/auth/auth.py
+import json
+import os
+import time
 import requests
 from src.db.repository import Repository 
+from src.resilience import get_caller, CircuitOpenError
+from src.form_constraints import update_form_constraints
 from src.config.config import (
-    login_url, login_data, voc_url
+    login_url, login_data, voc_url, AUTH_CACHE_PATH, AUTH_CACHE_TTL_SECONDS
 )
 
 class AuthService:
@@ -23,10 +28,13 @@ class AuthService:
         self.login_url = login_url
         self.login_data = login_data
         self.voc_url = voc_url
+        self.voc_page_html = None # 마지막으로 불러온 VOC 화면 (폼 제약 파싱에 사용)
 
     def authenticate(self) -> bool:
         """
         제공된 login_id가 시스템의 승인된(SM, ADMIN) 사용자 목록에 있는지 확인합니다.
+        DB에서는 해당 member_id 한 건만 조회하며, 승인 결과는 AUTH_CACHE_TTL_SECONDS 동안
+        로컬 캐시에 저장되어 반복 실행(MCP 호출 포함) 시 DB 조회를 생략합니다.
         
         Args:
             login_id (str): 인증을 시도하는 사용자의 로그인 ID (empcd에 해당).
@@ -34,24 +42,61 @@ class AuthService:
         Returns:
             bool: login_id가 승인된 사용자 목록에 있으면 True, 그렇지 않으면 False.
         """
+        member_id = self.login_data['swpid']
+        if not member_id:
+            print("❌ 인증 실패: LOGIN_ID가 설정되지 않았습니다.")
+            return False
+
+        cached = self._load_cached_auth(member_id)
+        if cached is not None:
+            print(f"✅ 인증 성공: {member_id} (권한: {cached.get('auth', 'N/A')}, 캐시)")
+            return True
+
         db_repo = Repository() # Repository 클래스의 인스턴스 생성
-        auth_info_list = db_repo.get_auth_info() # 시스템 담당자 정보 조회
+        auth_record = db_repo.get_auth_member(member_id) # 해당 담당자 정보만 조회
 
-        if not auth_info_list:
-            print("❗ 경고: 데이터베이스에서 인증 정보를 가져오지 못했습니다. 인증 실패로 처리합니다.")
+        if not auth_record:
+            print(f"❌ 인증 실패: {member_id}는 승인된 사용자 목록에 없거나 인증 정보를 가져오지 못했습니다.")
             return False
 
-        # 조회된 인증 정보 리스트를 순회하며 login_id와 일치하는 member_id가 있는지 확인
-        # auth_info_list의 각 딕셔너리는 {'member_id': '...', 'empcd': '...', ...} 형태일 것임
-        for auth_record in auth_info_list:
-            # get_auth_info SQL 쿼리 결과를 보면 member_id 컬럼을 조회하고 있으므로,
-            # auth_record.get('member_id')를 사용하여 비교합니다.
-            if auth_record.get('member_id') == self.login_data['swpid']:
-                print(f"✅ 인증 성공: {self.login_data['swpid']} (권한: {auth_record.get('auth', 'N/A')})")
-                return True
-        
-        print(f"❌ 인증 실패: {self.login_data['swpid']}는 승인된 사용자 목록에 없습니다.")
-        return False
+        print(f"✅ 인증 성공: {member_id} (권한: {auth_record.get('auth', 'N/A')})")
+        self._save_cached_auth(member_id, auth_record.get('auth'))
+        return True
+
+    @staticmethod
+    def _load_cached_auth(member_id) -> dict | None:
+        """TTL 안의 승인 캐시가 있으면 반환합니다. (거부 결과는 캐시하지 않음)"""
+        if AUTH_CACHE_TTL_SECONDS <= 0 or not os.path.exists(AUTH_CACHE_PATH):
+            return None
+        try:
+            with open(AUTH_CACHE_PATH, "r", encoding="utf-8") as f:
+                entry = json.load(f).get(member_id)
+        except (OSError, ValueError):
+            return None
+        if not entry or time.time() - entry.get('checked_at', 0) > AUTH_CACHE_TTL_SECONDS:
+            return None
+        return entry
+
+    @staticmethod
+    def _save_cached_auth(member_id, auth):
+        if AUTH_CACHE_TTL_SECONDS <= 0:
+            return
+        try:
+            cache = {}
+            if os.path.exists(AUTH_CACHE_PATH):
+                with open(AUTH_CACHE_PATH, "r", encoding="utf-8") as f:
+                    cache = json.load(f)
+            now = time.time()
+            # 만료된 항목은 정리
+            cache = {k: v for k, v in cache.items() if now - v.get('checked_at', 0) <= AUTH_CACHE_TTL_SECONDS}
+            cache[member_id] = {'auth': auth, 'checked_at': now}
+            os.makedirs(os.path.dirname(AUTH_CACHE_PATH) or '.', exist_ok=True)
+            tmp_path = f"{AUTH_CACHE_PATH}.tmp"
+            with open(tmp_path, "w", encoding="utf-8") as f:
+                json.dump(cache, f, ensure_ascii=False)
+            os.replace(tmp_path, AUTH_CACHE_PATH)
+        except (OSError, ValueError) as e:
+            print(f"경고: 인증 캐시 저장 실패: {e}")
 
     def login_and_fetch_voc_page(self) -> requests.Session | None: # 반환 타입 힌트 변경
         """
@@ -62,20 +107,24 @@ class AuthService:
         Returns:
             requests.Session | None: VOC 페이지를 성공적으로 불러온 requests.Session 객체 또는 실패 시 None.
         """
+        caller = get_caller('login')
         try:
             # 로그인 요청
             print(f"로그인 URL: {self.login_url}")
             # print(f"로그인 데이터: {self.login_data['id']}") # 비밀번호 노출 주의
-            response = self.session.post(self.login_url, data=self.login_data)
+            response = caller.call(self.session.post, self.login_url, data=self.login_data)
 
             # 로그인 성공 여부 확인
             if response.ok and "로그인" not in response.text: # '로그인' 문자열이 응답에 없으면 성공으로 간주
                 print("✅ 로그인 성공!")
                 # VOC 페이지 요청
                 print(f"VOC 페이지 요청 URL: {self.voc_url}")
-                response = self.session.get(self.voc_url)
+                response = caller.call(self.session.get, self.voc_url)
                 if response.ok:
                     print("📄 VOC 화면 불러오기 성공")
+                    # 등록 폼 정의(필드, 최대 길이, 선택 값)를 캐시하여 전송 전 로컬 확인에 사용
+                    self.voc_page_html = response.text
+                    update_form_constraints(self.voc_page_html)
                     # VOC 화면을 불러온 세션을 반환
                     return self.session
                 else:
@@ -88,6 +137,9 @@ class AuthService:
                 print(f"응답 상태: {response.status_code}, 응답 내용 일부: {response.text[:200]}...")
                 return None # 실패 시 None 반환
 
+        except CircuitOpenError as e:
+            print(e)
+            return None
         except requests.exceptions.ConnectionError as e:
             print(f"❌ 연결 오류 발생: {e}")
             return None
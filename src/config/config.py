@@ -36,6 +36,9 @@ VOC_RECV_TYPE_FILE_PATH = os.getenv("VOC_RECV_TYPE_FILE_PATH")
 VOC_SERVICE_FILE_PATH = os.getenv("VOC_SERVICE_FILE_PATH")
 # VOC 등록자료 위치
 VOC_DATA_FILE_PATH = os.getenv("VOC_DATA_FILE_PATH")
+# 데몬 모드(--watch)에서 처리 완료/실패한 파일을 옮길 폴더
+VOC_ARCHIVE_DIR = os.getenv("VOC_ARCHIVE_DIR", "data/archive")
+VOC_FAILED_DIR = os.getenv("VOC_FAILED_DIR", "data/failed")
 
 #VOC 매핑 컬럼명
 VOC_TYPE_KEY = os.getenv("VOC_TYPE_KEY")
@@ -49,6 +52,52 @@ VOC_SERVICE_VALUE = os.getenv("VOC_SERVICE_VALUE")
 #SQL 파일 경로 설정
 GET_INSA_INFO_SQL_PATH = "src/db/sql/insa.sql"
 GET_AUTH_INFO_SQL_PATH = "src/db/sql/auth.sql"
+GET_REGISTERED_VOC_SQL_PATH = "src/db/sql/registered_voc.sql"
+
+# ✅ 유효성 검증 리포트 설정
+# 검증 오류 상세 내역(CSV)을 저장할 폴더와 콘솔에 출력할 오류 유형별 예시 수
+VALIDATION_REPORT_DIR = os.getenv("VALIDATION_REPORT_DIR", "log/")
+VALIDATION_MAX_EXAMPLES = int(os.getenv("VALIDATION_MAX_EXAMPLES", "5"))
+
+# ✅ 샤드 병렬 실행 설정 (main.py --workers)
+# 샤드 하나의 최소 행 수 (작은 파일은 프로세스 간 전달 비용이 더 크므로 샤드를 잘게 나누지 않음)
+SHARD_MIN_ROWS = int(os.getenv("SHARD_MIN_ROWS", "2000"))
+
+# ✅ 스트림 모드(main.py --stream) 설정
+# 단계 사이 큐에 쌓아둘 최대 묶음 수 (가득 차면 앞 단계가 기다림)
+STREAM_QUEUE_SIZE = int(os.getenv("STREAM_QUEUE_SIZE", "20"))
+# 한 번에 다음 단계로 넘기는 행 수
+STREAM_CHUNK_ROWS = int(os.getenv("STREAM_CHUNK_ROWS", "50"))
+
+# ✅ 프로파일 모드(main.py --profile) 설정
+# 단계별 .prof 파일과 메모리 리포트를 저장할 폴더 (실행마다 profile_<timestamp> 하위 폴더 생성)
+PROFILE_DIR = os.getenv("PROFILE_DIR", "log/")
+# 메모리 리포트/요약에 표시할 상위 할당 위치 및 함수 수
+PROFILE_TOP_ALLOCATIONS = int(os.getenv("PROFILE_TOP_ALLOCATIONS", "20"))
+
+# ✅ 데몬 모드(--watch) 설정
+DAEMON_MAX_CONCURRENT_FILES = int(os.getenv("DAEMON_MAX_CONCURRENT_FILES", "2"))  # 동시에 처리할 최대 파일 수
+DAEMON_POLL_INTERVAL = float(os.getenv("DAEMON_POLL_INTERVAL", "10"))             # 폴더 재스캔 주기(초)
+DAEMON_STABLE_SECONDS = float(os.getenv("DAEMON_STABLE_SECONDS", "3"))            # 파일 크기가 이 시간 동안 변하지 않아야 처리
+DAEMON_SESSION_MAX_AGE = float(os.getenv("DAEMON_SESSION_MAX_AGE", "1800"))       # 로그인 세션 재사용 최대 시간(초)
+DAEMON_DB_POOL_MAX = int(os.getenv("DAEMON_DB_POOL_MAX", "4"))                    # 데몬 DB 연결 풀 최대 크기
+
+# ✅ 중복 검사 설정
+# 전송 성공한 VOC의 중복 판단 키를 누적하는 로컬 이력 인덱스 파일
+VOC_DEDUP_HISTORY_PATH = os.getenv("VOC_DEDUP_HISTORY_PATH", "log/voc_registered_index.txt")
+# Y로 설정하면 요청일시 범위로 DB의 기존 등록 건도 함께 조회하여 중복을 검사
+VOC_DEDUP_CHECK_DB = os.getenv("VOC_DEDUP_CHECK_DB", "N").strip().upper() == "Y"
+
+# ✅ VOC Excel 파일(.xlsx/.xls)에서 읽을 시트 이름 (비어 있으면 첫 번째 시트)
+VOC_EXCEL_SHEET_NAME = os.getenv("VOC_EXCEL_SHEET_NAME", "")
+
+# ✅ VOC 화면 폼 제약 캐시 (필드별 최대 길이, 선택 값). 로그인 후 VOC 화면을 불러올 때마다 갱신
+FORM_CONSTRAINTS_CACHE_PATH = os.getenv("FORM_CONSTRAINTS_CACHE_PATH", "log/voc_form_constraints.json")
+
+# ✅ 권한 확인 캐시 설정
+# 승인된 사용자 확인 결과를 로컬에 저장해 두고 TTL 동안 DB 조회를 생략 (0이면 캐시 사용 안 함)
+AUTH_CACHE_PATH = os.getenv("AUTH_CACHE_PATH", "log/auth_cache.json")
+AUTH_CACHE_TTL_SECONDS = int(os.getenv("AUTH_CACHE_TTL_SECONDS", "600"))
 
 # 로그인 데이터
 login_data = {
@@ -66,16 +115,66 @@ try:
 except Exception as e:
     print(f"오류: Gemini API 설정 중 문제가 발생했습니다: {e}")
 
-GEMINI_MODEL = genai.GenerativeModel('gemini-1.5-flash')
+# ✅ Gemini 모델 단계(tier): 쉼표로 구분하여 가벼운 모델부터 나열
+# 앞 단계 모델의 확신도가 GEMINI_MIN_CONFIDENCE 미만이면 다음(더 강한) 모델로 다시 분류하고, 재시도(다건) 분류는 마지막 모델을 사용
+GEMINI_MODEL_TIERS = [name.strip() for name in os.getenv("GEMINI_MODEL_TIERS", "gemini-1.5-flash").split(",") if name.strip()] or ["gemini-1.5-flash"]
+# 모델 단계별 입력 토큰 100만 개당 비용(USD, 쉼표 구분, GEMINI_MODEL_TIERS 순서). 실행 후 모델별 비용 추정에만 사용
+GEMINI_MODEL_COSTS = [float(v) for v in os.getenv("GEMINI_MODEL_COSTS", "").split(",") if v.strip()]
+GEMINI_TIER_MODELS = [genai.GenerativeModel(name) for name in GEMINI_MODEL_TIERS]
+GEMINI_MODEL = GEMINI_TIER_MODELS[0]
+
+# ✅ Gemini 헤지 요청: 응답이 모델별로 관측된 지연 백분위(p95)를 넘으면 같은 요청을 한 번 더 보내 먼저 온 응답을 사용
+GEMINI_HEDGE_ENABLED = os.getenv("GEMINI_HEDGE_ENABLED", "Y").strip().upper() == "Y"
+GEMINI_HEDGE_PERCENTILE = float(os.getenv("GEMINI_HEDGE_PERCENTILE", "95"))
+# 지연 표본이 이 수만큼 쌓인 뒤부터 헤지 (그 전에는 기준 지연을 알 수 없음)
+GEMINI_HEDGE_MIN_SAMPLES = int(os.getenv("GEMINI_HEDGE_MIN_SAMPLES", "20"))
+# 모델별 전체 호출 대비 헤지 호출의 최대 비율 (사용량 제한 여유가 있어도 이 비율을 넘지 않음)
+GEMINI_HEDGE_MAX_RATIO = float(os.getenv("GEMINI_HEDGE_MAX_RATIO", "0.1"))
 
-# ✅ 프리티어 제한 모드 여부 설정
-USE_FREE_TIER = True
+# ✅ VOC유형 추론 설정
+# 이 값 미만의 확신도로 분류된 행은 재시도 대상이 됨
+GEMINI_MIN_CONFIDENCE = float(os.getenv("GEMINI_MIN_CONFIDENCE", "0.7"))
+# 재시도 시 한 번의 호출로 재분류할 최대 행 수
+GEMINI_RETRY_BATCH_SIZE = int(os.getenv("GEMINI_RETRY_BATCH_SIZE", "20"))
+# Y이면 VOC내용/조치계획이 거의 같은 행을 군집으로 묶어 대표 행만 호출하고 결과를 군집 전체에 반영
+GEMINI_CLUSTER_ENABLED = os.getenv("GEMINI_CLUSTER_ENABLED", "Y").strip().upper() == "Y"
+# 같은 군집으로 볼 최소 유사도 (문자 3-gram Jaccard, 0~1)
+GEMINI_CLUSTER_THRESHOLD = float(os.getenv("GEMINI_CLUSTER_THRESHOLD", "0.8"))
+
+# ✅ 추론 감사 로그 (JSONL, 백그라운드 기록) 및 이전 예측 색인
+INFER_LOG_DIR = os.getenv("INFER_LOG_DIR", "log/")
+# 감사 로그를 디스크에 반영(flush + fsync)하는 주기(초). 비정상 종료 시 이 시간 이내의 기록만 잃음
+INFER_LOG_FLUSH_SECONDS = float(os.getenv("INFER_LOG_FLUSH_SECONDS", "2"))
+# 행 해시(VOC내용 + 조치계획)와 요청일 기준 예측 색인 (sqlite)
+INFER_INDEX_PATH = os.getenv("INFER_INDEX_PATH", "log/voc_infer_index.sqlite3")
+# Y이면 내용이 같은 행의 이전 예측(확신도 GEMINI_MIN_CONFIDENCE 이상)을 Gemini 호출 없이 재사용
+GEMINI_REUSE_PREDICTIONS = os.getenv("GEMINI_REUSE_PREDICTIONS", "Y").strip().upper() == "Y"
+
+# ✅ 프리티어 제한 모드 여부 설정 (N이면 RPM/RPD/TPM 제한을 확인하지 않음, 예: 유료 요금제 또는 부하 테스트)
+USE_FREE_TIER = os.getenv("GEMINI_USE_FREE_TIER", "Y").strip().upper() == "Y"
 
 # 제한 설정
 MAX_RPM = 15
 MAX_RPD = 1500
 MAX_TPM = 1_000_000
+# 분/일 사용량 카운터 저장 위치 (다시 실행해도 같은 날의 일일 사용량을 이어서 계산)
+GEMINI_QUOTA_STATE_PATH = os.getenv("GEMINI_QUOTA_STATE_PATH", "log/gemini_quota_state.json")
+# 일일 사용량(RPD)이 초기화되는 시간대 (Gemini 일일 할당량은 태평양 시간 0시에 초기화, IANA 시간대 이름)
+GEMINI_QUOTA_RESET_TZ = os.getenv("GEMINI_QUOTA_RESET_TZ", "America/Los_Angeles")
+
+# ✅ 할당량 기반 추론 스케줄러
+# 제한에 걸렸을 때 다음 구간이 이 시간(초) 안에 열리면 기다렸다가 이어서 추론, 아니면 남은 행을 대기열에 저장
+GEMINI_SCHEDULER_MAX_WAIT = float(os.getenv("GEMINI_SCHEDULER_MAX_WAIT", "90"))
+# 할당량 부족으로 추론하지 못한 행의 대기열 (다음 실행/데몬이 할당량이 생기면 이어서 처리)
+GEMINI_PENDING_QUEUE_PATH = os.getenv("GEMINI_PENDING_QUEUE_PATH", "log/voc_pending_inference.csv")
 
+# ✅ 외부 호출 재시도/회로 차단 설정 (VOC 등록 API, 로그인, Gemini 공통)
+RETRY_MAX_ATTEMPTS = int(os.getenv("RETRY_MAX_ATTEMPTS", "4"))
+RETRY_BASE_DELAY = float(os.getenv("RETRY_BASE_DELAY", "1.0"))      # 초
+RETRY_MAX_DELAY = float(os.getenv("RETRY_MAX_DELAY", "30"))         # 초
+CIRCUIT_FAILURE_THRESHOLD = int(os.getenv("CIRCUIT_FAILURE_THRESHOLD", "5"))
+CIRCUIT_RESET_TIMEOUT = float(os.getenv("CIRCUIT_RESET_TIMEOUT", "60"))  # 초
+CIRCUIT_MAX_OPEN_CYCLES = int(os.getenv("CIRCUIT_MAX_OPEN_CYCLES", "3"))
 
 # Requests 세션 초기화
 session = requests.Session()
\ No newline at end of file
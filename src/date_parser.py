@@ -0,0 +1,104 @@
+# src/date_parser.py
+import re
+
+import pandas as pd
+
+# 현장에서 입력하는 날짜 형식 그룹
+#  - 구분자형: 2025-08-01 14:00, 2025.08.01, 2025/8/1 14:00:00, 2025년 8월 1일 14시 ...
+#  - 숫자 8자리: 20250801
+#  - Excel 일련번호: 45870, 45870.5833
+_DELIMITED_RE = (
+    r'^(?P<y>\d{4})\s*(?:[-./]|년)\s*(?P<m>\d{1,2})\s*(?:[-./]|월)\s*(?P<d>\d{1,2})\s*(?:일)?\.?'
+    r'(?:[\sT]+(?P<H>\d{1,2})\s*(?::|시)\s*(?P<M>\d{1,2})?\s*(?:분)?(?:\s*:?\s*(?P<S>\d{1,2})\s*(?:초)?)?)?$'
+)
+_COMPACT_RE = r'^\d{8}$'
+_SERIAL_RE = r'^\d{1,7}(?:\.\d+)?$'
+_EXCEL_ORIGIN = '1899-12-30'
+_EXCEL_MAX_SERIAL = 2958465  # 9999-12-31
+
+# 문자열 -> Timestamp(또는 NaT) 메모이제이션 (월별 파일에서 같은 일시가 반복되는 경우가 많음)
+_PARSE_CACHE = {}
+_PARSE_CACHE_MAX = 200_000
+
+
+def _parse_unique(values: pd.Series) -> pd.Series:
+    """
+    고유 문자열들을 형식 그룹별로 나누어 그룹마다 한 번의 벡터화된 호출로 파싱합니다.
+    어느 그룹에도 속하지 않는 값만 개별적으로 형식 추론을 시도합니다.
+    """
+    result = pd.Series(pd.NaT, index=values.index, dtype='datetime64[ns]')
+    remaining = pd.Series(True, index=values.index)
+
+    # 1. 구분자형: 정규식으로 분해 후 0 채움 정규형으로 만들어 단일 형식으로 파싱
+    parts = values.str.extract(_DELIMITED_RE)
+    matched = parts['y'].notna()
+    if matched.any():
+        p = parts[matched].fillna({'H': '0', 'M': '0', 'S': '0'})
+        canonical = (
+            p['y'] + '-' + p['m'].str.zfill(2) + '-' + p['d'].str.zfill(2) + ' '
+            + p['H'].str.zfill(2) + ':' + p['M'].str.zfill(2) + ':' + p['S'].str.zfill(2)
+        )
+        result[matched] = pd.to_datetime(canonical, format='%Y-%m-%d %H:%M:%S', errors='coerce')
+        remaining &= ~matched
+
+    # 2. 숫자 8자리 (YYYYMMDD)
+    compact = remaining & values.str.fullmatch(_COMPACT_RE)
+    if compact.any():
+        result[compact] = pd.to_datetime(values[compact], format='%Y%m%d', errors='coerce')
+        remaining &= ~compact
+
+    # 3. Excel 일련번호
+    serial = remaining & values.str.fullmatch(_SERIAL_RE)
+    if serial.any():
+        numbers = values[serial].astype(float)
+        numbers = numbers.where((numbers >= 1) & (numbers <= _EXCEL_MAX_SERIAL))
+        parsed = pd.to_datetime(numbers, unit='D', origin=_EXCEL_ORIGIN, errors='coerce')
+        result[serial] = parsed.dt.round('s')
+        remaining &= ~serial
+
+    # 4. 그 외 드문 형식은 개별 추론 (실패 시 NaT)
+    for idx in values.index[remaining]:
+        try:
+            result[idx] = pd.to_datetime(values[idx])
+        except (ValueError, TypeError, OverflowError):
+            pass
+
+    return result
+
+
+def parse_datetime_column(series: pd.Series) -> tuple[pd.Series, pd.Series]:
+    """
+    날짜/시간 컬럼 전체를 파싱합니다.
+
+    Args:
+        series (pd.Series): 원본 날짜 컬럼 (문자열, 숫자, datetime 혼합 가능)
+
+    Returns:
+        tuple[pd.Series, pd.Series]:
+            (파싱된 Timestamp 시리즈 - 빈 값/실패는 NaT, 값이 있지만 파싱에 실패한 행의 bool 마스크)
+    """
+    if pd.api.types.is_datetime64_any_dtype(series):
+        return series, pd.Series(False, index=series.index)
+
+    text = series.where(series.notna(), '').astype(str).str.strip()
+    blank = text.eq('') | text.str.lower().isin(['nan', 'nat', 'none'])
+
+    uniques = pd.unique(text[~blank])
+    missing = [v for v in uniques if v not in _PARSE_CACHE]
+    if missing:
+        if len(_PARSE_CACHE) + len(missing) > _PARSE_CACHE_MAX:
+            _PARSE_CACHE.clear()
+        parsed = _parse_unique(pd.Series(missing, dtype=object))
+        _PARSE_CACHE.update(zip(missing, parsed.tolist()))
+
+    result = pd.to_datetime(text.where(~blank).map(_PARSE_CACHE), errors='coerce')
+    invalid = ~blank & result.isna()
+    return result, invalid
+
+
+def format_datetime_column(series: pd.Series, fmt: str = '%Y-%m-%d %H:%M:%S') -> pd.Series:
+    """
+    날짜/시간 컬럼을 파싱하여 fmt 형식 문자열로 변환합니다. 빈 값이나 파싱 실패는 빈 문자열입니다.
+    """
+    parsed, _ = parse_datetime_column(series)
+    return parsed.dt.strftime(fmt).fillna('')
@@ -1,14 +1,21 @@
 import psycopg2
+import threading
 from psycopg2 import Error
+from psycopg2 import pool as pg_pool
 import os
 
 # config.py에서 DB 접속 정보 임포트
-from src.config.config import DB_HOST, DB_PORT, DB_NAME, DB_USER, DB_PASSWORD, GET_INSA_INFO_SQL_PATH, GET_AUTH_INFO_SQL_PATH
+from src.config.config import DB_HOST, DB_PORT, DB_NAME, DB_USER, DB_PASSWORD, GET_INSA_INFO_SQL_PATH, GET_AUTH_INFO_SQL_PATH, GET_REGISTERED_VOC_SQL_PATH
 
 class Repository:
     """
     데이터베이스 연결 및 데이터 조회 작업을 캡슐화하는 클래스입니다.
     """
+    # 단건 권한 조회 쿼리 (auth.sql을 한 번만 읽어 파라미터 쿼리로 만들어 재사용)
+    _auth_member_query = None
+    # 데몬 모드 등 장시간 실행 시 사용하는 연결 풀 (init_pool 호출 전에는 매번 새로 연결)
+    _pool = None
+    _pool_lock = threading.Lock()
     def __init__(self):
         # 클래스 초기화 시 DB 접속 정보가 config에 정의되어 있는지 확인
         # 모든 필수 정보가 없으면 경고 메시지 출력
@@ -16,11 +23,59 @@ class Repository:
             print("❌ 오류: config.py에 데이터베이스 접속 정보가 누락되었습니다.")
             # 실제 운영 환경에서는 여기서 더 강력한 예외 처리를 고려할 수 있습니다.
 
+    @classmethod
+    def init_pool(cls, minconn=1, maxconn=4):
+        """
+        스레드 안전한 연결 풀을 생성합니다. 이후 get_db_connection은 풀에서 연결을 빌려옵니다.
+        """
+        with cls._pool_lock:
+            if cls._pool is not None:
+                return
+            try:
+                cls._pool = pg_pool.ThreadedConnectionPool(
+                    minconn, maxconn,
+                    host=DB_HOST,
+                    database=DB_NAME,
+                    user=DB_USER,
+                    password=DB_PASSWORD,
+                    port=DB_PORT
+                )
+                print(f"Database connection pool created ({minconn}~{maxconn}).")
+            except Error as e:
+                print(f"❌ 데이터베이스 연결 풀 생성 오류: {e}")
+
+    @classmethod
+    def close_pool(cls):
+        with cls._pool_lock:
+            if cls._pool is not None:
+                cls._pool.closeall()
+                cls._pool = None
+                print("Database connection pool closed.")
+
+    def release_connection(self, conn):
+        """
+        get_db_connection으로 얻은 연결을 반납합니다. 풀을 사용 중이면 풀에 돌려주고, 아니면 닫습니다.
+        """
+        if self._pool is not None:
+            if not conn.closed:
+                conn.rollback() # 조회 트랜잭션을 정리한 뒤 반납
+            self._pool.putconn(conn)
+            print("Database connection returned to pool.")
+        else:
+            conn.close()
+            print("Database connection closed.")
+
     def get_db_connection(self):
         """
         PostgreSQL 데이터베이스 연결을 설정하고 반환합니다.
         """
         conn = None
+        if self._pool is not None:
+            try:
+                return self._pool.getconn()
+            except Error as e:
+                print(f"❌ 데이터베이스 연결 풀 오류: {e}")
+                return None
         try:
             print(f"Connecting to the PostgreSQL database '{DB_NAME}'...")
             conn = psycopg2.connect(
@@ -80,8 +135,7 @@ class Repository:
                 cursor.close()
                 print("Cursor closed.")
             if conn:
-                conn.close()
-                print("Database connection closed.")
+                self.release_connection(conn)
 
     def get_auth_info(self):
         """
@@ -130,5 +184,111 @@ class Repository:
                 cursor.close()
                 print("Cursor closed.")
             if conn:
-                conn.close()
-                print("Database connection closed.")
\ No newline at end of file
+                self.release_connection(conn)
+
+    def get_registered_voc(self, start_date, end_date):
+        """
+        PostgreSQL 데이터베이스에서 요청일시가 [start_date, end_date) 범위인 기존 등록 VOC를 조회합니다.
+        SQL 파일은 %(start_date)s, %(end_date)s 파라미터를 사용하고
+        request_empnm, request_date, voc_contents 컬럼을 반환해야 합니다.
+        """
+        conn = None
+        cursor = None
+        voc_records = []
+
+        try:
+            conn = self.get_db_connection()
+            if not conn:
+                return []
+
+            cursor = conn.cursor()
+
+            sql_file_path = GET_REGISTERED_VOC_SQL_PATH
+            try:
+                with open(sql_file_path, "r", encoding="utf-8") as f:
+                    sql_query = f.read()
+            except FileNotFoundError:
+                print(f"오류: '{sql_file_path}' 파일을 찾을 수 없습니다. SQL 파일을 확인해주세요.")
+                return []
+
+            print(f"Executing SQL query from '{sql_file_path}' for 기존 등록 VOC ({start_date} ~ {end_date})...")
+            cursor.execute(sql_query, {"start_date": start_date, "end_date": end_date})
+
+            column_names = [desc[0] for desc in cursor.description]
+            for row in cursor.fetchall():
+                voc_records.append(dict(zip(column_names, row)))
+
+            print(f"Query executed successfully. Found {len(voc_records)} registered VOC records.")
+
+            return voc_records
+
+        except Error as e:
+            print(f"Error executing SQL query for 기존 등록 VOC: {e}")
+            if conn:
+                conn.rollback() # 오류 발생 시 롤백
+            return []
+        finally:
+            if cursor:
+                cursor.close()
+                print("Cursor closed.")
+            if conn:
+                self.release_connection(conn)
+
+    @classmethod
+    def _get_auth_member_query(cls):
+        """
+        auth.sql을 서브쿼리로 감싸 member_id 한 건만 조회하는 파라미터 쿼리를 만들고 캐시합니다.
+        """
+        if cls._auth_member_query is None:
+            with open(GET_AUTH_INFO_SQL_PATH, "r", encoding="utf-8") as f:
+                base_query = f.read().strip().rstrip(';')
+            # 파라미터 바인딩 시 원본 SQL의 '%' 문자가 자리표시자로 해석되지 않도록 이스케이프
+            base_query = base_query.replace('%', '%%')
+            cls._auth_member_query = (
+                f"SELECT * FROM ({base_query}) auth_info WHERE auth_info.member_id = %(member_id)s LIMIT 1"
+            )
+        return cls._auth_member_query
+
+    def get_auth_member(self, member_id):
+        """
+        PostgreSQL 데이터베이스에서 member_id 한 명의 권한(auth) 정보만 조회합니다.
+        조건은 auth.sql과 동일하며(active_yn = 'Y', auth가 'SM' 또는 'ADMIN'), 전체 목록을 가져오지 않습니다.
+
+        Returns:
+            dict | None: 승인된 사용자면 권한 정보 딕셔너리, 없거나 조회 오류 시 None
+        """
+        conn = None
+        cursor = None
+
+        try:
+            try:
+                sql_query = self._get_auth_member_query()
+            except FileNotFoundError:
+                print(f"오류: '{GET_AUTH_INFO_SQL_PATH}' 파일을 찾을 수 없습니다. SQL 파일을 확인해주세요.")
+                return None
+
+            conn = self.get_db_connection()
+            if not conn:
+                return None
+
+            cursor = conn.cursor()
+            print(f"Executing SQL query for 담당자 정보 (member_id={member_id})...")
+            cursor.execute(sql_query, {"member_id": member_id})
+
+            row = cursor.fetchone()
+            if row is None:
+                return None
+            column_names = [desc[0] for desc in cursor.description]
+            return dict(zip(column_names, row))
+
+        except Error as e:
+            print(f"Error executing SQL query for 권한 정보: {e}")
+            if conn:
+                conn.rollback() # 오류 발생 시 롤백
+            return None
+        finally:
+            if cursor:
+                cursor.close()
+                print("Cursor closed.")
+            if conn:
+                self.release_connection(conn)
@@ -0,0 +1,15 @@
+-- 기존 등록 VOC 조회 (VOC_DEDUP_CHECK_DB=Y일 때 중복 검사에 사용, Repository.get_registered_voc)
+--
+-- 템플릿입니다. 테이블/컬럼명을 운영 DB의 VOC 테이블에 맞게 바꿔서 사용하세요.
+-- 반환 컬럼 (별칭 유지 필수):
+--   request_empnm : 제기자 이름
+--   request_date  : 요청일시 (timestamp 또는 'YYYY-MM-DD HH:MI' 형식 문자열)
+--   voc_contents  : VOC내용 (등록 화면에 저장된 HTML 본문 그대로, 중복 검사에서 태그 제거/이스케이프 해제)
+-- 파라미터: start_date 이상, end_date 미만 (psycopg2 이름 있는 파라미터)
+-- 주의: 파라미터 바인딩을 사용하므로 쿼리 본문에 퍼센트 문자를 쓰려면 두 번 써야 합니다.
+SELECT v.request_empnm AS request_empnm,
+       v.request_date  AS request_date,
+       v.voc_contents  AS voc_contents
+  FROM sr_voc v
+ WHERE v.request_date >= %(start_date)s
+   AND v.request_date <  %(end_date)s
@@ -0,0 +1,230 @@
+# src/dedup_voc.py
+import hashlib
+import html
+import os
+import re
+import threading
+import unicodedata
+
+import pandas as pd
+
+from src.config.config import VOC_DEDUP_HISTORY_PATH
+from src.date_parser import parse_datetime_column, format_datetime_column
+
+# 중복 판단 키를 저장하는 내부 컬럼명 (API 폼 데이터에는 포함되지 않음)
+VOC_KEY_COLUMN = '_voc_key'
+# 원본 파일의 Excel 행 번호를 보관하는 내부 컬럼 (행 제외 후 인덱스가 reset되어도 출력/기록에 원래 행 번호 사용)
+EXCEL_ROW_COLUMN = '_excel_row'
+
+_WHITESPACE_RE = re.compile(r"\s+")
+# 데몬 모드에서 여러 파일을 동시에 처리할 때 중복 검사와 이력 기록을 한 번에 하나씩 수행하기 위한 잠금과,
+# 다른 파일 처리에서 중복 검사를 통과하여 아직 처리 중인(이력에 기록되기 전) 키 목록
+_registry_lock = threading.Lock()
+_in_flight_keys = set()
+_HTML_TAG_RE = re.compile(r"<[^>]+>")
+
+
+def _normalize_text(value) -> str:
+    """공백/유니코드 정규화 후 소문자로 변환합니다. NaN이면 빈 문자열."""
+    if value is None or (not isinstance(value, str) and pd.isna(value)):
+        return ''
+    text = unicodedata.normalize('NFC', str(value))
+    return _WHITESPACE_RE.sub(' ', text).strip().lower()
+
+
+def _normalize_datetime(value) -> str:
+    """요청일시를 분 단위 문자열로 정규화합니다. 파싱할 수 없으면 원문을 정규화하여 사용합니다."""
+    text = _normalize_text(value)
+    if not text:
+        return ''
+    return format_datetime_column(pd.Series([text]), '%Y-%m-%d %H:%M').iloc[0] or text
+
+
+def _normalize_content(value, stored: bool = False) -> str:
+    """
+    VOC내용에서 HTML 태그(<p> 등)를 제거한 뒤 정규화합니다.
+    stored=True이면 VOC 화면에 저장된 본문(insert_voc.to_voc_html로 이스케이프됨)으로 보고,
+    태그 제거 후 &lt;, &amp; 등을 원문 문자로 되돌린 다음 파일 행과 같은 방식으로 태그를 제거합니다.
+    """
+    text = _HTML_TAG_RE.sub('', _normalize_text(value))
+    if stored:
+        text = _HTML_TAG_RE.sub('', html.unescape(text))
+    return _normalize_text(text)
+
+
+def _hash_key(requester: str, request_date: str, voc_content: str) -> str:
+    normalized = "\x1f".join([requester, request_date, voc_content])
+    return hashlib.sha1(normalized.encode('utf-8')).hexdigest()
+
+
+def build_voc_key(requester, request_date, voc_content) -> str:
+    """
+    DB에 저장된 제기자, 요청일시, VOC내용을 정규화하여 중복 판단용 해시 키를 생성합니다.
+    VOC내용은 저장 시 이스케이프된 HTML 본문이므로 원문으로 되돌려 파일 행의 키와 같아지도록 합니다.
+    """
+    return _hash_key(
+        _normalize_text(requester),
+        _normalize_datetime(request_date),
+        _normalize_content(voc_content, stored=True),
+    )
+
+
+def add_excel_row_numbers(df_voc):
+    """
+    아직 행을 제외하기 전의 DataFrame에 원본 Excel 행 번호(인덱스 + 2) 컬럼을 추가합니다.
+    이미 있으면(예: 추론 대기열에서 다시 불러온 행) 그대로 둡니다.
+    """
+    if EXCEL_ROW_COLUMN not in df_voc.columns:
+        df_voc[EXCEL_ROW_COLUMN] = df_voc.index + 2
+    return df_voc
+
+
+def excel_row_numbers(df_voc) -> pd.Series:
+    """행 인덱스 -> 원본 Excel 행 번호 (컬럼이 없거나 값이 비어 있으면 인덱스 + 2)"""
+    fallback = pd.Series(df_voc.index + 2, index=df_voc.index)
+    if EXCEL_ROW_COLUMN in df_voc.columns:
+        return df_voc[EXCEL_ROW_COLUMN].fillna(fallback).astype(int)
+    return fallback
+
+
+def add_voc_keys(df_voc):
+    """
+    DataFrame의 각 행에 중복 판단 키 컬럼을 추가합니다.
+    요청일시는 컬럼 단위로 한 번에 파싱합니다.
+    """
+    date_col = df_voc.get('요청일시/등록일시', pd.Series([''] * len(df_voc), index=df_voc.index))
+    normalized_dates = format_datetime_column(date_col, '%Y-%m-%d %H:%M')
+
+    keys = []
+    for (_, row), request_date in zip(df_voc.iterrows(), normalized_dates):
+        keys.append(_hash_key(
+            _normalize_text(row.get('제기자')),
+            request_date or _normalize_text(row.get('요청일시/등록일시')),
+            _normalize_content(row.get('VOC내용')),
+        ))
+    df_voc[VOC_KEY_COLUMN] = keys
+    return df_voc
+
+
+def load_registered_voc_keys(history_path=VOC_DEDUP_HISTORY_PATH) -> set:
+    """
+    로컬 이력 인덱스 파일(한 줄에 키 하나)에서 이미 등록된 VOC 키 집합을 불러옵니다.
+    """
+    if not history_path or not os.path.exists(history_path):
+        return set()
+    with open(history_path, "r", encoding="utf-8") as f:
+        return {line.strip() for line in f if line.strip()}
+
+
+def load_registered_voc_keys_from_db(db_repo, df_voc) -> set:
+    """
+    VOC 데이터의 요청일시 범위로 DB에서 기존 등록 건을 조회하여 중복 판단 키 집합으로 반환합니다.
+    """
+    if '요청일시/등록일시' not in df_voc.columns or df_voc.empty:
+        return set()
+    dates, _ = parse_datetime_column(df_voc['요청일시/등록일시'])
+    dates = dates.dropna()
+    if dates.empty:
+        return set()
+
+    start_date = dates.min().normalize()
+    end_date = dates.max().normalize() + pd.Timedelta(days=1)
+    records = db_repo.get_registered_voc(start_date.to_pydatetime(), end_date.to_pydatetime())
+    return {
+        build_voc_key(r.get('request_empnm'), r.get('request_date'), r.get('voc_contents'))
+        for r in records
+    }
+
+
+def append_registered_voc_keys(keys, history_path=VOC_DEDUP_HISTORY_PATH):
+    """
+    전송에 성공한 VOC 키들을 로컬 이력 인덱스 파일에 추가합니다.
+    """
+    keys = [k for k in keys if k]
+    if not history_path or not keys:
+        return
+    os.makedirs(os.path.dirname(history_path) or '.', exist_ok=True)
+    with _registry_lock, open(history_path, "a", encoding="utf-8") as f:
+        f.writelines(f"{k}\n" for k in keys)
+    print(f"📁 등록 이력 {len(keys)}건을 '{history_path}'에 추가했습니다.")
+
+
+def drop_duplicate_voc_rows(df_voc, registered_keys=None, in_flight_keys=None):
+    """
+    파일 내 중복 행과 이미 등록된 VOC와 동일한 행을 제외합니다.
+
+    Args:
+        df_voc (pd.DataFrame): 유효성 검증을 통과한 VOC 데이터프레임
+        registered_keys (set, optional): 이미 등록된 VOC의 중복 판단 키 집합
+        in_flight_keys (set, optional): 다른 파일에서 처리 중인 VOC의 키 집합 (기존 등록 건과 함께 집계)
+
+    Returns:
+        tuple[pd.DataFrame, dict]: 중복이 제거된 데이터프레임(인덱스 reset됨)과
+            {'in_file': 파일 내 중복 건수, 'registered': 기존 등록 중복 건수}
+    """
+    print("\n🔁 VOC 중복 검사 시작")
+    registered_keys = registered_keys or set()
+    in_flight_keys = in_flight_keys or set()
+    if VOC_KEY_COLUMN not in df_voc.columns:
+        df_voc = add_voc_keys(df_voc)
+
+    in_file_dup = df_voc[VOC_KEY_COLUMN].duplicated(keep='first')
+    in_flight_dup = df_voc[VOC_KEY_COLUMN].isin(in_flight_keys) & ~in_file_dup
+    registered_dup = (df_voc[VOC_KEY_COLUMN].isin(registered_keys) & ~in_file_dup) | in_flight_dup
+
+    rows = excel_row_numbers(df_voc)
+    for idx in df_voc.index[in_file_dup]:
+        print(f" - Excel 행 {rows[idx]}: 파일 내 중복으로 제외")
+    for idx in df_voc.index[registered_dup]:
+        reason = "다른 파일에서 처리 중인 VOC" if in_flight_dup[idx] else "이미 등록된 VOC"
+        print(f" - Excel 행 {rows[idx]}: {reason}로 제외")
+
+    stats = {'in_file': int(in_file_dup.sum()), 'registered': int(registered_dup.sum())}
+    deduped = df_voc[~(in_file_dup | registered_dup)].reset_index(drop=True)
+    print(f"✅ 중복 검사 완료 (파일 내 중복 {stats['in_file']}건, 기존 등록 {stats['registered']}건 제외)")
+    return deduped, stats
+
+
+class VocKeyReservation:
+    """
+    중복 검사를 통과한 VOC 키를 처리가 끝날 때까지 예약합니다. (데몬 모드의 동시 파일 처리용)
+
+    - claim()은 이력 인덱스를 다시 읽어 중복 검사를 하고 남은 행의 키를 예약하며, 이 과정은 프로세스 전체에서 한 번에 하나씩 수행됩니다.
+      같은 행이 들어 있는 파일을 동시에 처리해도 먼저 예약한 쪽만 전송합니다.
+    - 전송에 성공한 키는 append_registered_voc_keys로 이력에 기록되고, with 블록이 끝나면 예약이 해제됩니다.
+      (전송하지 못한 키는 해제되어 다음 파일에서 다시 처리할 수 있음)
+
+    사용 예:
+        with VocKeyReservation() as reservation:
+            df_voc, stats = reservation.claim(df_voc, registered_keys)
+            ... 전송 및 append_registered_voc_keys
+    """
+    def __init__(self, history_path=VOC_DEDUP_HISTORY_PATH):
+        self.history_path = history_path
+        self.keys = set()
+
+    def claim(self, df_voc, registered_keys=None):
+        """
+        이력 인덱스(history_path)와 registered_keys, 다른 파일에서 예약한 키 기준으로 중복을 제외하고 남은 행의 키를 예약합니다.
+
+        Returns:
+            tuple[pd.DataFrame, dict]: drop_duplicate_voc_rows와 같음
+        """
+        with _registry_lock:
+            known_keys = load_registered_voc_keys(self.history_path) | (registered_keys or set())
+            deduped, stats = drop_duplicate_voc_rows(df_voc, known_keys, _in_flight_keys - self.keys)
+            claimed = set(deduped[VOC_KEY_COLUMN]) - _in_flight_keys
+            _in_flight_keys.update(claimed)
+            self.keys |= claimed
+        return deduped, stats
+
+    def release(self):
+        with _registry_lock:
+            _in_flight_keys.difference_update(self.keys)
+            self.keys = set()
+
+    def __enter__(self):
+        return self
+
+    def __exit__(self, exc_type, exc, tb):
+        self.release()
@@ -0,0 +1,111 @@
+# src/excel_reader.py
+import pandas as pd
+
+from src.config.config import VOC_EXCEL_SHEET_NAME
+
+XLSX_EXTENSIONS = ('.xlsx', '.xlsm')
+XLS_EXTENSIONS = ('.xls',)
+EXCEL_EXTENSIONS = XLSX_EXTENSIONS + XLS_EXTENSIONS
+
+
+def is_excel_file(path) -> bool:
+    return str(path).lower().endswith(EXCEL_EXTENSIONS)
+
+
+def _iter_xlsx_rows(path, sheet_name):
+    """openpyxl 읽기 전용 모드로 시트를 한 행씩 읽습니다. (시트 전체를 메모리에 올리지 않음)"""
+    try:
+        from openpyxl import load_workbook
+    except ImportError:
+        raise RuntimeError("openpyxl이 설치되어 있지 않아 .xlsx 파일을 읽을 수 없습니다. (pip install openpyxl)")
+
+    workbook = load_workbook(path, read_only=True, data_only=True)
+    try:
+        sheet = workbook[sheet_name] if sheet_name else workbook.worksheets[0]
+        yield sheet.title
+        for row in sheet.iter_rows(values_only=True):
+            yield row
+    finally:
+        workbook.close()
+
+
+def _iter_xls_rows(path, sheet_name):
+    """xlrd로 구버전 .xls 시트를 한 행씩 읽습니다. 날짜 셀은 datetime으로 변환합니다."""
+    try:
+        import xlrd
+    except ImportError:
+        raise RuntimeError("xlrd가 설치되어 있지 않아 .xls 파일을 읽을 수 없습니다. (pip install xlrd)")
+
+    book = xlrd.open_workbook(path, on_demand=True)
+    try:
+        sheet = book.sheet_by_name(sheet_name) if sheet_name else book.sheet_by_index(0)
+        yield sheet.name
+        for r in range(sheet.nrows):
+            row = []
+            for cell in sheet.row(r):
+                if cell.ctype == xlrd.XL_CELL_DATE:
+                    row.append(xlrd.xldate_as_datetime(cell.value, book.datemode))
+                elif cell.ctype in (xlrd.XL_CELL_EMPTY, xlrd.XL_CELL_BLANK):
+                    row.append(None)
+                elif cell.ctype == xlrd.XL_CELL_NUMBER and float(cell.value).is_integer():
+                    row.append(int(cell.value))
+                else:
+                    row.append(cell.value)
+            yield row
+    finally:
+        book.release_resources()
+
+
+def _is_blank(value) -> bool:
+    return value is None or (isinstance(value, str) and not value.strip())
+
+
+def read_voc_workbook(path, columns, sheet_name=VOC_EXCEL_SHEET_NAME) -> pd.DataFrame:
+    """
+    VOC Excel 파일(.xlsx/.xlsm/.xls)을 한 행씩 읽어 필요한 컬럼만 DataFrame으로 만듭니다.
+
+    - 헤더는 columns 중 하나라도 들어 있는 첫 행입니다. (위쪽 제목 행은 건너뜀)
+    - 인덱스는 '시트 행 번호 - 2'로 두어, 검증 오류의 'Excel 행'(인덱스 + 2)이 원본 시트 행 번호와 같습니다.
+    - 필요한 컬럼이 모두 비어 있는 행은 제외합니다. (CSV의 빈 줄과 같은 처리)
+
+    Args:
+        path (str): Excel 파일 경로
+        columns (list[str]): 불러올 컬럼명 (시트에 없는 컬럼은 무시)
+        sheet_name (str): 시트 이름 (비어 있으면 첫 번째 시트)
+
+    Returns:
+        pd.DataFrame: 필요한 컬럼만 담은 VOC 데이터
+    """
+    rows = _iter_xls_rows(path, sheet_name) if str(path).lower().endswith(XLS_EXTENSIONS) else _iter_xlsx_rows(path, sheet_name)
+    wanted = set(columns)
+    title = next(rows)
+    positions = None # 컬럼명 -> 시트 열 위치
+    header_row = None
+    data = {}
+    index = []
+    for sheet_row, row in enumerate(rows, start=1):
+        if positions is None:
+            found = {}
+            for pos, value in enumerate(row):
+                name = str(value).strip() if value is not None else ''
+                if name in wanted:
+                    found.setdefault(name, pos) # 같은 이름의 컬럼이 여러 개면 첫 번째 컬럼 사용
+            if found:
+                positions = found
+                header_row = sheet_row
+                data = {name: [] for name in positions}
+            continue
+        values = {name: row[pos] if pos < len(row) else None for name, pos in positions.items()}
+        if all(_is_blank(v) for v in values.values()):
+            continue
+        for name, value in values.items():
+            data[name].append(value)
+        index.append(sheet_row - 2)
+
+    if positions is None:
+        raise ValueError(f"시트 '{title}'에서 VOC 컬럼 헤더({', '.join(columns)})를 찾지 못했습니다.")
+
+    ordered = [name for name in columns if name in positions]
+    df = pd.DataFrame({name: data[name] for name in ordered}, index=pd.Index(index, dtype='int64'), columns=ordered)
+    print(f"📗 Excel 시트 '{title}'에서 {len(df)}행을 불러왔습니다. (헤더 {header_row}행, 컬럼 {len(ordered)}개)")
+    return df
@@ -0,0 +1,213 @@
+# src/form_constraints.py
+import json
+import os
+import re
+import time
+from html.parser import HTMLParser
+
+from src.config.config import FORM_CONSTRAINTS_CACHE_PATH
+from src.validation_report import FORM_CONSTRAINT
+from src.voc_form import ROW_FIELDS, VocFormRecord
+
+# 최대 길이를 넘으면 오류 대신 잘라서 전송하는 본문 필드 (<p>...</p>로 감싼 HTML)
+TRUNCATABLE_FIELDS = ("voc_contents", "work_contents")
+
+_PARTIAL_ENTITY_RE = re.compile(r"&[#\w]*$")
+
+
+class _FormFieldParser(HTMLParser):
+    """VOC 화면 HTML에서 input/textarea/select 필드의 이름, maxlength, 선택 가능한 값을 수집합니다."""
+    def __init__(self):
+        super().__init__(convert_charrefs=True)
+        self.fields = {}
+        self._select = None
+
+    def handle_starttag(self, tag, attrs):
+        attrs = dict(attrs)
+        name = attrs.get("name")
+        if tag in ("input", "textarea", "select") and name:
+            if tag == "input" and attrs.get("type", "text").lower() in ("button", "submit", "reset", "image", "file"):
+                return
+            field = self.fields.setdefault(name, {"tag": tag})
+            maxlength = attrs.get("maxlength")
+            if maxlength and maxlength.strip().isdigit():
+                field["maxlength"] = int(maxlength)
+            if tag == "select":
+                field.setdefault("options", [])
+                self._select = field
+        elif tag == "option" and self._select is not None:
+            value = attrs.get("value")
+            # '선택' 같은 빈 값 안내 옵션은 제외 (JavaScript로 옵션을 채우는 select는 안내 옵션만 있음)
+            if value is not None and value.strip():
+                self._select["options"].append(value)
+
+    def handle_endtag(self, tag):
+        if tag == "select":
+            self._select = None
+
+
+class FormConstraints:
+    """
+    VOC 등록 화면의 폼 정의(필드별 최대 길이, select 선택 값)입니다.
+    로그인 후 VOC 화면을 불러올 때 한 번 파싱하여 FORM_CONSTRAINTS_CACHE_PATH에 저장해 두고,
+    전송 전에 모든 폼 레코드를 로컬에서 확인/정규화하여 서버에서 거부될 레코드는 보내지 않습니다.
+    """
+    def __init__(self, fields: dict, fetched_at: float = None):
+        self.fields = fields
+        self.fetched_at = fetched_at or time.time()
+        self._template_errors = {} # 템플릿(상수 필드) 값 -> 템플릿 오류 목록
+
+    @classmethod
+    def from_html(cls, html: str) -> "FormConstraints":
+        parser = _FormFieldParser()
+        parser.feed(html or "")
+        parser.close()
+        return cls(parser.fields)
+
+    @classmethod
+    def load(cls, path=FORM_CONSTRAINTS_CACHE_PATH) -> "FormConstraints | None":
+        if not os.path.exists(path):
+            return None
+        try:
+            with open(path, "r", encoding="utf-8") as f:
+                data = json.load(f)
+            return cls(data["fields"], data.get("fetched_at"))
+        except (OSError, ValueError, KeyError) as e:
+            print(f"경고: 폼 제약 캐시를 읽지 못했습니다: {e}")
+            return None
+
+    def save(self, path=FORM_CONSTRAINTS_CACHE_PATH):
+        os.makedirs(os.path.dirname(path) or ".", exist_ok=True)
+        tmp_path = f"{path}.tmp"
+        with open(tmp_path, "w", encoding="utf-8") as f:
+            json.dump({"fetched_at": self.fetched_at, "fields": self.fields}, f, ensure_ascii=False, indent=1)
+        os.replace(tmp_path, path)
+
+    def _check_value(self, name, value):
+        """
+        필드 값 하나를 확인합니다.
+
+        Returns:
+            (정규화된 값, 오류 메시지 또는 None)
+        """
+        spec = self.fields.get(name)
+        if spec is None or value is None:
+            return value, None
+        value = str(value)
+        # 빈 값 옵션만 있으면(이전 캐시 포함) 선택 값을 확인하지 않음
+        options = [option for option in spec.get("options") or [] if option.strip()]
+        if options:
+            if value in options:
+                return value, None
+            # 공백/대소문자만 다른 값은 화면의 선택 값으로 맞춤
+            for option in options:
+                if option.strip().lower() == value.strip().lower():
+                    return option, None
+            return value, f"'{name}' 값 '{value}'이(가) 선택 가능한 값({', '.join(options)})이 아님"
+        maxlength = spec.get("maxlength")
+        if maxlength and len(value) > maxlength:
+            if name in TRUNCATABLE_FIELDS:
+                return _truncate_html_paragraph(value, maxlength), None
+            return value, f"'{name}' 길이 {len(value)}자가 최대 {maxlength}자를 초과"
+        return value, None
+
+    def _check_template(self, template) -> list[str]:
+        key = json.dumps(template.fields, sort_keys=True, ensure_ascii=False, default=str)
+        if key not in self._template_errors:
+            errors = []
+            for name, value in template.fields.items():
+                _, error = self._check_value(name, value)
+                if error:
+                    errors.append(error)
+            self._template_errors[key] = errors
+        return self._template_errors[key]
+
+    def check_record(self, record: VocFormRecord) -> tuple[list[str], int]:
+        """
+        레코드를 제자리에서 정규화하고 남은 오류를 반환합니다.
+
+        Returns:
+            (오류 메시지 목록, 잘라낸 필드 수)
+        """
+        errors = list(self._check_template(record.template))
+        truncated = 0
+        for name in ROW_FIELDS:
+            value = getattr(record, name)
+            normalized, error = self._check_value(name, value)
+            if error:
+                errors.append(error)
+            elif normalized != value:
+                if name in TRUNCATABLE_FIELDS:
+                    truncated += 1
+                setattr(record, name, normalized)
+        return errors, truncated
+
+
+def _truncate_html_paragraph(value: str, maxlength: int) -> str:
+    """'<p>본문</p>' 형태를 유지한 채 maxlength에 맞게 본문을 자릅니다. (잘린 HTML 엔티티는 제거)"""
+    prefix, suffix = ("<p>", "</p>") if value.startswith("<p>") and value.endswith("</p>") else ("", "")
+    inner = value[len(prefix):len(value) - len(suffix)]
+    inner = inner[:max(0, maxlength - len(prefix) - len(suffix))]
+    return f"{prefix}{_PARTIAL_ENTITY_RE.sub('', inner)}{suffix}"
+
+
+# 이번 실행에서 로그인하며 갱신한 폼 제약 (없으면 캐시 파일 사용)
+_latest = None
+
+
+def latest_form_constraints() -> FormConstraints | None:
+    """이번 실행에서 VOC 화면을 불러와 갱신한 폼 제약, 아직 불러오지 않았으면 캐시 파일의 폼 제약"""
+    return _latest or FormConstraints.load()
+
+
+def update_form_constraints(html: str) -> FormConstraints | None:
+    """
+    불러온 VOC 화면에서 폼 정의를 파싱하여 캐시에 저장합니다. 폼 필드를 찾지 못하면 캐시를 바꾸지 않습니다.
+    """
+    global _latest
+    constraints = FormConstraints.from_html(html)
+    if not constraints.fields:
+        print("⚠️ VOC 화면에서 폼 필드를 찾지 못해 폼 제약 캐시를 갱신하지 않습니다.")
+        return None
+    _latest = constraints
+    try:
+        constraints.save()
+        print(f"📝 VOC 화면 폼 제약 {len(constraints.fields)}개 필드를 '{FORM_CONSTRAINTS_CACHE_PATH}'에 저장했습니다.")
+    except OSError as e:
+        print(f"경고: 폼 제약 캐시 저장 실패: {e}")
+    return constraints
+
+
+def check_form_records(voc_form_data_list: list[VocFormRecord], report, constraints: FormConstraints = None,
+                       excel_rows=None) -> set:
+    """
+    전송 전에 모든 폼 레코드를 캐시된 폼 제약으로 확인합니다.
+    본문 필드의 길이 초과는 잘라서 정규화하고, 나머지 위반은 report에 FORM_CONSTRAINT로 기록합니다.
+    캐시가 없으면(아직 VOC 화면을 불러온 적이 없으면) 확인하지 않습니다.
+
+    Args:
+        voc_form_data_list (list[VocFormRecord]): 확인할 폼 레코드 (제자리에서 정규화됨)
+        report (ValidationReport): 위반 내역을 기록할 리포트
+        constraints (FormConstraints, optional): 지정하지 않으면 latest_form_constraints()
+        excel_rows (list[int], optional): 레코드별 Excel 행 번호 (리포트 표시용, 기본은 위치 + 2)
+
+    Returns:
+        set: 전송하면 안 되는 레코드의 리스트 내 위치
+    """
+    constraints = constraints or latest_form_constraints()
+    if constraints is None or not voc_form_data_list:
+        return set()
+    invalid_positions = set()
+    truncated_total = 0
+    for pos, record in enumerate(voc_form_data_list):
+        errors, truncated = constraints.check_record(record)
+        truncated_total += truncated
+        if errors:
+            invalid_positions.add(pos)
+            for error in errors:
+                report.add(excel_rows[pos] if excel_rows else pos + 2, '폼 제약', FORM_CONSTRAINT, error)
+    if truncated_total:
+        print(f"✂️ 최대 길이를 넘은 본문 {truncated_total}건을 잘라서 전송합니다.")
+    if invalid_positions:
+        print(f"❗ VOC 화면 폼 제약 위반 {len(invalid_positions)}건은 전송하지 않습니다.")
+    return invalid_positions
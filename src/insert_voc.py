@@ -2,151 +2,167 @@ import pandas as pd
 import os
 import csv
 import datetime 
+import html
+from src.date_parser import parse_datetime_column
 from src.config.config import (
     VOC_INSERT_URL,
     WORKER_EMPCD, WORKER_NAME, WORKER_DEPTCD, WORKER_DEPTNAME, WORKER_OFFICE_TEL, WORKER_MOBILE_TEL
 )
 import requests
+from src.resilience import get_caller, CircuitOpenError
+from src.voc_form import VocFormTemplate, VocFormRecord, FORM_CONTENT_TYPE
 
-def set_qry_params(df_voc, voc_type_map: dict, voc_recv_map: dict, voc_service_map: dict, insa_info_map: list) -> list[dict]:
+def _format_datetime_field(df_voc, column: str) -> list[str]:
     """
-    DataFrame에서 VOC 데이터를 API 전송을 위한 폼 데이터 딕셔너리 리스트로 추출합니다.
-    각 딕셔너리의 키는 API의 폼 필드 이름에 맞게 설정해야 합니다.
+    날짜 컬럼을 'YYYY-MM-DD HH:MM:SS' 문자열 리스트로 변환합니다. 컬럼이 없거나 빈 값이면 빈 문자열입니다.
+    (형식 오류는 유효성 검증 단계에서 제외되므로 여기서는 경고만 출력)
+    """
+    if column not in df_voc.columns:
+        return [''] * len(df_voc)
+    parsed, invalid = parse_datetime_column(df_voc[column])
+    for idx in df_voc.index[invalid]:
+        print(f"경고: '{column}' 필드 '{df_voc.at[idx, column]}' 형식 오류. 빈 문자열로 처리합니다.")
+    return parsed.dt.strftime('%Y-%m-%d %H:%M:%S').fillna('').tolist()
+
+def to_voc_html(value) -> str:
+    """본문 텍스트를 VOC 화면에 저장하는 HTML 형식으로 변환합니다. (<, >, & 등은 태그로 해석되지 않도록 이스케이프)"""
+    return f"<p>{html.escape(str(value).strip(), quote=False)}</p>"
+
+def set_qry_params(df_voc, voc_type_map: dict, voc_recv_map: dict, voc_service_map: dict, insa_info_map: list) -> list[VocFormRecord]:
+    """
+    DataFrame에서 VOC 데이터를 API 전송을 위한 폼 레코드 리스트로 추출합니다.
+    각 레코드의 필드 이름은 API의 폼 필드 이름에 맞게 설정해야 합니다.
+
+    모든 행에서 같은 필드(등록자/작업자 정보 등)는 하나의 VocFormTemplate에 한 번만 저장되고,
+    각 VocFormRecord는 행마다 다른 필드만 가집니다.
     """
     form_data_list = []
     # insa_info_map의 각 딕셔너리에서 'hname'을 키로 사용하여 딕셔너리 생성
     # TODO: 동명이인 예외처리
     insa_emp_to_info = {d['hname']: d for d in insa_info_map}
-    worker_info = {
-        "register_empno": WORKER_EMPCD.strip(),  
+
+    # 현재 시간 가져오기 (수정일시는 폼 생성 시점으로 모든 레코드에 공통 적용)
+    current_time_str = datetime.datetime.now().strftime('%Y-%m-%d %H:%M:%S')
+
+    # 모든 행에 공통인 폼 필드 (상수 부분은 템플릿 생성 시 한 번만 URL 인코딩됨)
+    template = VocFormTemplate({
+        "voc_no" : "",
+        "voc_date": "",
+        "voc_seq": "",
+        # VOC 등록자 정보
+        "register_empno": WORKER_EMPCD.strip(),
         "register_empnm": WORKER_NAME.strip(),
         "register_deptcd": WORKER_DEPTCD.strip(),
         "register_deptnm": WORKER_DEPTNAME.strip(),
         "register_office_phone": WORKER_OFFICE_TEL,
         "register_mobile_phone": WORKER_MOBILE_TEL,
-        "work_empno": WORKER_EMPCD.strip(),  # 작업자 정보는 등록자와 동일하게 설정
+        # 작업자 정보는 등록자와 동일하게 설정
+        "work_empno": WORKER_EMPCD.strip(),
         "work_empnm": WORKER_NAME.strip(),
         "work_deptcd": WORKER_DEPTCD.strip(),
         "work_deptnm": WORKER_DEPTNAME.strip(),
         "work_office_phone": WORKER_OFFICE_TEL,
         "work_mobile_phone": WORKER_MOBILE_TEL,
-    }
+        "fail_minute": "0",
+        "update_date": current_time_str,
+    })
 
-    for _, row in df_voc.iterrows():
+    # 날짜/시간 컬럼은 컬럼 단위로 한 번에 파싱 (형식 그룹별 벡터화 + 반복 문자열 메모이제이션)
+    request_dates = _format_datetime_field(df_voc, '요청일시/등록일시')
+    completion_dates = _format_datetime_field(df_voc, '완료일시')
+
+    for (_, row), request_datetime_str, completion_datetime_str in zip(df_voc.iterrows(), request_dates, completion_dates):
         # 데이터프레임에서 원본 값 추출
         voc_type_name = str(row.get('VOC유형', '')).strip()
         recv_type_name = str(row.get('접수유형', '')).strip()
         service_type_name = str(row.get('소분류', '')).strip()
         requester_name = str(row.get('제기자', '')).strip()
 
-        # 매핑을 통해 코드값 추출
-        voc_type_code = voc_type_map.get(voc_type_name, '')
-        recv_type_code = voc_recv_map.get(recv_type_name, '')
-        service_type_code = voc_service_map.get(service_type_name, '')
-
         # 인사 정보 매핑
         req_info = insa_emp_to_info.get(requester_name, {})
 
-        # --- 날짜/시간 필드 처리 ---
-        # 1. '요청일시/등록일시'
-        request_datetime_str = ''
-        raw_request_date = row.get('요청일시/등록일시')
-        if pd.notna(raw_request_date) and str(raw_request_date).strip() != '':
-            try:
-                dt_obj = pd.to_datetime(str(raw_request_date).strip())
-                request_datetime_str = dt_obj.strftime('%Y-%m-%d %H:%M:%S')
-            except ValueError:
-                print(f"경고: '요청일시/등록일시' 필드 '{raw_request_date}' 형식 오류. 빈 문자열로 처리합니다.")
-                request_datetime_str = ''
-
-        # 2. '완료일시'
-        completion_datetime_str = ''
-        raw_completion_date = row.get('완료일시')
-        if pd.notna(raw_completion_date) and str(raw_completion_date).strip() != '':
-            try:
-                dt_obj = pd.to_datetime(str(raw_completion_date).strip())
-                completion_datetime_str = dt_obj.strftime('%Y-%m-%d %H:%M:%S')
-            except ValueError:
-                print(f"경고: '완료일시' 필드 '{raw_completion_date}' 형식 오류. 빈 문자열로 처리합니다.")
-                completion_datetime_str = ''
-
-        # 현재 시간 가져오기
-        current_time_str = datetime.datetime.now().strftime('%Y-%m-%d %H:%M:%S')
-
-        # API가 기대하는 폼 필드 이름에 맞춰 딕셔너리 키 설정
-        form_data = {
-            "voc_no" : "",
-            "voc_date": "",
-            "voc_seq": "",
-            "service_cd": service_type_code,
-            "receive_cd": recv_type_code,
-            "voc_cd": voc_type_code,
-            "request_empno": req_info.get('empcd', ''),
-            "request_empnm": requester_name,
-            "request_deptcd": req_info.get('deptcd', ''),
-            "request_deptnm": req_info.get('deptcd_disp', ''),
-            "request_office_phone": req_info.get('office_phone', ''),
-            "request_mobile_phone": req_info.get('handpon', ''),
-            # VOC 등록자 정보 (현재 알 수 없으므로 빈 값으로 처리)
-            "register_empno": worker_info.get('register_empno', ''),
-            "register_empnm": worker_info.get('register_empnm', ''),
-            "register_deptcd": worker_info.get('register_deptcd', ''),
-            "register_deptnm": worker_info.get('register_deptnm', ''),
-            "register_office_phone": worker_info.get('register_office_phone', ''),
-            "register_mobile_phone": worker_info.get('register_mobile_phone', ''),
-            # 작업자 정보 (현재 알 수 없으므로 빈 값으로 처리)
-            "work_empno": worker_info.get('work_empno', ''),
-            "work_empnm": worker_info.get('work_empnm', ''),
-            "work_deptcd": worker_info.get('work_deptcd', ''),
-            "work_deptnm": worker_info.get('work_deptnm', ''),
-            "work_office_phone": worker_info.get('work_office_phone', ''),
-            "work_mobile_phone": worker_info.get('work_mobile_phone', ''),
-            "work_yn": str(row.get('조치가능여부', 'Y')).strip(),
-            "work_status": str(row.get('조치여부', 'Y')).strip(),
-            "work_minute": str(row.get('작업시간', '0')).strip(),
-            "fail_minute": "0",
-            "insert_date": request_datetime_str,
-            "request_date": request_datetime_str,
-            "finish_date": completion_datetime_str,
-            "update_date": current_time_str,
-            "voc_contents": f"<p>{str(row.get('VOC내용', '')).strip()}</p>",
-            "work_contents": f"<p>{str(row.get('조치계획 및 진행상황', '')).strip()}</p>",
-        }
-        form_data_list.append(form_data)
+        # API가 기대하는 폼 필드 이름에 맞춰 행별 필드 설정 (매핑을 통해 코드값 추출)
+        form_data_list.append(VocFormRecord(
+            template,
+            service_cd=voc_service_map.get(service_type_name, ''),
+            receive_cd=voc_recv_map.get(recv_type_name, ''),
+            voc_cd=voc_type_map.get(voc_type_name, ''),
+            request_empno=req_info.get('empcd', ''),
+            request_empnm=requester_name,
+            request_deptcd=req_info.get('deptcd', ''),
+            request_deptnm=req_info.get('deptcd_disp', ''),
+            request_office_phone=req_info.get('office_phone', ''),
+            request_mobile_phone=req_info.get('handpon', ''),
+            work_yn=str(row.get('조치가능여부', 'Y')).strip(),
+            work_status=str(row.get('조치여부', 'Y')).strip(),
+            work_minute=str(row.get('작업시간', '0')).strip(),
+            request_date=request_datetime_str,
+            finish_date=completion_datetime_str,
+            voc_contents=to_voc_html(row.get('VOC내용', '')),
+            work_contents=to_voc_html(row.get('조치계획 및 진행상황', '')),
+        ))
 
     return form_data_list
 
-def send_voc_data_to_api(voc_form_data_list: list[dict], active_session):
+def send_voc_record(voc_data: VocFormRecord, active_session, label: str) -> bool:
+    """
+    VOC 폼 레코드 한 건을 전송합니다. 서버가 처리하지 않았음이 확실한 오류(연결 실패, 429/503)만 백오프 후 재시도하며,
+    회로가 열려 더 이상 호출할 수 없으면 CircuitOpenError를 호출자에게 전달합니다.
+
+    Args:
+        voc_data (VocFormRecord): 전송할 레코드
+        active_session (requests.Session): 로그인 상태를 유지하는 requests 세션 객체
+        label (str): 콘솔 출력용 레코드 이름 (예: '레코드 3')
+
+    Returns:
+        bool: 전송 성공 여부
+    """
+    try:
+        # 전달받은 active_session을 사용하여 POST 요청 (등록은 멱등이 아니므로 중복 등록 위험이 없는 오류만 재시도)
+        response = get_caller('voc_insert').call(
+            active_session.post, VOC_INSERT_URL.strip(),
+            data=voc_data.to_body(), headers={"Content-Type": FORM_CONTENT_TYPE}
+        )
+
+        if response.ok:
+            print(f"✅ {label} 전송 성공! 응답: {response.status_code}")
+            return True
+        print(f"❌ {label} 전송 실패! 상태 코드: {response.status_code}")
+        print(f"응답 내용: {response.text}") # 서버에서 받은 에러 페이지 내용 출력
+    except requests.exceptions.RequestException as e:
+        print(f"❌ {label} 전송 중 연결/요청 오류 발생: {e}")
+        # 재시도를 모두 소진한 경우이며, 다음 레코드는 계속 시도
+    return False
+
+def send_voc_data_to_api(voc_form_data_list: list[VocFormRecord], active_session):
     """
     VOC 폼 데이터 리스트를 주어진 URL로 POST 요청을 통해 API에 전송합니다.
+    요청 본문은 레코드별로 전송 직전에 URL 인코딩됩니다.
 
     Args:
-        voc_form_data_list (list[dict]): API에 전송할 VOC 폼 데이터 딕셔너리 리스트.
-        voc_insert_url (str): VOC 데이터를 전송할 API 엔드포인트 URL.
+        voc_form_data_list (list[VocFormRecord]): API에 전송할 VOC 폼 레코드 리스트.
         active_session (requests.Session): 로그인 상태를 유지하는 requests 세션 객체.
+
+    Returns:
+        list[int]: 전송에 성공한 레코드의 voc_form_data_list 내 인덱스 목록.
     """
     print("\n🚀 VOC 데이터를 API로 전송합니다...")
-    voc_insert_url = VOC_INSERT_URL.strip()  # URL 공백 제거
+    sent_indexes = []
     if not voc_form_data_list:
         print("❗ 전송할 VOC 데이터가 없습니다.")
-        return
+        return sent_indexes
 
     for i, voc_data in enumerate(voc_form_data_list):
         print(f"--- 전송 중: 레코드 {i+1}/{len(voc_form_data_list)} ---")
         # 디버깅을 위해 전송할 데이터 출력
         # print(f"전송 데이터: {voc_data}") 
         try:
-            # 전달받은 active_session을 사용하여 POST 요청
-            response = active_session.post(voc_insert_url, data=voc_data) 
-            
-            if response.ok:
-                print(f"✅ 레코드 {i+1} 전송 성공! 응답: {response.status_code}")
-            else:
-                print(f"❌ 레코드 {i+1} 전송 실패! 상태 코드: {response.status_code}")
-                print(f"응답 내용: {response.text}") # 서버에서 받은 에러 페이지 내용 출력
-        except requests.exceptions.RequestException as e:
-            print(f"❌ 레코드 {i+1} 전송 중 연결/요청 오류 발생: {e}")
-            # 오류 발생 시 나머지 데이터 전송 중단 여부는 정책에 따라 결정
-            # 현재는 계속 시도하도록 되어 있음. 중단하려면 여기서 break 또는 return
-
-    print("\n🎉 모든 VOC 데이터 전송 시도 완료.")
\ No newline at end of file
+            if send_voc_record(voc_data, active_session, f"레코드 {i+1}"):
+                sent_indexes.append(i)
+        except CircuitOpenError as e:
+            # 서버가 계속 응답하지 않으면 나머지 레코드는 전송하지 않음
+            print(f"{e}\n❗ 남은 레코드 {len(voc_form_data_list) - i}건은 전송하지 않았습니다.")
+            break
+
+    print("\n🎉 모든 VOC 데이터 전송 시도 완료.")
+    return sent_indexes
@@ -0,0 +1,78 @@
+# src/loadtest/fake_gemini.py
+import json
+import random
+import re
+import threading
+import time
+
+from src.loadtest.stub_server import LatencyProfile
+
+# build_voc_type_retry_prompt의 "[row_id] 내용: ..." 줄
+_RETRY_ITEM_RE = re.compile(r"^\[(\d+)\] 내용:", re.MULTILINE)
+
+
+class ServiceUnavailable(Exception):
+    """google.api_core의 503 오류와 같은 이름/코드 (재시도 계층에서 일시 오류로 분류됨)"""
+    code = 503
+
+
+class _FakeResponse:
+    def __init__(self, text):
+        self.text = text
+
+
+class FakeGeminiModel:
+    """
+    GEMINI_MODEL.generate_content를 흉내 내는 가짜 모델입니다. 실제 API와 할당량을 쓰지 않고
+    지연 분포, 오류율, 낮은 확신도 비율을 주입하여 추론 단계를 시험할 수 있습니다.
+
+    - 단건 프롬프트에는 {"voc_type", "confidence", "reason"} JSON을,
+      재시도(다건) 프롬프트에는 row_id별 JSON 배열을 돌려줍니다.
+    - 호출별 지연(초)은 latencies에, 호출/오류 건수는 calls/errors에 기록됩니다.
+    - 이름(name)이 다른 모델을 여러 개 만들어 목록으로 넘기면 모델 단계(가벼운 모델 -> 강한 모델)를 흉내 낼 수 있습니다.
+    """
+    def __init__(self, valid_types, latency: LatencyProfile = None, error_rate: float = 0.0,
+                 low_confidence_rate: float = 0.0, name: str = "fake-gemini", cost_per_million: float = 0.0):
+        self.valid_types = list(valid_types)
+        self.latency = latency or LatencyProfile(400, 3000)
+        self.error_rate = error_rate
+        self.low_confidence_rate = low_confidence_rate
+        self.model_name = name
+        self.cost_per_million = cost_per_million # 모델별 비용 통계(model_tiers)에 사용
+        self.calls = 0
+        self.errors = 0
+        self.latencies = []
+        self._lock = threading.Lock()
+
+    def _prediction(self):
+        confidence = random.uniform(0.2, 0.6) if random.random() < self.low_confidence_rate else random.uniform(0.75, 0.99)
+        return {
+            "voc_type": random.choice(self.valid_types),
+            "confidence": round(confidence, 2),
+            "reason": "부하 테스트용 가짜 응답",
+        }
+
+    def generate_content(self, prompt, generation_config=None):
+        delay = self.latency.sample()
+        time.sleep(delay)
+        failed = random.random() < self.error_rate
+        with self._lock:
+            self.calls += 1
+            self.latencies.append(delay)
+            if failed:
+                self.errors += 1
+        if failed:
+            raise ServiceUnavailable("503 fake model overloaded")
+
+        row_ids = _RETRY_ITEM_RE.findall(prompt)
+        if row_ids:
+            return _FakeResponse(json.dumps(
+                [{"row_id": int(row_id), **self._prediction()} for row_id in row_ids], ensure_ascii=False
+            ))
+        return _FakeResponse(json.dumps(self._prediction(), ensure_ascii=False))
+
+    def reset_stats(self):
+        with self._lock:
+            self.calls = 0
+            self.errors = 0
+            self.latencies = []
@@ -0,0 +1,268 @@
+# src/loadtest/run_loadtest.py
+"""
+운영 VOC 시스템과 실제 Gemini 할당량을 쓰지 않고, 로컬 가짜 서버/모델로 실제 파이프라인을 동시 실행 수를 늘려 가며 실행합니다.
+
+    python -m src.loadtest.run_loadtest --levels 1,2,4,8 --rows 200 --insert-error-rate 0.02 --session-ttl 30
+
+동시 실행 수(K)마다 K개의 가상 VOC 파일을 각자의 로그인 세션으로 동시에 처리하고,
+처리량(건/초)과 엔드포인트별 지연 백분위(p50/p90/p99)를 표와 CSV로 출력합니다.
+"""
+import argparse
+import contextlib
+import csv
+import io
+import os
+import threading
+import time
+from collections import defaultdict
+from urllib.parse import urlparse
+
+from src.loadtest.stub_server import StubVocServer, EndpointBehavior, LatencyProfile
+from src.loadtest.fake_gemini import FakeGeminiModel
+
+VALID_TYPES = ["장애", "요청", "문의", "개선"]
+REQUESTERS = ["홍길동", "김철수", "이영희", "박민수"]
+RESULT_COLUMNS = [
+    "concurrency", "rows", "sent", "failed", "elapsed_sec", "throughput_per_sec",
+    "insert_p50_ms", "insert_p90_ms", "insert_p99_ms",
+    "login_p50_ms", "login_p99_ms",
+    "gemini_calls", "gemini_p50_ms", "gemini_p90_ms", "gemini_p99_ms",
+    "gemini_hedged", "gemini_hedge_wins", "gemini_escalated", "gemini_cost_usd",
+    "server_errors", "session_expired",
+]
+
+
+def parse_args(argv=None):
+    parser = argparse.ArgumentParser(description="VOC 등록 파이프라인 부하 테스트 (로컬 가짜 서버/Gemini)")
+    parser.add_argument("--levels", default="1,2,4,8", help="동시에 처리할 파일 수 목록 (쉼표 구분)")
+    parser.add_argument("--rows", type=int, default=100, help="파일 하나의 행 수")
+    parser.add_argument("--typed-ratio", type=float, default=0.7, help="VOC유형이 이미 입력된 행 비율 (나머지는 Gemini 추론)")
+    parser.add_argument("--mode", choices=["stream", "batch"], default="stream",
+                        help="stream: 단계 동시 실행(추론 포함), batch: 기존 단계별 실행(추론 없음)")
+    parser.add_argument("--insert-median-ms", type=float, default=80)
+    parser.add_argument("--insert-p99-ms", type=float, default=600)
+    parser.add_argument("--insert-error-rate", type=float, default=0.01, help="VOC 등록 503 응답 비율")
+    parser.add_argument("--login-median-ms", type=float, default=150)
+    parser.add_argument("--login-p99-ms", type=float, default=1000)
+    parser.add_argument("--login-error-rate", type=float, default=0.0)
+    parser.add_argument("--session-ttl", type=float, default=None, help="로그인 세션 만료 시간(초), 미지정 시 만료 없음")
+    parser.add_argument("--gemini-median-ms", type=float, default=400)
+    parser.add_argument("--gemini-p99-ms", type=float, default=3000)
+    parser.add_argument("--gemini-error-rate", type=float, default=0.02)
+    parser.add_argument("--gemini-low-confidence-rate", type=float, default=0.1)
+    parser.add_argument("--gemini-cost", type=float, default=0.075, help="가짜 모델의 입력 토큰 100만 개당 비용(USD)")
+    parser.add_argument("--escalation-median-ms", type=float, default=None,
+                        help="지정하면 확신도가 낮을 때 넘어가는 두 번째(강한) 가짜 모델 단계를 추가")
+    parser.add_argument("--escalation-p99-ms", type=float, default=6000)
+    parser.add_argument("--escalation-low-confidence-rate", type=float, default=0.02)
+    parser.add_argument("--escalation-cost", type=float, default=1.25)
+    parser.add_argument("--no-hedge", action="store_true", help="Gemini 헤지 요청을 끄고 측정 (비교용)")
+    parser.add_argument("--out-dir", default="log/", help="결과 CSV와 단계별 콘솔 로그를 저장할 폴더")
+    return parser.parse_args(argv)
+
+
+def percentile(values, pct) -> float:
+    """최근접 순위 방식 백분위 (값이 없으면 0)"""
+    if not values:
+        return 0.0
+    ordered = sorted(values)
+    rank = max(1, -(-len(ordered) * pct // 100)) # ceil
+    return ordered[int(rank) - 1]
+
+
+class LatencyRecorder:
+    """HTTP 경로별 클라이언트 측 응답 시간(초) 기록"""
+    def __init__(self):
+        self._lock = threading.Lock()
+        self.samples = defaultdict(list)
+
+    def record(self, path, seconds):
+        with self._lock:
+            self.samples[path].append(seconds)
+
+    def reset(self):
+        with self._lock:
+            self.samples = defaultdict(list)
+
+
+def _configure_environment(server: StubVocServer, run_dir: str, hedge: bool = True):
+    """src.config를 불러오기 전에 가짜 서버 주소와 부하 테스트용 설정을 환경 변수로 지정합니다."""
+    os.environ["LOGIN_URL"] = server.login_url
+    os.environ["VOC_URL"] = server.voc_url
+    os.environ["VOC_INSERT_URL"] = server.insert_url
+    # 운영 이력/리포트를 건드리지 않도록 결과 폴더 아래에 기록
+    os.environ["VOC_DEDUP_HISTORY_PATH"] = os.path.join(run_dir, "registered_index.txt")
+    os.environ["VOC_DEDUP_CHECK_DB"] = "N"
+    os.environ["VALIDATION_REPORT_DIR"] = run_dir
+    os.environ["FORM_CONSTRAINTS_CACHE_PATH"] = os.path.join(run_dir, "voc_form_constraints.json")
+    os.environ["INFER_LOG_DIR"] = run_dir
+    os.environ["INFER_INDEX_PATH"] = os.path.join(run_dir, "voc_infer_index.sqlite3")
+    os.environ["GEMINI_QUOTA_STATE_PATH"] = os.path.join(run_dir, "gemini_quota_state.json")
+    os.environ["GEMINI_PENDING_QUEUE_PATH"] = os.path.join(run_dir, "voc_pending_inference.csv")
+    if not hedge:
+        os.environ["GEMINI_HEDGE_ENABLED"] = "N"
+    for key, value in {
+        "LOGIN_ID": "loadtest", "LOGIN_PWD": "loadtest", "LOGIN_TYPE": "default",
+        "WORKER_EMPCD": "LT0001", "WORKER_NAME": "부하테스트", "WORKER_DEPTCD": "LT", "WORKER_DEPTNAME": "부하테스트",
+        "GEMINI_USE_FREE_TIER": "N", # 가짜 모델이므로 프리티어 제한 확인 안 함
+    }.items():
+        os.environ.setdefault(key, value)
+
+
+def build_dataframe(level, worker, rows, typed_ratio):
+    import pandas as pd
+
+    typed_every = max(1, round(1 / max(1 - typed_ratio, 1e-9))) if typed_ratio < 1 else None
+    records = []
+    for i in range(rows):
+        untyped = typed_every is not None and i % typed_every == 0
+        records.append({
+            "제기자": REQUESTERS[i % len(REQUESTERS)],
+            "접수유형": "전화",
+            "소분류": "메일",
+            "요청일시/등록일시": f"2025-08-{1 + i % 28:02d} {9 + i % 9:02d}:{i % 60:02d}",
+            "완료일시": f"2025-08-{1 + i % 28:02d} 18:00",
+            "작업시간": 30,
+            "VOC내용": f"[L{level}-W{worker}-{i}] 부하 테스트 VOC 내용 {i}",
+            "조치계획 및 진행상황": "조치 완료",
+            "VOC유형": None if untyped else VALID_TYPES[i % len(VALID_TYPES)],
+        })
+    return pd.DataFrame(records)
+
+
+def main(args=None):
+    args = args or parse_args()
+    timestamp = time.strftime("%Y%m%d_%H%M%S", time.localtime())
+    run_dir = os.path.join(args.out_dir, f"loadtest_{timestamp}")
+    os.makedirs(run_dir, exist_ok=True)
+
+    server = StubVocServer(
+        login=EndpointBehavior(LatencyProfile(args.login_median_ms, args.login_p99_ms), args.login_error_rate),
+        voc_page=EndpointBehavior(LatencyProfile(args.login_median_ms, args.login_p99_ms), args.login_error_rate),
+        insert=EndpointBehavior(LatencyProfile(args.insert_median_ms, args.insert_p99_ms), args.insert_error_rate),
+        session_ttl=args.session_ttl,
+    ).start()
+    _configure_environment(server, run_dir, hedge=not args.no_hedge)
+
+    # 환경 변수를 지정한 뒤에 파이프라인 모듈을 불러옴 (config는 import 시점에 환경 변수를 읽음)
+    import requests
+    from src.auth import AuthService
+    from src.resilience import reset_callers
+    from src.ai.model_tiers import reset_tier_stats, print_tier_stats, tier_stats
+    from src.run_summary import RunSummary
+    from src.voc_pipeline import VocResources, process_voc_dataframe
+    from src.stream_pipeline import process_voc_dataframe_streaming
+
+    recorder = LatencyRecorder()
+
+    class TimedSession(requests.Session):
+        def request(self, method, url, *a, **kw):
+            started = time.perf_counter()
+            try:
+                return super().request(method, url, *a, **kw)
+            finally:
+                recorder.record(urlparse(url).path, time.perf_counter() - started)
+
+    resources = VocResources(
+        insa_info_map=[
+            {"hname": name, "empcd": f"E{i:04d}", "deptcd": "D01", "deptcd_disp": "테스트부서", "office_phone": "", "handpon": ""}
+            for i, name in enumerate(REQUESTERS)
+        ],
+        voc_type_map={t: f"T{i}" for i, t in enumerate(VALID_TYPES)},
+        voc_recv_map={"전화": "R1"},
+        voc_service_map={"메일": "S1"},
+    )
+    model = FakeGeminiModel(
+        VALID_TYPES, LatencyProfile(args.gemini_median_ms, args.gemini_p99_ms),
+        args.gemini_error_rate, args.gemini_low_confidence_rate, cost_per_million=args.gemini_cost
+    )
+    models = [model]
+    if args.escalation_median_ms is not None:
+        models.append(FakeGeminiModel(
+            VALID_TYPES, LatencyProfile(args.escalation_median_ms, args.escalation_p99_ms),
+            args.gemini_error_rate, args.escalation_low_confidence_rate,
+            name="fake-gemini-pro", cost_per_million=args.escalation_cost
+        ))
+    process = process_voc_dataframe_streaming if args.mode == "stream" else process_voc_dataframe
+
+    levels = [int(v) for v in args.levels.split(",") if v.strip()]
+    print(f"🧪 부하 테스트 시작 (모드 {args.mode}, 파일당 {args.rows}행, 동시 실행 {levels}) - 가짜 서버 {server.base_url}")
+    results = []
+    try:
+        for level in levels:
+            reset_callers()
+            reset_tier_stats()
+            recorder.reset()
+            for m in models:
+                m.reset_stats()
+            server.reset_stats()
+            summaries = [RunSummary() for _ in range(level)]
+            frames = [build_dataframe(level, w, args.rows, args.typed_ratio) for w in range(level)]
+            sessions = []
+
+            def worker(w):
+                session = TimedSession()
+                sessions.append(session)
+                auth_service = AuthService(session)
+                kwargs = {"model": models} if args.mode == "stream" else {}
+                process(frames[w], resources, None, summaries[w], auth_service.login_and_fetch_voc_page, **kwargs)
+
+            console = io.StringIO()
+            started = time.perf_counter()
+            # 파이프라인 콘솔 출력은 단계별 로그 파일로 보냄
+            with contextlib.redirect_stdout(console):
+                threads = [threading.Thread(target=worker, args=(w,)) for w in range(level)]
+                for t in threads:
+                    t.start()
+                for t in threads:
+                    t.join()
+                print_tier_stats()
+            elapsed = time.perf_counter() - started
+            for session in sessions:
+                session.close()
+            with open(os.path.join(run_dir, f"level_{level}.log"), "w", encoding="utf-8") as f:
+                f.write(console.getvalue())
+
+            sent = sum(s.get("전송 성공") for s in summaries)
+            insert_ms = [v * 1000 for v in recorder.samples.get("/voc/insert", [])]
+            login_ms = [v * 1000 for v in recorder.samples.get("/login", [])]
+            gemini_ms = [v * 1000 for m in models for v in m.latencies]
+            all_tier_stats = [tier_stats(m) for m in models]
+            row = {
+                "concurrency": level,
+                "rows": level * args.rows,
+                "sent": sent,
+                "failed": sum(s.get("전송 실패") + s.get("VOC유형 검증 제외") + s.get("폼 제약 위반 제외") for s in summaries),
+                "elapsed_sec": round(elapsed, 2),
+                "throughput_per_sec": round(sent / elapsed, 2) if elapsed else 0.0,
+                "insert_p50_ms": round(percentile(insert_ms, 50)), "insert_p90_ms": round(percentile(insert_ms, 90)),
+                "insert_p99_ms": round(percentile(insert_ms, 99)),
+                "login_p50_ms": round(percentile(login_ms, 50)), "login_p99_ms": round(percentile(login_ms, 99)),
+                "gemini_calls": sum(m.calls for m in models),
+                "gemini_p50_ms": round(percentile(gemini_ms, 50)), "gemini_p90_ms": round(percentile(gemini_ms, 90)),
+                "gemini_p99_ms": round(percentile(gemini_ms, 99)),
+                "gemini_hedged": sum(t.hedged for t in all_tier_stats),
+                "gemini_hedge_wins": sum(t.hedge_wins for t in all_tier_stats),
+                "gemini_escalated": sum(t.escalated for t in all_tier_stats),
+                "gemini_cost_usd": round(sum(t.cost for t in all_tier_stats), 6),
+                "server_errors": sum(c for k, c in server.stats.items() if k.endswith((" 500", " 502", " 503", " 504"))),
+                "session_expired": server.stats.get("session expired", 0),
+            }
+            results.append(row)
+            print(f" - 동시 {level}: {sent}/{row['rows']}건 전송, {row['elapsed_sec']}초, {row['throughput_per_sec']}건/초, "
+                  f"등록 p50/p90/p99 {row['insert_p50_ms']}/{row['insert_p90_ms']}/{row['insert_p99_ms']}ms, "
+                  f"Gemini {row['gemini_calls']}회 p99 {row['gemini_p99_ms']}ms (헤지 {row['gemini_hedged']}, 상위 모델 전환 {row['gemini_escalated']}), 서버 오류 {row['server_errors']}, 세션 만료 {row['session_expired']}")
+    finally:
+        server.stop()
+
+    result_path = os.path.join(run_dir, "results.csv")
+    with open(result_path, "w", encoding="utf-8-sig", newline="") as f:
+        writer = csv.DictWriter(f, fieldnames=RESULT_COLUMNS)
+        writer.writeheader()
+        writer.writerows(results)
+    print(f"📁 부하 테스트 결과는 '{result_path}'에 저장되었습니다. (단계별 콘솔 로그: level_<동시 실행 수>.log)")
+    return results
+
+
+if __name__ == "__main__":
+    main()
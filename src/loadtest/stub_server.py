@@ -0,0 +1,217 @@
+# src/loadtest/stub_server.py
+import math
+import random
+import secrets
+import threading
+import time
+from collections import Counter
+from http.server import BaseHTTPRequestHandler, ThreadingHTTPServer
+from urllib.parse import parse_qs
+
+from src.voc_form import CONSTANT_FIELDS, ROW_FIELDS
+
+LOGIN_PATH = "/login"
+VOC_PAGE_PATH = "/voc"
+VOC_INSERT_PATH = "/voc/insert"
+SESSION_COOKIE = "JSESSIONID"
+
+
+class LatencyProfile:
+    """
+    로그정규 분포로 응답 지연을 만들어 냅니다. 중앙값과 p99(ms)로 분포 모양을 지정합니다.
+    (대부분은 빠르고 가끔 매우 느린 실제 서버 응답과 비슷한 꼬리 분포)
+    """
+    def __init__(self, median_ms: float = 50, p99_ms: float = 300):
+        self.median_ms = median_ms
+        self.p99_ms = max(p99_ms, median_ms)
+        self._mu = math.log(max(median_ms, 0.001))
+        # p99 = median * exp(2.326 * sigma)
+        self._sigma = math.log(self.p99_ms / max(median_ms, 0.001)) / 2.326
+
+    def sample(self) -> float:
+        """지연 시간(초)"""
+        if self.median_ms <= 0:
+            return 0.0
+        return random.lognormvariate(self._mu, self._sigma) / 1000
+
+    def __repr__(self):
+        return f"LatencyProfile(median_ms={self.median_ms}, p99_ms={self.p99_ms})"
+
+
+class EndpointBehavior:
+    """엔드포인트 하나의 지연 분포와 오류율(error_status 응답 비율)"""
+    def __init__(self, latency: LatencyProfile = None, error_rate: float = 0.0, error_status: int = 503):
+        self.latency = latency or LatencyProfile()
+        self.error_rate = error_rate
+        self.error_status = error_status
+
+
+def build_voc_page_html() -> str:
+    """실제 VOC 등록 화면처럼 등록 폼 필드가 들어 있는 HTML"""
+    inputs = []
+    for name in CONSTANT_FIELDS + ROW_FIELDS + ("insert_date",):
+        if name in ("voc_contents", "work_contents"):
+            inputs.append(f'<textarea name="{name}" maxlength="4000"></textarea>')
+        elif name in ("work_yn", "work_status"):
+            inputs.append(f'<select name="{name}"><option value="Y">Y</option><option value="N">N</option></select>')
+        else:
+            inputs.append(f'<input type="text" name="{name}" maxlength="100">')
+    return (
+        "<html><body><form id=\"vocForm\" method=\"post\" action=\"" + VOC_INSERT_PATH + "\">\n"
+        + "\n".join(inputs)
+        + "\n</form></body></html>"
+    )
+
+
+class StubVocServer:
+    """
+    AuthService(로그인, VOC 화면)와 send_voc_data_to_api(VOC 등록)가 호출하는 엔드포인트를 흉내 내는 로컬 HTTP 서버입니다.
+
+    - 엔드포인트별 지연 분포/오류율을 EndpointBehavior로 지정합니다.
+    - session_ttl(초)을 지정하면 로그인 후 그 시간이 지난 세션은 401(로그인 필요)로 응답합니다.
+    - 요청 수/상태 코드별 건수는 stats에 누적됩니다.
+
+    사용 예:
+        with StubVocServer(insert=EndpointBehavior(LatencyProfile(80, 800), error_rate=0.02)) as server:
+            print(server.insert_url)
+    """
+    def __init__(self, login: EndpointBehavior = None, voc_page: EndpointBehavior = None,
+                 insert: EndpointBehavior = None, session_ttl: float = None, host: str = "127.0.0.1", port: int = 0):
+        self.behaviors = {
+            LOGIN_PATH: login or EndpointBehavior(),
+            VOC_PAGE_PATH: voc_page or EndpointBehavior(),
+            VOC_INSERT_PATH: insert or EndpointBehavior(),
+        }
+        self.session_ttl = session_ttl
+        self.stats = Counter()
+        self._sessions = {} # 세션 ID -> 로그인 시각
+        self._lock = threading.Lock()
+        self._voc_page_html = build_voc_page_html()
+        self._httpd = ThreadingHTTPServer((host, port), self._make_handler())
+        self._httpd.daemon_threads = True
+        self._thread = None
+
+    @property
+    def base_url(self) -> str:
+        host, port = self._httpd.server_address[:2]
+        return f"http://{host}:{port}"
+
+    @property
+    def login_url(self) -> str:
+        return self.base_url + LOGIN_PATH
+
+    @property
+    def voc_url(self) -> str:
+        return self.base_url + VOC_PAGE_PATH
+
+    @property
+    def insert_url(self) -> str:
+        return self.base_url + VOC_INSERT_PATH
+
+    def start(self):
+        self._thread = threading.Thread(target=self._httpd.serve_forever, name="stub-voc-server", daemon=True)
+        self._thread.start()
+        return self
+
+    def stop(self):
+        self._httpd.shutdown()
+        self._httpd.server_close()
+
+    def __enter__(self):
+        return self.start()
+
+    def __exit__(self, exc_type, exc, tb):
+        self.stop()
+
+    def reset_stats(self):
+        with self._lock:
+            self.stats.clear()
+
+    def _count(self, key):
+        with self._lock:
+            self.stats[key] += 1
+
+    def _session_state(self, cookie_header) -> str:
+        """'ok', 'missing', 'expired' 중 하나"""
+        sid = None
+        for part in (cookie_header or "").split(";"):
+            name, _, value = part.strip().partition("=")
+            if name == SESSION_COOKIE:
+                sid = value
+        with self._lock:
+            logged_in_at = self._sessions.get(sid)
+        if logged_in_at is None:
+            return "missing"
+        if self.session_ttl is not None and time.monotonic() - logged_in_at > self.session_ttl:
+            return "expired"
+        return "ok"
+
+    def _make_handler(self):
+        server = self
+
+        class Handler(BaseHTTPRequestHandler):
+            protocol_version = "HTTP/1.1"
+
+            def log_message(self, format, *args):
+                pass # 요청마다 콘솔 출력하지 않음
+
+            def _reply(self, status, body="", headers=None):
+                data = body.encode("utf-8")
+                self.send_response(status)
+                self.send_header("Content-Type", "text/html; charset=utf-8")
+                self.send_header("Content-Length", str(len(data)))
+                for key, value in (headers or {}).items():
+                    self.send_header(key, value)
+                self.end_headers()
+                self.wfile.write(data)
+                server._count(f"{self.path} {status}")
+
+            def _simulate(self, path) -> bool:
+                """지연을 적용하고, 오류를 주입했으면 True"""
+                behavior = server.behaviors[path]
+                time.sleep(behavior.latency.sample())
+                if random.random() < behavior.error_rate:
+                    self._reply(behavior.error_status, "temporarily unavailable")
+                    return True
+                return False
+
+            def _read_form(self) -> dict:
+                length = int(self.headers.get("Content-Length") or 0)
+                body = self.rfile.read(length).decode("utf-8") if length else ""
+                return {k: v[0] for k, v in parse_qs(body, keep_blank_values=True).items()}
+
+            def do_POST(self):
+                path = self.path.split("?")[0]
+                if path not in (LOGIN_PATH, VOC_INSERT_PATH):
+                    return self._reply(404, "not found")
+                form = self._read_form()
+                if self._simulate(path):
+                    return
+                if path == LOGIN_PATH:
+                    if not form.get("swpid"):
+                        return self._reply(200, "<html>로그인 정보가 올바르지 않습니다.</html>")
+                    sid = secrets.token_hex(16)
+                    with server._lock:
+                        server._sessions[sid] = time.monotonic()
+                    return self._reply(200, "<html>welcome</html>", {"Set-Cookie": f"{SESSION_COOKIE}={sid}; Path=/"})
+                state = server._session_state(self.headers.get("Cookie"))
+                if state != "ok":
+                    server._count(f"session {state}")
+                    return self._reply(401, "<html>로그인이 필요합니다.</html>")
+                if not form.get("voc_contents"):
+                    return self._reply(400, "voc_contents is required")
+                return self._reply(200, '{"result": "ok"}')
+
+            def do_GET(self):
+                path = self.path.split("?")[0]
+                if path != VOC_PAGE_PATH:
+                    return self._reply(404, "not found")
+                if self._simulate(path):
+                    return
+                state = server._session_state(self.headers.get("Cookie"))
+                if state != "ok":
+                    server._count(f"session {state}")
+                    return self._reply(401, "<html>로그인이 필요합니다.</html>")
+                return self._reply(200, server._voc_page_html)
+
+        return Handler
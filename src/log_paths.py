@@ -0,0 +1,16 @@
+# src/log_paths.py
+import itertools
+import os
+import time
+
+_sequence = itertools.count(1) # 프로세스 안에서 만든 로그 파일 순번
+
+
+def unique_log_path(directory, prefix, ext) -> str:
+    """
+    `<prefix>_<timestamp>_<pid>_<순번>.<ext>` 형식의 로그 파일 경로를 만듭니다.
+    데몬 모드에서 여러 파일을 같은 초에 처리해도 서로의 로그를 덮어쓰거나 섞지 않도록
+    프로세스 ID와 프로세스 안의 순번을 붙입니다.
+    """
+    timestamp = time.strftime("%Y%m%d_%H%M%S", time.localtime())
+    return os.path.join(directory, f"{prefix}_{timestamp}_{os.getpid()}_{next(_sequence)}.{ext}")
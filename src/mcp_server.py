@@ -1,6 +1,11 @@
 import asyncio
 import sys
 import os
+import re
+import threading
+import unicodedata
+from collections import OrderedDict
+from datetime import datetime
 from pathlib import Path
 from typing import List
 from mcp import Tool
@@ -13,16 +18,223 @@ DATA_DIR = BASE_DIR / "data"
 
 server = Server("voc_agent_server")
 
+_NGRAM_SIZE = 2
+_NORMALIZE_RE = re.compile(r"[\s_\-\.\(\)\[\]]+")
+# main.py가 처리할 수 있는 VOC 파일 확장자 (src.voc_pipeline.VOC_FILE_EXTENSIONS와 같게 유지)
+VOC_FILE_EXTENSIONS = ('.csv', '.xlsx', '.xlsm', '.xls')
+# Excel 행 수를 셀 시트 (src.config의 VOC_EXCEL_SHEET_NAME과 같은 환경 변수, 비어 있으면 첫 번째 시트)
+# config는 Gemini 모델까지 초기화하므로 MCP 서버에서는 불러오지 않음
+VOC_EXCEL_SHEET_NAME = os.getenv("VOC_EXCEL_SHEET_NAME", "")
+# 파일별 행 수 캐시 최대 건수 (오래 사용하지 않은 항목부터 제거)
+_ROW_COUNT_CACHE_MAX = 1000
+
+
+def _is_voc_file(name: str) -> bool:
+    """VOC 파일인지 확인 (Excel이 열려 있을 때 생기는 '~$' 잠금 파일은 제외)."""
+    return name.lower().endswith(VOC_FILE_EXTENSIONS) and not name.startswith('~$')
+
+
+def _normalize_name(name: str) -> str:
+    """파일명 비교용 정규화: 유니코드 NFC, 소문자, VOC 파일 확장자 및 공백/구분자 제거."""
+    name = unicodedata.normalize('NFC', name).lower()
+    for ext in VOC_FILE_EXTENSIONS:
+        if name.endswith(ext):
+            name = name[:-len(ext)]
+            break
+    return _NORMALIZE_RE.sub('', name)
+
+
+def _ngrams(text: str) -> set[str]:
+    if len(text) < _NGRAM_SIZE:
+        return {text} if text else set()
+    return {text[i:i + _NGRAM_SIZE] for i in range(len(text) - _NGRAM_SIZE + 1)}
+
+
+class CsvIndex:
+    """
+    data 폴더의 VOC 파일(CSV/Excel) 목록을 캐시하는 인덱스입니다.
+    디렉토리 mtime이 바뀐 경우에만 다시 스캔하며, 정규화된 파일명과 n-gram 역색인으로
+    유사 파일명 검색을 빠르게 처리합니다. 행 수는 파일 (크기, mtime)별로 필요할 때만 계산합니다.
+    """
+    def __init__(self, data_dir: Path):
+        self.data_dir = data_dir
+        self._lock = threading.Lock()
+        self._dir_mtime = None
+        self._entries = {}      # 파일명 -> {'path', 'size', 'mtime', 'norm'}
+        self._sorted_names = []
+        self._by_lower = {}     # 소문자 파일명 -> 파일명
+        self._by_norm = {}      # 정규화된 이름 -> [파일명]
+        self._ngram_index = {}  # n-gram -> {파일명}
+        self._row_counts = OrderedDict()  # (파일명, size, mtime) -> 행 수 (최근 사용 순)
+        self._row_counts_lock = threading.Lock()
+
+    def refresh(self, force: bool = False) -> bool:
+        """디렉토리가 변경되었으면 다시 스캔합니다. data 폴더가 없으면 False."""
+        try:
+            dir_mtime = self.data_dir.stat().st_mtime_ns
+        except FileNotFoundError:
+            with self._lock:
+                self._dir_mtime = None
+                self._entries, self._sorted_names = {}, []
+                self._by_lower, self._by_norm, self._ngram_index = {}, {}, {}
+            return False
+
+        with self._lock:
+            if not force and dir_mtime == self._dir_mtime:
+                return True
+            entries = {}
+            with os.scandir(self.data_dir) as it:
+                for e in it:
+                    if not e.is_file() or not _is_voc_file(e.name):
+                        continue
+                    st = e.stat()
+                    entries[e.name] = {
+                        'path': Path(e.path).resolve(),
+                        'size': st.st_size,
+                        'mtime': st.st_mtime,
+                        'norm': _normalize_name(e.name),
+                    }
+            by_norm, ngram_index = {}, {}
+            for fname, entry in entries.items():
+                by_norm.setdefault(entry['norm'], []).append(fname)
+                for g in _ngrams(entry['norm']):
+                    ngram_index.setdefault(g, set()).add(fname)
+            self._entries = entries
+            self._sorted_names = sorted(entries)
+            self._by_lower = {unicodedata.normalize('NFC', f).lower(): f for f in entries}
+            self._by_norm = by_norm
+            self._ngram_index = ngram_index
+            self._dir_mtime = dir_mtime
+            return True
+
+    def names(self) -> list[str]:
+        return list(self._sorted_names)
+
+    def entry(self, fname: str) -> dict | None:
+        return self._entries.get(fname)
+
+    def exact(self, name: str) -> Path | None:
+        """대소문자 무시 완전 일치 파일 경로."""
+        fname = self._by_lower.get(unicodedata.normalize('NFC', name).lower())
+        return self._entries[fname]['path'] if fname else None
+
+    def search(self, query: str, limit: int = 20) -> tuple[list[str], list[str]]:
+        """
+        정규화된 이름 기준으로 검색합니다.
+
+        Returns:
+            (일치 후보, 유사 후보): 일치 후보는 정규화 이름이 같거나 포함하는 파일,
+            유사 후보는 n-gram 겹침 비율이 높은 순서의 파일 (일치 후보가 없을 때만 계산)
+        """
+        norm = _normalize_name(query)
+        if not norm:
+            return [], []
+        if norm in self._by_norm:
+            return sorted(self._by_norm[norm]), []
+        if len(norm) < _NGRAM_SIZE:
+            # n-gram보다 짧은 검색어(한 글자)는 역색인에 없으므로 정규화 이름에서 직접 찾음
+            return sorted(fname for fname, entry in self._entries.items() if norm in entry['norm']), []
+
+        grams = _ngrams(norm)
+        scores = {}
+        for g in grams:
+            for fname in self._ngram_index.get(g, ()):
+                scores[fname] = scores.get(fname, 0) + 1
+
+        # 모든 n-gram을 가진 파일만 부분 포함 여부를 확인
+        contains = sorted(
+            fname for fname, cnt in scores.items()
+            if cnt == len(grams) and norm in self._entries[fname]['norm']
+        )
+        if contains:
+            return contains, []
+
+        ranked = sorted(
+            scores.items(),
+            key=lambda kv: (-kv[1] / len(grams | _ngrams(self._entries[kv[0]]['norm'])), kv[0])
+        )
+        similar = [fname for fname, cnt in ranked if cnt / len(grams) >= 0.5][:limit]
+        return [], similar
+
+    def row_count(self, fname: str) -> int | None:
+        """
+        헤더를 제외한 행 수 (파일 크기/mtime이 같으면 캐시 사용). Excel은 시트 범위 기준 행 수.
+        파일을 끝까지 읽을 수 있으므로 이벤트 루프에서는 asyncio.to_thread로 호출합니다.
+        """
+        entry = self._entries.get(fname)
+        if not entry:
+            return None
+        # 파일 내용만 바뀐 경우 디렉토리 mtime은 그대로이므로 파일 자체를 다시 확인
+        try:
+            st = entry['path'].stat()
+            entry['size'], entry['mtime'] = st.st_size, st.st_mtime
+        except OSError:
+            return None
+        key = (fname, entry['size'], entry['mtime'])
+        with self._row_counts_lock:
+            if key in self._row_counts:
+                self._row_counts.move_to_end(key)
+                return self._row_counts[key]
+        if not fname.lower().endswith('.csv'):
+            rows = _excel_row_count(entry['path'])
+            if rows is None:
+                return None
+        else:
+            try:
+                lines = 0
+                last = b'\n'
+                with open(entry['path'], 'rb') as f:
+                    for chunk in iter(lambda: f.read(1 << 20), b''):
+                        lines += chunk.count(b'\n')
+                        last = chunk[-1:]
+                if last != b'\n':
+                    lines += 1
+                rows = max(lines - 1, 0)
+            except OSError:
+                return None
+        with self._row_counts_lock:
+            self._row_counts[key] = rows
+            while len(self._row_counts) > _ROW_COUNT_CACHE_MAX:
+                self._row_counts.popitem(last=False)
+        return rows
+
+
+def _excel_row_count(path: Path) -> int | None:
+    """
+    VOC_EXCEL_SHEET_NAME 시트(비어 있으면 첫 번째 시트)의 사용 범위로 헤더를 제외한 행 수를 구합니다.
+    (읽기 전용 모드라 시트 전체를 읽지 않음) openpyxl이 없거나 구버전 .xls이거나 시트가 없으면 None.
+    """
+    if path.suffix.lower() not in ('.xlsx', '.xlsm'):
+        return None
+    try:
+        from openpyxl import load_workbook
+    except ImportError:
+        return None
+    try:
+        workbook = load_workbook(path, read_only=True)
+        try:
+            sheet = workbook[VOC_EXCEL_SHEET_NAME] if VOC_EXCEL_SHEET_NAME else workbook.worksheets[0]
+            max_row = sheet.max_row
+        finally:
+            workbook.close()
+    except Exception:
+        return None
+    return max(max_row - 1, 0) if max_row else None
+
+
+csv_index = CsvIndex(DATA_DIR)
+
+
 @server.list_tools()
 async def list_tools() -> List[Tool]:
     return [
         Tool(
             name="run_main_py",
-            description="main.py 실행 (data 폴더 안 CSV 파일 처리). csv_name은 파일명만 주어도 됨 (확장자 생략 가능).",
+            description="main.py 실행 (data 폴더 안 CSV/Excel 파일 처리). csv_name은 파일명만 주어도 됨 (확장자 생략 가능).",
             inputSchema={
                 "type": "object",
                 "properties": {
-                    "csv_name": {"type": "string", "description": "처리할 CSV 파일명 (예: VOC_일괄등록(8월) 또는 VOC_일괄등록(8월).csv)"}
+                    "csv_name": {"type": "string", "description": "처리할 VOC 파일명 (예: VOC_일괄등록(8월), VOC_일괄등록(8월).csv 또는 VOC_일괄등록(8월).xlsx)"}
                 },
                 "required": ["csv_name"],
                 "additionalProperties": False
@@ -30,17 +242,21 @@ async def list_tools() -> List[Tool]:
         ),
         Tool(
             name="list_csv_files",
-            description="data 폴더 내 CSV 파일 목록 반환",
+            description="data 폴더 내 VOC 파일(CSV/Excel) 목록 반환 (크기, 행 수, 수정 시각 포함, 페이지 단위 조회)",
             inputSchema={
                 "type": "object",
-                "properties": {},
+                "properties": {
+                    "page": {"type": "integer", "minimum": 1, "description": "조회할 페이지 (기본 1)"},
+                    "page_size": {"type": "integer", "minimum": 1, "maximum": 200, "description": "페이지당 파일 수 (기본 50)"},
+                    "query": {"type": "string", "description": "파일명 일부 (지정 시 유사한 파일만 표시)"}
+                },
                 "additionalProperties": False
             }
         )
     ]
 
 def _find_csv(csv_name: str) -> tuple[Path | None, str | None]:
-    """파일명만 받아 data 폴더에서 CSV 찾기 (대소문자 구분 안함, 확장자 생략 지원)."""
+    """파일명만 받아 data 폴더에서 VOC 파일(CSV/Excel) 찾기 (대소문자 구분 안함, 확장자 생략 지원)."""
     if not DATA_DIR.exists():
         return None, f"❌ data 폴더가 없습니다: {DATA_DIR}"
 
@@ -57,32 +273,27 @@ def _find_csv(csv_name: str) -> tuple[Path | None, str | None]:
             return p, None
         return None, f"❌ 경로가 존재하지 않습니다: {p}"
 
-    # 확장자 붙이기 시나리오 준비
-    candidates = []
-    base = name[:-4] if name.lower().endswith('.csv') else name
-
-    # data 디렉토리 내 검색 (대소문자 무시)
-    for f in DATA_DIR.glob('*.csv'):
-        fname_lower = f.name.lower()
-        if name.lower() == f.name.lower():  # 완전 일치
-            return f.resolve(), None
-        if base.lower() == fname_lower[:-4]:  # 확장자 제외 매칭
-            candidates.append(f.resolve())
-        elif base.lower() in fname_lower:  # 부분 포함 (느슨한 매칭)
-            candidates.append(f.resolve())
-
-    # 후보 정리
-    unique = list(dict.fromkeys(candidates))
-    if len(unique) == 1:
-        return unique[0], None
-    if len(unique) > 1:
-        listing = "\n".join(f" - {p.name}" for p in unique[:20])
+    csv_index.refresh()
+    exact = csv_index.exact(name)
+    if exact:
+        return exact, None
+
+    matches, similar = csv_index.search(name)
+    if len(matches) == 1:
+        return csv_index.entry(matches[0])['path'], None
+    if len(matches) > 1:
+        listing = "\n".join(f" - {m}" for m in matches[:20])
         return None, f"❌ 다의적 매칭(여러 파일 후보):\n{listing}\n구체적으로 입력하세요."
 
-    # 아무것도 못 찾음 -> 목록 제공
-    existing = [p.name for p in DATA_DIR.glob('*.csv')]
-    hint = ", ".join(existing) if existing else "(data 폴더 비어있음)"
-    return None, f"❌ '{csv_name}'에 해당하는 CSV를 찾지 못했습니다. 존재 목록: {hint}"
+    # 아무것도 못 찾음 -> 유사 후보 또는 목록 제공
+    if similar:
+        listing = "\n".join(f" - {m}" for m in similar)
+        return None, f"❌ '{csv_name}'에 해당하는 VOC 파일을 찾지 못했습니다. 유사한 파일:\n{listing}"
+    existing = csv_index.names()
+    hint = ", ".join(existing[:20]) if existing else "(data 폴더 비어있음)"
+    if len(existing) > 20:
+        hint += f" 외 {len(existing) - 20}개"
+    return None, f"❌ '{csv_name}'에 해당하는 VOC 파일을 찾지 못했습니다. 존재 목록: {hint}"
 
 async def _exec_main(csv_path: Path) -> TextContent:
     if not MAIN_SCRIPT.exists():
@@ -104,23 +315,46 @@ async def _exec_main(csv_path: Path) -> TextContent:
             text=(
                 f"▶️ 실행: {' '.join(cmd)}\n"
                 f"📂 작업디렉토리: {BASE_DIR}\n"
-                f"� CSV: {csv_path}\n"
+                f"� 파일: {csv_path}\n"
                 f"STDOUT:\n{stdout}\n\nSTDERR:\n{stderr}"
             )
         )
     except Exception as e:
         return TextContent(type="text", text=f"❌ 실행 실패: {e}")
 
+def _format_csv_entry(fname: str) -> str:
+    entry = csv_index.entry(fname)
+    rows = csv_index.row_count(fname)
+    size_kb = entry['size'] / 1024
+    modified = datetime.fromtimestamp(entry['mtime']).strftime('%Y-%m-%d %H:%M')
+    rows_text = f"{rows}행" if rows is not None else "행 수 확인 불가"
+    return f" - {fname} ({size_kb:,.1f}KB, {rows_text}, 수정 {modified})"
+
 @server.call_tool()
 async def call_tool(name: str, arguments: dict) -> List[TextContent]:
     if name == "list_csv_files":
-        if not DATA_DIR.exists():
+        if not csv_index.refresh():
             return [TextContent(type="text", text=f"data 폴더가 없습니다: {DATA_DIR}")]
-        files = sorted([p for p in DATA_DIR.glob('*.csv')])
+        query = (arguments.get("query") or "").strip()
+        if query:
+            matches, similar = csv_index.search(query, limit=200)
+            files = matches or similar
+        else:
+            files = csv_index.names()
         if not files:
-            return [TextContent(type="text", text="(CSV 없음)")]
-        listing = "\n".join(f" - {p.name}" for p in files[:200])
-        return [TextContent(type="text", text=f"총 {len(files)}개 CSV:\n{listing}")]
+            return [TextContent(type="text", text="(VOC 파일 없음)")]
+        page_size = min(max(int(arguments.get("page_size") or 50), 1), 200)
+        total_pages = (len(files) + page_size - 1) // page_size
+        page = min(max(int(arguments.get("page") or 1), 1), total_pages)
+        start = (page - 1) * page_size
+        # 행 수 계산은 파일을 읽으므로 이벤트 루프를 막지 않도록 별도 스레드에서 수행
+        page_files = files[start:start + page_size]
+        lines = await asyncio.to_thread(lambda: [_format_csv_entry(f) for f in page_files])
+        listing = "\n".join(lines)
+        return [TextContent(
+            type="text",
+            text=f"총 {len(files)}개 VOC 파일 (페이지 {page}/{total_pages}):\n{listing}"
+        )]
 
     if name == "run_main_py":
         csv_name = arguments.get("csv_name")
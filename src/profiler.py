@@ -0,0 +1,161 @@
+# src/profiler.py
+import contextlib
+import cProfile
+import os
+import pstats
+import sys
+import threading
+import time
+import tracemalloc
+
+from src.config.config import PROFILE_DIR, PROFILE_TOP_ALLOCATIONS
+
+# Python 3.12부터 cProfile은 sys.monitoring 기반이라 프로세스 전체(모든 스레드)를 기록하며 동시에 하나만 켤 수 있음
+PROCESS_WIDE_CPROFILE = sys.version_info >= (3, 12)
+
+
+class StageProfiler:
+    """
+    파이프라인 단계(로딩, 검증, 추론, 폼 생성, 전송)별로 CPU 호출 프로파일과 메모리 할당을 기록합니다.
+
+    - 단계마다 cProfile 결과를 `<순번>_<단계>.prof` 파일로 저장합니다. (snakeviz, `python -m pstats` 등으로 열 수 있음)
+    - tracemalloc으로 단계별 최대 메모리와 할당 증가량이 큰 위치 상위 N개를 `<순번>_<단계>_memory.txt`에 저장합니다.
+    - 마지막에 단계별 소요 시간/최대 메모리를 `summary.txt`로 정리하여 실행 간 비교에 사용합니다.
+    - stage()는 여러 스레드에서 동시에 사용할 수 있습니다. (스트림 모드의 단계별 스레드)
+      동시에 실행되는 단계는 concurrent()로 감싸며, Python 3.11 이하에서는 단계 스레드마다 CPU 프로파일을 따로 저장하고
+      3.12 이상에서는 concurrent() 구간 전체를 하나의 CPU 프로파일로 저장합니다. (단계는 스레드 함수 아래에 나타남)
+      동시에 실행된 단계의 메모리 수치는 다른 단계의 할당도 포함합니다.
+
+    사용 예:
+        profiler = StageProfiler()
+        with profiler.stage("validation"):
+            ...
+        profiler.close()
+    """
+    def __init__(self, profile_dir=PROFILE_DIR, top_n=PROFILE_TOP_ALLOCATIONS):
+        timestamp = time.strftime("%Y%m%d_%H%M%S", time.localtime())
+        self.path = os.path.join(profile_dir, f"profile_{timestamp}")
+        self.top_n = top_n
+        self.stages = [] # (단계, 소요 시간(초), 최대 메모리(byte), 할당 증가량(byte), .prof 경로 또는 None)
+        self._lock = threading.Lock()
+        self._started_count = 0
+        self._active = 0 # 실행 중인 단계 수 (동시에 실행 중이면 최대 메모리를 초기화하지 않음)
+        self._shared_cpu = False # concurrent() 구간의 프로세스 전체 CPU 프로파일이 켜져 있으면 stage()는 CPU 프로파일을 켜지 않음
+        self.shared_profiles = [] # (구간, .prof 경로)
+        os.makedirs(self.path, exist_ok=True)
+        self._started_tracing = not tracemalloc.is_tracing()
+        if self._started_tracing:
+            tracemalloc.start(25)
+
+    def _next_prefix(self, name: str) -> str:
+        with self._lock:
+            self._started_count += 1
+            return os.path.join(self.path, f"{self._started_count:02d}_{name}")
+
+    def _enable_cpu_profile(self, name: str):
+        """cProfile을 켜서 반환합니다. 다른 프로파일러가 이미 동작 중이면(Python 3.12 이상) None"""
+        profile = cProfile.Profile()
+        try:
+            profile.enable()
+        except ValueError as e:
+            print(f"⚠️ [프로파일] {name}: CPU 프로파일을 시작하지 못했습니다. ({e})")
+            return None
+        return profile
+
+    @contextlib.contextmanager
+    def concurrent(self, name: str):
+        """
+        여러 스레드에서 동시에 실행되는 단계들을 감쌉니다. (스트림 모드)
+        Python 3.12 이상에서는 이 구간 동안 모든 스레드를 하나의 CPU 프로파일(`<순번>_<name>.prof`)로 기록하고,
+        안쪽 stage()는 소요 시간/메모리만 기록합니다. 3.11 이하에서는 stage()가 스레드별로 기록하므로 아무 것도 하지 않습니다.
+        """
+        if not PROCESS_WIDE_CPROFILE:
+            yield
+            return
+        prefix = self._next_prefix(name)
+        profile = self._enable_cpu_profile(name)
+        self._shared_cpu = profile is not None
+        try:
+            yield
+        finally:
+            self._shared_cpu = False
+            if profile is not None:
+                profile.disable()
+                prof_path = f"{prefix}.prof"
+                profile.dump_stats(prof_path)
+                with self._lock:
+                    self.shared_profiles.append((name, prof_path))
+
+    @contextlib.contextmanager
+    def stage(self, name: str):
+        prefix = self._next_prefix(name)
+        with self._lock:
+            if self._active == 0:
+                tracemalloc.reset_peak()
+            self._active += 1
+        before = tracemalloc.take_snapshot()
+        start_current, _ = tracemalloc.get_traced_memory()
+        started = time.perf_counter()
+        profile = None if self._shared_cpu else self._enable_cpu_profile(name)
+        try:
+            yield
+        finally:
+            if profile is not None:
+                profile.disable()
+            elapsed = time.perf_counter() - started
+            current, peak = tracemalloc.get_traced_memory()
+            after = tracemalloc.take_snapshot()
+
+            prof_path = None
+            if profile is not None:
+                prof_path = f"{prefix}.prof"
+                profile.dump_stats(prof_path)
+            self._write_memory_report(f"{prefix}_memory.txt", name, before, after, peak, current - start_current)
+            with self._lock:
+                self._active -= 1
+                self.stages.append((name, elapsed, peak, current - start_current, prof_path))
+            print(f"⏱️ [프로파일] {name}: {elapsed:.2f}초, 최대 메모리 {peak / 1024 / 1024:.1f}MB")
+
+    def _write_memory_report(self, path, name, before, after, peak, net):
+        filters = [
+            tracemalloc.Filter(False, tracemalloc.__file__),
+            tracemalloc.Filter(False, "<frozen importlib._bootstrap>"),
+        ]
+        diff = after.filter_traces(filters).compare_to(before.filter_traces(filters), "traceback")
+        with open(path, "w", encoding="utf-8") as f:
+            f.write(f"stage: {name}\n")
+            f.write(f"peak: {peak / 1024 / 1024:.2f} MB\n")
+            f.write(f"net allocated: {net / 1024 / 1024:.2f} MB\n\n")
+            f.write(f"top {self.top_n} allocation sites (size diff)\n")
+            for no, stat in enumerate(diff[:self.top_n], start=1):
+                f.write(f"\n#{no} {stat.size_diff / 1024:+.1f} KiB ({stat.count_diff:+d} blocks)\n")
+                for line in stat.traceback.format(limit=5):
+                    f.write(f"{line}\n")
+
+    def close(self):
+        """단계별 요약(summary.txt)과 CPU 상위 함수(각 .prof의 누적 시간 기준)를 저장하고 추적을 종료합니다."""
+        summary_path = os.path.join(self.path, "summary.txt")
+        with open(summary_path, "w", encoding="utf-8") as f:
+            f.write("stage\tseconds\tpeak_mb\tnet_mb\n")
+            for name, elapsed, peak, net, _ in self.stages:
+                f.write(f"{name}\t{elapsed:.3f}\t{peak / 1024 / 1024:.2f}\t{net / 1024 / 1024:.2f}\n")
+            cpu_profiles = [(name, prof_path) for name, _, _, _, prof_path in self.stages if prof_path]
+            for name, prof_path in cpu_profiles + self.shared_profiles:
+                f.write(f"\n===== {name} (cumulative top {self.top_n}) =====\n")
+                stats = pstats.Stats(prof_path, stream=f)
+                stats.sort_stats("cumulative").print_stats(self.top_n)
+        if self._started_tracing:
+            tracemalloc.stop()
+        print(f"📁 프로파일 결과는 '{self.path}'에 저장되었습니다.")
+
+
+class NullProfiler:
+    """프로파일 모드가 아닐 때 사용하는 아무 것도 하지 않는 프로파일러"""
+    def stage(self, name: str):
+        return contextlib.nullcontext()
+
+    def concurrent(self, name: str):
+        return contextlib.nullcontext()
+
+    def close(self):
+        pass
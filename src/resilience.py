@@ -0,0 +1,275 @@
+# src/resilience.py
+import random
+import threading
+import time
+from email.utils import parsedate_to_datetime
+
+import requests
+from urllib3.exceptions import NewConnectionError
+
+from src.config.config import (
+    RETRY_MAX_ATTEMPTS, RETRY_BASE_DELAY, RETRY_MAX_DELAY,
+    CIRCUIT_FAILURE_THRESHOLD, CIRCUIT_RESET_TIMEOUT, CIRCUIT_MAX_OPEN_CYCLES
+)
+
+# 재시도할 HTTP 상태 코드 (요청 시간 초과, 과다 요청, 서버 측 일시 오류)
+RETRYABLE_STATUS_CODES = {408, 425, 429, 500, 502, 503, 504}
+# 멱등이 아닌 호출(VOC 등록 POST)은 서버가 요청을 처리하지 않았음이 확실한 응답만 재시도
+# (500/502/504나 응답 대기 시간 초과는 이미 등록되었을 수 있으므로 재시도하면 중복 등록 위험)
+NON_IDEMPOTENT_RETRYABLE_STATUS_CODES = {429, 503}
+# 멱등이 아닌 호출기 이름
+NON_IDEMPOTENT_CALLERS = {'voc_insert'}
+
+
+class CircuitOpenError(RuntimeError):
+    """
+    회로 차단기가 열린 상태가 반복되어 더 이상 호출하지 않을 때 발생하는 예외입니다.
+    Gemini 추론에서는 rate_limit_guard의 RuntimeError와 같이 '더 이상 진행하지 않음'으로 처리됩니다.
+    """
+
+
+class _RetryableResponse(Exception):
+    """재시도 대상 HTTP 응답을 재시도 루프 안에서 전달하기 위한 내부 예외"""
+    def __init__(self, response, retry_after):
+        super().__init__(f"HTTP {response.status_code}")
+        self.response = response
+        self.retry_after = retry_after
+
+
+def parse_retry_after(value) -> float | None:
+    """Retry-After 헤더(초 또는 HTTP 날짜)를 대기 초로 변환합니다."""
+    if value is None:
+        return None
+    value = str(value).strip()
+    try:
+        return max(float(value), 0.0)
+    except ValueError:
+        pass
+    try:
+        return max(parsedate_to_datetime(value).timestamp() - time.time(), 0.0)
+    except (TypeError, ValueError, IndexError, OverflowError):
+        return None
+
+
+def classify_response(response, idempotent=True) -> tuple[bool, float | None]:
+    """
+    HTTP 응답을 분류합니다. idempotent가 False이면 429/503만 재시도 대상입니다.
+
+    Returns:
+        (재시도 가능 여부, Retry-After 대기 초 또는 None)
+    """
+    if response.ok:
+        return False, None
+    retryable = response.status_code in (RETRYABLE_STATUS_CODES if idempotent else NON_IDEMPOTENT_RETRYABLE_STATUS_CODES)
+    return retryable, parse_retry_after(response.headers.get('Retry-After')) if retryable else None
+
+
+def _is_connect_error(exc) -> bool:
+    """요청을 서버에 보내기 전에 실패한 연결 오류인지 (연결 거부, 연결 시간 초과)"""
+    if isinstance(exc, requests.exceptions.ConnectTimeout):
+        return True
+    if not isinstance(exc, requests.exceptions.ConnectionError) or isinstance(exc, requests.exceptions.Timeout):
+        return False
+    reason = getattr(exc.args[0], 'reason', None) if exc.args else None
+    return isinstance(reason, NewConnectionError)
+
+
+def classify_exception(exc, idempotent=True) -> tuple[bool, float | None]:
+    """
+    호출 중 발생한 예외를 분류합니다.
+    requests의 연결 오류/시간 초과와 Gemini(google.api_core)의 429/5xx 오류는 재시도 대상이며,
+    rate_limit_guard의 RuntimeError 같은 로컬 제한이나 입력 오류는 재시도하지 않습니다.
+    idempotent가 False이면 연결 자체가 안 된 오류와 429/503 응답만 재시도합니다.
+
+    Returns:
+        (재시도 가능 여부, Retry-After 대기 초 또는 None)
+    """
+    if isinstance(exc, _RetryableResponse):
+        return True, exc.retry_after
+    if not idempotent:
+        if _is_connect_error(exc):
+            return True, None
+        if isinstance(exc, requests.exceptions.HTTPError) and exc.response is not None:
+            return classify_response(exc.response, idempotent=False)
+        return False, None
+    if isinstance(exc, (requests.exceptions.ConnectionError, requests.exceptions.Timeout)):
+        return True, None
+    if isinstance(exc, requests.exceptions.HTTPError) and exc.response is not None:
+        return classify_response(exc.response)
+    # google.api_core.exceptions.GoogleAPICallError는 HTTP 상태 코드를 code 속성으로 가짐
+    code = getattr(exc, 'code', None)
+    if isinstance(code, int) and code in RETRYABLE_STATUS_CODES:
+        return True, None
+    if type(exc).__name__ in ('ServiceUnavailable', 'DeadlineExceeded', 'InternalServerError',
+                              'TooManyRequests', 'ResourceExhausted', 'GatewayTimeout'):
+        return True, None
+    return False, None
+
+
+def is_breaker_failure(result) -> bool:
+    """
+    회로 차단기에 실패로 기록할 결과(응답 또는 예외)인지 판단합니다. 재시도 가능 여부와는 별개입니다.
+    5xx 응답, 연결 오류/시간 초과, 재시도 대상 오류는 서버 장애로 보고 실패로 기록하므로
+    VOC 등록처럼 재시도하지 않는 호출도 서버가 내려가 있으면 회로가 열립니다.
+    2xx~4xx 응답은 서버가 살아 있으므로 실패로 보지 않습니다.
+    """
+    if isinstance(result, requests.Response):
+        return result.status_code >= 500
+    if isinstance(result, _RetryableResponse):
+        return True
+    if isinstance(result, (requests.exceptions.ConnectionError, requests.exceptions.Timeout)):
+        return True
+    if isinstance(result, requests.exceptions.HTTPError) and result.response is not None:
+        return result.response.status_code >= 500
+    return classify_exception(result)[0]
+
+
+class CircuitBreaker:
+    """
+    연속 실패가 failure_threshold에 도달하면 회로를 열고, reset_timeout 동안 호출을 멈췄다가(파이프라인 일시정지)
+    한 번의 시험 호출(half-open)로 복구 여부를 확인합니다.
+    시험 호출이 max_open_cycles 번 연속 실패하면 CircuitOpenError로 더 이상의 호출을 중단합니다.
+    """
+    def __init__(self, name, failure_threshold=CIRCUIT_FAILURE_THRESHOLD,
+                 reset_timeout=CIRCUIT_RESET_TIMEOUT, max_open_cycles=CIRCUIT_MAX_OPEN_CYCLES):
+        self.name = name
+        self.failure_threshold = failure_threshold
+        self.reset_timeout = reset_timeout
+        self.max_open_cycles = max_open_cycles
+        self._lock = threading.Lock()
+        self._failures = 0
+        self._open_until = None
+        self._open_cycles = 0
+        self.open_count = 0
+
+    @property
+    def state(self) -> str:
+        with self._lock:
+            if self._open_until is None:
+                return 'closed'
+            return 'open' if time.monotonic() < self._open_until else 'half-open'
+
+    def before_call(self):
+        """회로가 열려 있으면 닫힐 때까지 대기합니다. 복구 불가로 판단되면 CircuitOpenError를 발생시킵니다."""
+        with self._lock:
+            if self._open_cycles >= self.max_open_cycles:
+                raise CircuitOpenError(f"❌ '{self.name}' 회로 차단: {self._open_cycles}회 연속 복구 실패로 호출을 중단합니다.")
+            wait = (self._open_until - time.monotonic()) if self._open_until else 0
+        if wait > 0:
+            print(f"⏸️ '{self.name}' 회로 열림: {wait:.0f}초 동안 호출을 멈춥니다.")
+            time.sleep(wait)
+
+    def record_success(self):
+        with self._lock:
+            self._failures = 0
+            self._open_until = None
+            self._open_cycles = 0
+
+    def record_failure(self):
+        with self._lock:
+            self._failures += 1
+            half_open = self._open_until is not None
+            if half_open or self._failures >= self.failure_threshold:
+                self._open_cycles += 1 if half_open else 0
+                self._open_until = time.monotonic() + self.reset_timeout
+                self._failures = 0
+                self.open_count += 1
+
+
+class ResilientCaller:
+    """
+    외부 호출(VOC 등록 API, 로그인, Gemini)에 재시도/지수 백오프/회로 차단을 적용하는 공용 호출기입니다.
+    대기 시간은 base_delay * 2^(시도-1)을 상한 max_delay 안에서 full jitter로 정하며,
+    서버가 Retry-After를 주면 그 값을 우선합니다.
+    idempotent가 False인 호출(VOC 등록)은 서버가 처리하지 않았음이 확실한 오류만 재시도합니다.
+    """
+    def __init__(self, name, max_attempts=RETRY_MAX_ATTEMPTS, base_delay=RETRY_BASE_DELAY,
+                 max_delay=RETRY_MAX_DELAY, breaker: CircuitBreaker | None = None, idempotent: bool = True):
+        self.name = name
+        self.idempotent = idempotent
+        self.max_attempts = max(1, max_attempts)
+        self.base_delay = base_delay
+        self.max_delay = max_delay
+        self.breaker = breaker or CircuitBreaker(name)
+        self._lock = threading.Lock()
+        self.stats = {'success': 0, 'retried': 0, 'failed': 0}
+
+    def _count(self, key):
+        with self._lock:
+            self.stats[key] += 1
+
+    def backoff_delay(self, attempt: int, retry_after: float | None = None) -> float:
+        if retry_after is not None:
+            return min(retry_after, self.max_delay)
+        return random.uniform(0, min(self.max_delay, self.base_delay * (2 ** (attempt - 1))))
+
+    def call(self, func, *args, **kwargs):
+        """
+        func(*args, **kwargs)를 호출합니다.
+        func가 requests.Response를 반환하면 상태 코드로 재시도 여부를 판단하고,
+        재시도를 모두 소진한 실패 응답은 그대로 반환하여 호출자가 기존 방식대로 처리하게 합니다.
+        재시도하지 않는 예외나 재시도를 소진한 예외는 그대로 다시 발생합니다.
+        """
+        for attempt in range(1, self.max_attempts + 1):
+            try:
+                self.breaker.before_call()
+            except CircuitOpenError:
+                self._count('failed')
+                raise
+            try:
+                result = func(*args, **kwargs)
+                if isinstance(result, requests.Response):
+                    retryable, retry_after = classify_response(result, self.idempotent)
+                    if retryable:
+                        raise _RetryableResponse(result, retry_after)
+                # 4xx 등 재시도하지 않는 실패 응답은 서버가 살아 있으므로 회로에는 성공으로 기록
+                # (재시도하지 않는 5xx 응답은 서버 장애이므로 실패로 기록)
+                if is_breaker_failure(result):
+                    self.breaker.record_failure()
+                else:
+                    self.breaker.record_success()
+                ok = not isinstance(result, requests.Response) or result.ok
+                self._count('success' if ok else 'failed')
+                return result
+            except Exception as e:
+                retryable, retry_after = classify_exception(e, self.idempotent)
+                if is_breaker_failure(e): # 재시도하지 않는 응답 대기 시간 초과 등도 회로에는 실패로 기록
+                    self.breaker.record_failure()
+                if not retryable or attempt == self.max_attempts:
+                    self._count('failed')
+                    if isinstance(e, _RetryableResponse):
+                        return e.response
+                    raise
+                delay = self.backoff_delay(attempt, retry_after)
+                self._count('retried')
+                print(f"🔁 '{self.name}' 일시 오류({e}), {delay:.1f}초 후 재시도 ({attempt}/{self.max_attempts - 1})")
+                time.sleep(delay)
+
+
+_callers = {}
+_callers_lock = threading.Lock()
+
+
+def get_caller(name: str) -> ResilientCaller:
+    """이름별로 공유되는 ResilientCaller를 반환합니다 (예: 'voc_insert', 'login', 'gemini')."""
+    with _callers_lock:
+        if name not in _callers:
+            _callers[name] = ResilientCaller(name, idempotent=name not in NON_IDEMPOTENT_CALLERS)
+        return _callers[name]
+
+
+def reset_callers():
+    """모든 호출기(통계, 회로 상태)를 초기화합니다. 부하 테스트에서 단계마다 새로 측정할 때 사용합니다."""
+    with _callers_lock:
+        _callers.clear()
+
+
+def add_resilience_stats(run_summary):
+    """각 호출기의 성공/재시도/실패/회로 열림 횟수를 실행 요약에 기록합니다."""
+    with _callers_lock:
+        callers = list(_callers.values())
+    for caller in callers:
+        run_summary.set(f"[{caller.name}] 호출 성공", caller.stats['success'])
+        run_summary.set(f"[{caller.name}] 재시도", caller.stats['retried'])
+        run_summary.set(f"[{caller.name}] 최종 실패", caller.stats['failed'])
+        run_summary.set(f"[{caller.name}] 회로 열림", caller.breaker.open_count)
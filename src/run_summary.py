@@ -0,0 +1,38 @@
+# src/run_summary.py
+
+class RunSummary:
+    """
+    한 번의 실행(run) 동안 단계별 처리 건수를 모아두었다가 마지막에 요약 출력하는 클래스입니다.
+    각 단계는 키(예: '중복 제외(파일 내)')와 건수로 기록됩니다.
+    """
+    def __init__(self):
+        self._counts = {}
+
+    def add(self, key: str, count: int = 1):
+        """
+        지정한 항목의 건수를 누적합니다.
+        """
+        self._counts[key] = self._counts.get(key, 0) + count
+
+    def set(self, key: str, count: int):
+        """
+        지정한 항목의 건수를 덮어씁니다.
+        """
+        self._counts[key] = count
+
+    def get(self, key: str, default: int = 0) -> int:
+        return self._counts.get(key, default)
+
+    def as_dict(self) -> dict:
+        return dict(self._counts)
+
+    def print_summary(self):
+        """
+        누적된 항목들을 입력된 순서대로 출력합니다.
+        """
+        print("\n📊 실행 요약")
+        if not self._counts:
+            print(" - (기록된 항목 없음)")
+            return
+        for key, count in self._counts.items():
+            print(f" - {key}: {count}건")
@@ -0,0 +1,137 @@
+# src/sharded_pipeline.py
+import contextlib
+import io
+import math
+import os
+from concurrent.futures import ProcessPoolExecutor
+
+from src.config.config import SHARD_MIN_ROWS
+from src.valid_voc_data import validate_voc_data, validate_voc_type_only
+from src.validation_report import ValidationReport
+from src.insert_voc import set_qry_params
+
+# 워커 프로세스별 읽기 전용 공유 상태 (매핑, 인사 정보). 워커 시작 시 한 번만 설정됨
+_worker_state = {}
+
+
+class _CollectingReport(ValidationReport):
+    """워커 안에서 오류를 파일 대신 메모리에 모아두었다가 부모 프로세스로 돌려주는 리포트"""
+    def __init__(self):
+        super().__init__()
+        self.entries = []
+
+    def add(self, excel_row, field, error_code, message, value=''):
+        self.entries.append((excel_row, field, error_code, message, value))
+        self.counts[error_code] += 1
+
+    def close(self):
+        pass
+
+
+def _init_worker(required_fields, voc_type_map, voc_recv_map, voc_service_map, insa_info_map):
+    _worker_state.update(
+        required_fields=required_fields,
+        voc_type_map=voc_type_map,
+        voc_recv_map=voc_recv_map,
+        voc_service_map=voc_service_map,
+        insa_info_map=insa_info_map,
+    )
+
+
+def _validate_shard(df_shard):
+    """[워커] 샤드 유효성 검증 -> (유효하지 않은 인덱스, 오류 항목)"""
+    s = _worker_state
+    report = _CollectingReport()
+    # 샤드별 콘솔 출력은 버리고, 요약은 부모 프로세스에서 한 번만 출력
+    with contextlib.redirect_stdout(io.StringIO()):
+        invalid_indexes = validate_voc_data(
+            df_shard, s['required_fields'], s['voc_recv_map'], s['voc_service_map'],
+            s['voc_type_map'], s['insa_info_map'], report
+        )
+    return invalid_indexes, report.entries
+
+
+def _build_forms_shard(df_shard):
+    """[워커] VOC유형 검증 후 유효한 행의 폼 데이터 생성 -> (유효하지 않은 인덱스, 오류 항목, 폼 데이터)"""
+    s = _worker_state
+    report = _CollectingReport()
+    with contextlib.redirect_stdout(io.StringIO()):
+        invalid_indexes = validate_voc_type_only(df_shard, s['voc_type_map'], report)
+        valid_shard = df_shard.drop(index=list(invalid_indexes))
+        forms = set_qry_params(
+            valid_shard, s['voc_type_map'], s['voc_recv_map'], s['voc_service_map'], s['insa_info_map']
+        )
+    return invalid_indexes, report.entries, forms
+
+
+class ShardedExecutor:
+    """
+    하나의 VOC DataFrame을 행 범위(샤드)로 나누어 검증~폼 생성 단계를 프로세스 풀에서 실행합니다.
+    매핑과 인사 정보는 워커 초기화 시 한 번만 전달되며,
+    샤드는 원본 인덱스를 유지하므로 Excel 행 번호가 그대로 보존되고 결과는 원래 순서대로 병합됩니다.
+
+    프로세스 풀은 처음 사용할 때 생성되어 close() (또는 with 블록 종료) 시까지 재사용됩니다.
+
+    사용 예:
+        with ShardedExecutor(4, required_fields, voc_type_map, voc_recv_map, voc_service_map, insa_info_map) as ex:
+            invalid_indexes = ex.validate(df_voc, report)
+    """
+    def __init__(self, workers, required_fields, voc_type_map, voc_recv_map, voc_service_map, insa_info_map):
+        self.workers = max(1, workers or os.cpu_count() or 1)
+        self._init_args = (required_fields, voc_type_map, voc_recv_map, voc_service_map, insa_info_map)
+        self._pool = None
+
+    def __enter__(self):
+        return self
+
+    def __exit__(self, exc_type, exc, tb):
+        self.close()
+
+    def _get_pool(self):
+        if self._pool is None:
+            self._pool = ProcessPoolExecutor(
+                max_workers=self.workers, initializer=_init_worker, initargs=self._init_args
+            )
+        return self._pool
+
+    def close(self):
+        if self._pool is not None:
+            self._pool.shutdown(wait=True)
+            self._pool = None
+
+    def _shards(self, df):
+        if df.empty:
+            return []
+        shard_size = max(SHARD_MIN_ROWS, math.ceil(len(df) / (self.workers * 4)))
+        return [df.iloc[start:start + shard_size] for start in range(0, len(df), shard_size)]
+
+    def validate(self, df, report: ValidationReport) -> set:
+        """validate_voc_data의 샤드 병렬 버전. 오류는 원래 행 순서대로 report에 병합됩니다."""
+        print(f"📋 VOC 데이터 유효성 검증 시작 (프로세스 {self.workers}개 병렬)")
+        invalid_indexes = set()
+        for shard_invalid, entries in self._get_pool().map(_validate_shard, self._shards(df)):
+            invalid_indexes |= shard_invalid
+            report.add_entries(entries)
+        report.print_summary()
+        print("\n📋 VOC 데이터 유효성 검증 완료")
+        return invalid_indexes
+
+    def build_forms(self, df, report: ValidationReport) -> tuple[set, list]:
+        """
+        validate_voc_type_only + set_qry_params의 샤드 병렬 버전.
+
+        Returns:
+            (유효하지 않은 VOC유형 행 인덱스, 유효한 행의 폼 데이터 리스트 - 원래 행 순서)
+        """
+        print(f"\n📋 VOC유형 검증 및 폼 데이터 생성 시작 (프로세스 {self.workers}개 병렬)")
+        invalid_indexes = set()
+        form_data_list = []
+        for shard_invalid, entries, forms in self._get_pool().map(_build_forms_shard, self._shards(df)):
+            invalid_indexes |= shard_invalid
+            report.add_entries(entries)
+            form_data_list.extend(forms)
+        if invalid_indexes:
+            print(f"\n❗ VOC유형 누락/유효하지 않음: {len(invalid_indexes)}건")
+        else:
+            print("\n✅ 모든 VOC유형이 유효합니다")
+        return invalid_indexes, form_data_list
@@ -0,0 +1,368 @@
+# src/stream_pipeline.py
+import contextlib
+import queue
+import threading
+import time
+import traceback
+
+import pandas as pd
+
+from src.config.config import STREAM_QUEUE_SIZE, STREAM_CHUNK_ROWS
+from src.valid_voc_data import validate_voc_type_only
+from src.validation_report import MISSING_VOC_TYPE, INVALID_VOC_TYPE, FORM_CONSTRAINT
+from src.dedup_voc import VOC_KEY_COLUMN, VocKeyReservation, append_registered_voc_keys, excel_row_numbers
+from src.insert_voc import set_qry_params, send_voc_record
+from src.resilience import CircuitOpenError
+from src.sharded_pipeline import ShardedExecutor
+from src.profiler import NullProfiler
+from src.form_constraints import latest_form_constraints, check_form_records
+from src.voc_pipeline import REQUIRED_FIELDS, VocResources, validate_and_dedup
+from src.ai.gemini_api import VocTypeInference, row_texts
+from src.ai.inference_log import InferenceAuditLog
+from src.ai.inference_scheduler import order_by_request_date, print_inference_plan, defer_rows
+
+_DONE = object() # 상위 단계가 끝났음을 알리는 표식
+
+
+class _Aborted(Exception):
+    """다른 단계에서 오류가 발생하여 파이프라인을 중단할 때 사용"""
+
+
+class MonitoredQueue(queue.Queue):
+    """
+    크기가 제한된 단계 간 큐. 가득 차면 상위 단계가 기다리며(backpressure),
+    최대/평균 대기 건수를 기록합니다. 다른 단계가 실패하면 대기 중인 put/get을 중단합니다.
+    """
+    def __init__(self, name, maxsize, abort: threading.Event):
+        super().__init__(maxsize)
+        self.name = name
+        self.abort = abort
+        self.max_depth = 0
+        self._depth_sum = 0
+        self._samples = 0
+
+    def put(self, item, block=True, timeout=None):
+        while True:
+            try:
+                super().put(item, timeout=0.2)
+                break
+            except queue.Full:
+                if self.abort.is_set():
+                    raise _Aborted()
+        depth = self.qsize()
+        self.max_depth = max(self.max_depth, depth)
+        self._depth_sum += depth
+        self._samples += 1
+
+    def get(self, block=True, timeout=None):
+        while True:
+            try:
+                return super().get(timeout=0.2)
+            except queue.Empty:
+                if self.abort.is_set():
+                    raise _Aborted()
+
+    @property
+    def avg_depth(self) -> float:
+        return self._depth_sum / self._samples if self._samples else 0.0
+
+
+class StageStats:
+    """단계별 처리 건수와 작업 시간(하위 큐가 가득 차 기다린 시간은 blocked로 따로 집계)"""
+    def __init__(self, name):
+        self.name = name
+        self.items = 0
+        self.busy = 0.0
+        self.blocked = 0.0
+
+    def put(self, q: MonitoredQueue, item):
+        started = time.perf_counter()
+        q.put(item)
+        self.blocked += time.perf_counter() - started
+
+
+class StreamPipeline:
+    """
+    중복 검사까지 끝난 VOC 행을 단계별 스레드로 동시에 처리합니다.
+
+        dispatch ──(유형 있음)──────────────┐
+            └──(유형 없음)──▶ inference ──▶ forms ──▶ submit
+
+    - VOC유형이 이미 있는 행은 추론 단계를 거치지 않고 바로 폼 생성/전송으로 넘어갑니다.
+    - 유형이 없는 행은 시작할 때 전체 기준으로 유사 VOC 군집을 묶어, 대표 행만 호출하고 결과를 군집 전체에 반영합니다.
+    - 요청일시가 오래된 행부터 처리하며, Gemini 할당량이 부족해 추론하지 못한 행은 대기열에 저장하고 전송하지 않습니다.
+    - 각 단계는 크기가 STREAM_QUEUE_SIZE인 큐로 연결되어, 하위 단계가 느리면 상위 단계가 기다립니다.
+    - 전체 소요 시간은 가장 느린 단계(보통 Gemini 또는 전송)에 가까워집니다.
+    """
+    def __init__(self, resources: VocResources, run_summary, active_session, validation_report,
+                 queue_size=STREAM_QUEUE_SIZE, chunk_rows=STREAM_CHUNK_ROWS, model=None, profiler=None):
+        self.r = resources
+        self.profiler = profiler or NullProfiler()
+        self.model = model # None이면 config의 GEMINI_MODEL
+        self.run_summary = run_summary
+        self.active_session = active_session
+        self._session_lock = threading.Lock()
+        self._session_ready = False
+        self._session_value = None
+        self.validation_report = validation_report
+        self.chunk_rows = max(1, chunk_rows)
+        self.abort = threading.Event()
+        self.infer_q = MonitoredQueue("inference", queue_size, self.abort)
+        self.form_q = MonitoredQueue("forms", queue_size, self.abort)
+        self.submit_q = MonitoredQueue("submit", queue_size, self.abort)
+        self.stats = {name: StageStats(name) for name in ("dispatch", "inference", "forms", "submit")}
+        self.errors = []
+        self.sent_keys = []
+        self.total_forms = 0
+        self.audit = None # run()에서 생성하는 추론 감사 로그
+        self.inference = None # run()에서 생성하는 추론 공통 처리 (VocTypeInference)
+        self.deferred = [] # 할당량 부족으로 추론하지 못한 1행 DataFrame 목록
+
+    def _session(self):
+        """
+        로그인 및 VOC 페이지 요청이 끝난 세션. 처음 호출한 단계(폼 생성 또는 전송)에서 한 번만 로그인합니다.
+        로그인하며 VOC 화면 폼 제약 캐시가 갱신되므로, 폼 생성 단계는 폼 제약 확인 전에 이 함수를 호출합니다.
+        """
+        with self._session_lock:
+            if not self._session_ready:
+                self._session_value = self.active_session() if callable(self.active_session) else self.active_session
+                self._session_ready = True
+            return self._session_value
+
+    # ---------- 단계 ----------
+    def _dispatch(self, df_voc):
+        st = self.stats["dispatch"]
+        if 'VOC유형' not in df_voc.columns:
+            df_voc['VOC유형'] = None
+        # 🗓️ 요청일시가 오래된 행부터 처리
+        df_voc = order_by_request_date(df_voc)
+        inference = self.inference
+        # ♻️ 내용이 같은 행의 이전 예측은 호출 없이 재사용하고, 🧩 남은 행은 전체 기준으로 유사 VOC 군집을 구성
+        untyped_all = df_voc[df_voc['VOC유형'].isna()]
+        reused = inference.reuse(untyped_all)
+        for idx, (predicted_type, _, _) in reused.items():
+            df_voc.at[idx, 'VOC유형'] = predicted_type
+        untyped_all = untyped_all.drop(index=list(reused))
+        clusters = inference.cluster(untyped_all)
+        if clusters:
+            # 추론 대상 군집(호출) 건수 기준 예상 소요 시간 출력
+            print_inference_plan(len(clusters), inference.estimate_tokens(untyped_all.loc[clusters[0][0]]))
+        for start in range(0, len(df_voc), self.chunk_rows):
+            t0 = time.perf_counter()
+            chunk = df_voc.iloc[start:start + self.chunk_rows]
+            untyped_mask = chunk['VOC유형'].isna()
+            typed = chunk[~untyped_mask]
+            # 대표 행이 있는 묶음에서 군집 전체를 함께 보냄 (대표 행은 군집에서 요청일시가 가장 오래된 행)
+            members = [member for idx in chunk[untyped_mask].index
+                       for member in inference.cluster_members.get(idx, [])]
+            st.items += len(chunk)
+            if not typed.empty:
+                st.put(self.form_q, typed)
+            if members:
+                st.put(self.infer_q, untyped_all.loc[members].copy())
+            st.busy += time.perf_counter() - t0
+        st.put(self.infer_q, _DONE)
+        st.put(self.form_q, _DONE)
+
+    def _infer(self):
+        st = self.stats["inference"]
+        inference = self.inference
+        retry_rows = [] # (대표 행 idx, VOC내용, 조치계획)
+        retry_dfs = {} # 대표 행 idx -> 재시도 대상 군집 DataFrame
+
+        while True:
+            chunk = self.infer_q.get()
+            if chunk is _DONE:
+                break
+            t0 = time.perf_counter()
+            for idx in chunk.index:
+                if idx not in inference.cluster_members:
+                    continue # 군집 대표 행만 호출
+                members = inference.cluster_members[idx]
+                cluster_df = chunk.loc[members].copy()
+                st.items += len(members)
+                if inference.rate_limited:
+                    # 호출 제한 이후 행은 대기열로 (다음 실행에서 이어서 추론)
+                    self.deferred.append(cluster_df)
+                    continue
+                voc_content, voc_action = row_texts(chunk.loc[idx])
+                try:
+                    prediction = inference.classify_row(idx, voc_content, voc_action)
+                except RuntimeError: # 기다릴 수 없는 호출 제한(RateLimitExceeded) 또는 회로 차단(CircuitOpenError)
+                    self.deferred.append(cluster_df)
+                    continue
+                if prediction:
+                    cluster_df['VOC유형'] = prediction[0] # 같은 군집의 모든 행에 반영
+                    st.put(self.form_q, cluster_df)
+                else:
+                    retry_rows.append((idx, voc_content, voc_action))
+                    retry_dfs[idx] = cluster_df
+            st.busy += time.perf_counter() - t0
+
+        # 🔁 재시도 대상은 입력이 끝난 뒤 묶어서 한 번 더 분류
+        t0 = time.perf_counter()
+        for batch_idx, accepted in inference.retry(retry_rows):
+            for idx in batch_idx:
+                cluster_df = retry_dfs[idx]
+                if idx in accepted:
+                    cluster_df['VOC유형'] = accepted[idx][0]
+                elif inference.rate_limited:
+                    self.deferred.append(cluster_df) # 호출 제한으로 재시도하지 못한 행은 대기열로
+                    continue
+                st.put(self.form_q, cluster_df)
+        st.busy += time.perf_counter() - t0
+        st.put(self.form_q, _DONE)
+
+    def _build_forms(self):
+        st = self.stats["forms"]
+        r = self.r
+        producers_left = 2 # dispatch, inference
+        invalid_count = 0
+        form_invalid_count = 0
+        constraints = None
+        while producers_left:
+            chunk = self.form_q.get()
+            if chunk is _DONE:
+                producers_left -= 1
+                continue
+            t0 = time.perf_counter()
+            st.items += len(chunk)
+            invalid = validate_voc_type_only(chunk, r.voc_type_map, self.validation_report, verbose=False)
+            invalid_count += len(invalid)
+            valid = chunk.drop(index=list(invalid))
+            if not valid.empty:
+                forms = set_qry_params(valid, r.voc_type_map, r.voc_recv_map, r.voc_service_map, r.insa_info_map)
+                if constraints is None:
+                    # 📝 첫 레코드가 준비되면 로그인하여 갱신된 VOC 화면 폼 제약으로 확인 (그동안 앞 단계는 계속 진행)
+                    self._session()
+                    constraints = latest_form_constraints()
+                invalid_forms = check_form_records(forms, self.validation_report, constraints,
+                                                   excel_row_numbers(valid).tolist())
+                form_invalid_count += len(invalid_forms)
+                for pos, (key, form) in enumerate(zip(valid[VOC_KEY_COLUMN], forms)):
+                    if pos not in invalid_forms:
+                        st.put(self.submit_q, (key, form))
+            st.busy += time.perf_counter() - t0
+        self.run_summary.add("VOC유형 검증 제외", invalid_count)
+        self.run_summary.add("폼 제약 위반 제외", form_invalid_count)
+        st.put(self.submit_q, _DONE)
+
+    def _submit(self):
+        st = self.stats["submit"]
+        session = None
+        stopped = None # 전송 중단 사유 (세션 없음 / 회로 차단)
+        failed = 0
+        while True:
+            item = self.submit_q.get()
+            if item is _DONE:
+                break
+            key, form = item
+            t0 = time.perf_counter()
+            st.items += 1
+            self.total_forms += 1
+            if stopped is None and session is None:
+                session = self._session() # 보통 폼 생성 단계에서 이미 로그인됨
+                if session is None:
+                    stopped = "❌ 로그인된 세션이 없어 전송하지 않습니다."
+                    print(stopped)
+            if stopped is None:
+                try:
+                    if send_voc_record(form, session, f"레코드 {self.total_forms}"):
+                        self.sent_keys.append(key)
+                    else:
+                        failed += 1
+                except CircuitOpenError as e:
+                    stopped = f"{e}"
+                    print(f"{e}\n❗ 이후 레코드는 전송하지 않습니다.")
+                    failed += 1
+            else:
+                failed += 1
+            st.busy += time.perf_counter() - t0
+        self.run_summary.add("전송 성공", len(self.sent_keys))
+        self.run_summary.add("전송 실패", failed)
+
+    # ---------- 실행 ----------
+    def _run_profiled_stage(self, name, target, *args):
+        """단계 스레드 안에서 단계별 프로파일을 기록합니다. (--profile, CPU 프로파일 방식은 StageProfiler.concurrent 참고)"""
+        with self.profiler.stage(name):
+            self._run_stage(target, *args)
+
+    def _run_stage(self, target, *args):
+        try:
+            target(*args)
+        except _Aborted:
+            pass
+        except Exception as e:
+            self.errors.append(e)
+            traceback.print_exc()
+            self.abort.set()
+
+    def run(self, df_voc) -> bool:
+        print(f"\n🌊 스트림 처리 시작: {len(df_voc)}건 (큐 크기 {self.infer_q.maxsize}, 묶음 {self.chunk_rows}행)")
+        started = time.perf_counter()
+        self.audit = InferenceAuditLog()
+        self.inference = VocTypeInference(self.r.voc_type_map.keys(), self.audit, self.model)
+        threads = [
+            threading.Thread(target=self._run_profiled_stage, args=("dispatch", self._dispatch, df_voc), name="voc-dispatch"),
+            threading.Thread(target=self._run_profiled_stage, args=("inference", self._infer), name="voc-inference"),
+            threading.Thread(target=self._run_profiled_stage, args=("forms", self._build_forms), name="voc-forms"),
+            threading.Thread(target=self._run_profiled_stage, args=("submit", self._submit), name="voc-submit"),
+        ]
+        with self.profiler.concurrent("stream"):
+            for t in threads:
+                t.start()
+            for t in threads:
+                t.join()
+        elapsed = time.perf_counter() - started
+
+        # 🗓️ 할당량 부족으로 추론하지 못한 행은 대기열에 저장 (다음 실행에서 할당량이 생기면 이어서 처리)
+        if self.deferred:
+            deferred = pd.concat(self.deferred)
+            self.audit.write(f"할당량 부족으로 {len(deferred)}건을 대기열에 저장",
+                             deferred_excel_rows=[self.inference.excel_row(idx) for idx in deferred.index])
+            self.run_summary.add("추론 보류(할당량)", defer_rows(deferred, "Gemini 호출 할당량 부족"))
+        self.audit.close()
+        # 📁 전송 성공 건은 이력 인덱스에 기록하여 다음 실행에서 중복으로 제외
+        append_registered_voc_keys(self.sent_keys)
+        self.print_stats(elapsed)
+        return not self.errors and len(self.sent_keys) == self.total_forms
+
+    def print_stats(self, elapsed):
+        print(f"\n📈 스트림 단계 통계 (전체 {elapsed:.2f}초)")
+        for st in self.stats.values():
+            utilization = (st.busy - st.blocked) / elapsed * 100 if elapsed else 0.0
+            print(f" - {st.name}: {st.items}건, 작업 {st.busy - st.blocked:.2f}초 (가동률 {utilization:.0f}%), 하위 큐 대기 {st.blocked:.2f}초")
+        for q in (self.infer_q, self.form_q, self.submit_q):
+            print(f" - 큐 {q.name}: 최대 {q.max_depth}건, 평균 {q.avg_depth:.1f}건 대기")
+
+
+def process_voc_dataframe_streaming(df_voc, resources: VocResources, db_repo, run_summary,
+                                    active_session, workers: int = 1, profiler=None, model=None) -> bool:
+    """
+    process_voc_dataframe의 스트림 버전 (main.py --stream).
+    검증/중복 검사는 먼저 한 번에 수행하고, 이후 유형 추론 -> 유형 검증/폼 생성 -> 전송은 단계별 스레드로 겹쳐 실행합니다.
+    VOC유형이 없는 행은 Gemini로 추론합니다. (유사 VOC는 전체 행 기준으로 군집을 묶어 대표 행만 호출)
+    model을 지정하면 config의 GEMINI_MODEL 대신 사용합니다. (부하 테스트용 가짜 모델 등)
+
+    Returns:
+        bool: 전송 대상 레코드가 모두 전송되었으면 True
+    """
+    profiler = profiler or NullProfiler()
+    sharded = None
+    if workers != 1:
+        sharded = ShardedExecutor(workers, REQUIRED_FIELDS, resources.voc_type_map, resources.voc_recv_map,
+                                  resources.voc_service_map, resources.insa_info_map)
+    # 🔒 중복 검사를 통과한 행은 전송이 끝날 때까지 예약 (데몬 모드에서 같은 행이 든 파일을 동시에 처리해도 한 번만 전송)
+    # 샤드 프로세스 풀은 단계가 끝나면 바로 닫고, 도중에 오류가 나도 with 블록을 벗어날 때 닫힘
+    with VocKeyReservation() as reservation, sharded or contextlib.nullcontext():
+        with profiler.stage("validation"):
+            df_voc, validation_report = validate_and_dedup(df_voc, resources, db_repo, run_summary, sharded, reservation)
+        if sharded:
+            sharded.close()
+
+        # ⏱️ 프로파일은 단계 스레드마다 기록 (CPU 프로파일은 Python 3.12 이상에서 stream 구간 하나로 저장, StageProfiler.concurrent 참고)
+        pipeline = StreamPipeline(resources, run_summary, active_session, validation_report, model=model, profiler=profiler)
+        ok = pipeline.run(df_voc)
+        validation_report.print_summary([MISSING_VOC_TYPE, INVALID_VOC_TYPE, FORM_CONSTRAINT])
+        validation_report.close()
+    return ok
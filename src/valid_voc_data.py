@@ -4,6 +4,16 @@ import os # 파일 경로 등을 다룰 때 필요할 수 있으므로 유지
 from src.config.config import (
     VOC_TYPE_KEY, VOC_RECV_TYPE_KEY, VOC_SERVICE_KEY, VOC_TYPE_VALUE, VOC_RECV_VALUE, VOC_SERVICE_VALUE
     )
+from src.validation_report import (
+    ValidationReport,
+    MISSING_FIELD, INVALID_RECV_TYPE, INVALID_SERVICE, INVALID_VOC_TYPE, UNKNOWN_REQUESTER, MISSING_VOC_TYPE,
+    INVALID_DATE
+    )
+from src.date_parser import parse_datetime_column
+from src.dedup_voc import excel_row_numbers
+
+# 날짜 형식 검증 대상 컬럼
+DATETIME_FIELDS = ['요청일시/등록일시', '완료일시']
 
 # 유효성 검증을 위한 VOC 코드 매핑 : CSV 파일을 로딩하여 '이름 → 코드' 딕셔너리로 반환
 def load_voc_code_mappings(voc_type_path, voc_recv_path, voc_service_path):
@@ -31,26 +41,42 @@ def load_voc_code_mappings(voc_type_path, voc_recv_path, voc_service_path):
         print(f"❌ 매핑 로딩 중 예상치 못한 오류 발생: {e}")
         raise
 
-def validate_voc_data(df, required_fields, recv_type_map, service_map, voc_type_map, insa_info_map):
-    """VOC 데이터에 대한 필수항목 및 코드 매핑 유효성 검증 (단일 루프 + 유효하지 않은 인덱스 반환)"""
+def validate_voc_data(df, required_fields, recv_type_map, service_map, voc_type_map, insa_info_map, report=None):
+    """
+    VOC 데이터에 대한 필수항목 및 코드 매핑 유효성 검증 (단일 루프 + 유효하지 않은 인덱스 반환)
+
+    오류는 행 단위로 출력하지 않고 ValidationReport(CSV)에 기록하며,
+    콘솔에는 오류 유형별 건수와 일부 예시만 출력합니다.
+    report를 넘기지 않으면 이 함수 안에서 생성하고 닫습니다.
+    """
     print("📋 VOC 데이터 유효성 검증 시작")
 
-    null_errors = []
-    code_errors = []
-    insa_name_errors = []  # 인사 정보 불일치 에러 저장
+    own_report = report is None
+    report = report or ValidationReport()
     invalid_indexes = set()
 
     # insa_info_map에서 유효한 hname(한글 이름)들을 set으로 미리 준비
     valid_insa_hnames = {info['hname'] for info in insa_info_map if 'hname' in info}
 
+    # 날짜 컬럼은 컬럼 단위로 한 번에 파싱하여, 값이 있지만 해석할 수 없는 행을 미리 찾음
+    invalid_date_fields = {}
+    for col in DATETIME_FIELDS:
+        if col in df.columns:
+            _, invalid_mask = parse_datetime_column(df[col])
+            for idx in df.index[invalid_mask]:
+                invalid_date_fields.setdefault(idx, []).append(col)
+
+    excel_rows = excel_row_numbers(df) # 추론 대기열에서 다시 불러온 행도 원본 Excel 행 번호 유지
     for idx, row in df.iterrows():
-        excel_row = idx + 2  # Excel 기준 행 번호
-        row_errors = []
+        excel_row = excel_rows[idx]  # Excel 기준 행 번호
+        row_invalid = False
 
         # 1. 필수값 누락 체크
-        missing_fields = [col for col in required_fields if pd.isna(row.get(col, '')) or (isinstance(row.get(col, ''), str) and not row.get(col, '').strip())]
-        if missing_fields:
-            row_errors.append(f"누락된 필드 -> {', '.join(missing_fields)}")
+        for col in required_fields:
+            value = row.get(col, '')
+            if pd.isna(value) or (isinstance(value, str) and not value.strip()):
+                report.add(excel_row, col, MISSING_FIELD, f"누락된 필드 -> {col}")
+                row_invalid = True
 
         # 2. 코드 유효성 검사
         recv_type = row.get('접수유형')
@@ -59,98 +85,93 @@ def validate_voc_data(df, required_fields, recv_type_map, service_map, voc_type_
         제기자 = row.get('제기자')
 
         if pd.notna(recv_type) and recv_type not in recv_type_map:
-            row_errors.append(f"접수유형 '{recv_type}'이(가) 유효하지 않음")
+            report.add(excel_row, '접수유형', INVALID_RECV_TYPE, f"접수유형 '{recv_type}'이(가) 유효하지 않음", recv_type)
+            row_invalid = True
 
         if pd.notna(service_type) and service_type not in service_map:
-            row_errors.append(f"소분류 '{service_type}'이(가) 유효하지 않음")
+            report.add(excel_row, '소분류', INVALID_SERVICE, f"소분류 '{service_type}'이(가) 유효하지 않음", service_type)
+            row_invalid = True
 
         # voc_type은 NaN인 경우 OK, 값이 있는데 voc_type_map에 없으면 오류
         if pd.notna(voc_type) and voc_type not in voc_type_map:
-            row_errors.append(f"VOC유형 '{voc_type}'이(가) 유효하지 않음")
+            report.add(excel_row, 'VOC유형', INVALID_VOC_TYPE, f"VOC유형 '{voc_type}'이(가) 유효하지 않음", voc_type)
+            row_invalid = True
 
         # 3. 제기자 인사 정보 일치 여부 검사
         if pd.notna(제기자) and 제기자 not in valid_insa_hnames:
-            row_errors.append(f"제기자 '{제기자}'이(가) 인사 정보에 없음")
+            report.add(excel_row, '제기자', UNKNOWN_REQUESTER, f"제기자 '{제기자}'이(가) 인사 정보에 없음", 제기자)
+            row_invalid = True
+
+        # 4. 날짜 형식 검사
+        for col in invalid_date_fields.get(idx, []):
+            report.add(excel_row, col, INVALID_DATE, f"{col} '{row.get(col)}'의 날짜 형식을 해석할 수 없음", row.get(col))
+            row_invalid = True
 
-        # 에러 저장
-        if row_errors:
+        if row_invalid:
             invalid_indexes.add(idx)
-            if any('누락된' in e for e in row_errors):
-                null_errors.append((excel_row, [e for e in row_errors if '누락된' in e]))
-            if any("유효하지 않음" in e for e in row_errors):
-                code_errors.append((excel_row, [e for e in row_errors if '유효하지 않음' in e]))
-            if any("인사 정보에 없음" in e for e in row_errors):
-                insa_name_errors.append((excel_row, [e for e in row_errors if '인사 정보에 없음' in e]))
-
-    # 결과 출력
-    if null_errors:
-        print("\n❗ 필수 항목 누락:")
-        for row_num, issues in null_errors:
-            print(f" - Excel 행 {row_num}: {'; '.join(issues)}")
-    else:
-        print("\n✅ 모든 행에 필수 항목이 입력되었습니다.")
 
-    if code_errors:
-        print("\n❗ 코드 매핑 유효성 오류:")
-        for row_num, issues in code_errors:
-            print(f" - Excel 행 {row_num}: {'; '.join(issues)}")
-    else:
+    # 결과 출력 (오류 유형별 건수 + 예시)
+    report.print_summary([MISSING_FIELD, INVALID_RECV_TYPE, INVALID_SERVICE, INVALID_VOC_TYPE, UNKNOWN_REQUESTER, INVALID_DATE])
+    if not report.counts[MISSING_FIELD]:
+        print("\n✅ 모든 행에 필수 항목이 입력되었습니다.")
+    if not (report.counts[INVALID_RECV_TYPE] or report.counts[INVALID_SERVICE] or report.counts[INVALID_VOC_TYPE]):
         print("\n✅ 접수유형, 소분류 및 VOC유형 코드 모두 유효합니다.")
-
-    if insa_name_errors:
-        print("\n❗ 제기자 인사 정보 불일치 오류:")
-        # `insa_ofname_errors`는 정의되지 않았으므로 `insa_name_errors`를 사용
-        for row_num, issues in insa_name_errors:
-            print(f" - Excel 행 {row_num}: {'; '.join(issues)}")
-    else:
+    if not report.counts[UNKNOWN_REQUESTER]:
         print("\n✅ 모든 제기자가 인사 정보에 존재합니다.")
+    if not report.counts[INVALID_DATE]:
+        print("\n✅ 모든 날짜 값의 형식이 유효합니다.")
+    if own_report:
+        report.close()
 
     print("\n📋 VOC 데이터 유효성 검증 완료")
     
     return invalid_indexes
 
-def validate_voc_type_only(df, voc_type_map):
+def validate_voc_type_only(df, voc_type_map, report=None, verbose=True):
     """
     VOC유형 컬럼만 대상으로 null 또는 유효하지 않은 값을 검사.
     - null: 입력되지 않음
     - 유효하지 않음: voc_type_map에 정의되지 않은 값
+    - verbose가 False이면 콘솔 출력 없이 report에만 기록 (스트림 모드에서 작은 묶음 단위로 호출할 때 사용)
 
     Returns:
         invalid_indexes: 유효하지 않은 VOC유형을 가진 행의 DataFrame 인덱스 집합
     """
-    print("\n📋 VOC유형 컬럼 유효성 검증 시작")
-    null_errors = []
-    invalid_errors = []
+    log = print if verbose else (lambda *args, **kwargs: None)
+    log("\n📋 VOC유형 컬럼 유효성 검증 시작")
+    own_report = report is None
+    report = report or ValidationReport()
+    missing_before = report.counts[MISSING_VOC_TYPE]
+    invalid_before = report.counts[INVALID_VOC_TYPE]
     invalid_indexes = set()
 
     valid_types = set(voc_type_map.keys())
 
+    excel_rows = excel_row_numbers(df) # 추론 대기열에서 다시 불러온 행도 원본 Excel 행 번호 유지
     for idx, row in df.iterrows():
-        excel_row = idx + 2  # Excel 기준 행 번호
+        excel_row = excel_rows[idx]  # Excel 기준 행 번호
         voc_type = row.get('VOC유형')
 
         if pd.isna(voc_type) or (isinstance(voc_type, str) and not voc_type.strip()):
-            null_errors.append(f" - Excel 행 {excel_row}: VOC유형이 입력되지 않음")
+            report.add(excel_row, 'VOC유형', MISSING_VOC_TYPE, "VOC유형이 입력되지 않음")
             invalid_indexes.add(idx)
         elif voc_type not in valid_types:
-            invalid_errors.append(f" - Excel 행 {excel_row}: VOC유형 '{voc_type}'이(가) 유효하지 않음")
+            report.add(excel_row, 'VOC유형', INVALID_VOC_TYPE, f"VOC유형 '{voc_type}'이(가) 유효하지 않음", voc_type)
             invalid_indexes.add(idx)
 
-    if null_errors:
-        print("\n❗ VOC유형 누락:")
-        for e in null_errors:
-            print(e)
+    if report.counts[MISSING_VOC_TYPE] > missing_before:
+        log(f"\n❗ VOC유형 누락: {report.counts[MISSING_VOC_TYPE] - missing_before}건")
     else:
-        print("\n✅ VOC유형 누락 없음")
+        log("\n✅ VOC유형 누락 없음")
 
-    if invalid_errors:
-        print("\n❗ VOC유형 유효하지 않음:")
-        for e in invalid_errors:
-            print(e)
+    if report.counts[INVALID_VOC_TYPE] > invalid_before:
+        log(f"\n❗ VOC유형 유효하지 않음: {report.counts[INVALID_VOC_TYPE] - invalid_before}건")
     else:
-        print("\n✅ 모든 VOC유형이 유효합니다")
+        log("\n✅ 모든 VOC유형이 유효합니다")
+    if own_report:
+        report.close()
 
-    print("\n📋 VOC유형 유효성 검증 완료")
+    log("\n📋 VOC유형 유효성 검증 완료")
     return invalid_indexes
 
 # ✅ 유효한 행만 남기기
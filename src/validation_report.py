@@ -0,0 +1,108 @@
+# src/validation_report.py
+import csv
+import os
+from collections import Counter
+
+from src.config.config import VALIDATION_REPORT_DIR, VALIDATION_MAX_EXAMPLES
+from src.log_paths import unique_log_path
+
+# 오류 코드
+MISSING_FIELD = 'MISSING_FIELD'            # 필수 항목 누락
+INVALID_RECV_TYPE = 'INVALID_RECV_TYPE'    # 접수유형 코드 매핑 없음
+INVALID_SERVICE = 'INVALID_SERVICE'        # 소분류 코드 매핑 없음
+INVALID_VOC_TYPE = 'INVALID_VOC_TYPE'      # VOC유형 코드 매핑 없음
+UNKNOWN_REQUESTER = 'UNKNOWN_REQUESTER'    # 제기자가 인사 정보에 없음
+INVALID_DATE = 'INVALID_DATE'              # 날짜/시간 형식 해석 불가
+MISSING_VOC_TYPE = 'MISSING_VOC_TYPE'      # (추론 이후) VOC유형 누락
+FORM_CONSTRAINT = 'FORM_CONSTRAINT'        # VOC 화면 폼 제약(최대 길이, 선택 값) 위반
+
+ERROR_LABELS = {
+    MISSING_FIELD: '필수 항목 누락',
+    INVALID_RECV_TYPE: '접수유형 유효하지 않음',
+    INVALID_SERVICE: '소분류 유효하지 않음',
+    INVALID_VOC_TYPE: 'VOC유형 유효하지 않음',
+    UNKNOWN_REQUESTER: '제기자 인사 정보 불일치',
+    INVALID_DATE: '날짜 형식 오류',
+    MISSING_VOC_TYPE: 'VOC유형 누락',
+    FORM_CONSTRAINT: '폼 제약 위반',
+}
+
+REPORT_COLUMNS = ['excel_row', 'field', 'error_code', 'value', 'message']
+
+
+class ValidationReport:
+    """
+    유효성 검증 오류를 행 단위로 콘솔에 출력하는 대신 CSV 파일로 기록하는 클래스입니다.
+    파일은 버퍼링된 writer로 첫 오류가 기록될 때 생성되며,
+    콘솔에는 오류 코드별 건수와 코드별 처음 max_examples개의 예시만 출력합니다.
+    """
+    def __init__(self, report_dir=VALIDATION_REPORT_DIR, max_examples=VALIDATION_MAX_EXAMPLES):
+        self.report_dir = report_dir
+        self.max_examples = max_examples
+        # 데몬 모드에서 동시에 처리하는 파일끼리 리포트가 겹치지 않도록 실행마다 고유한 파일명 사용
+        self.path = unique_log_path(report_dir, "voc_validation", "csv")
+        self.counts = Counter()
+        self.examples = {}
+        self._file = None
+        self._writer = None
+
+    def _open(self):
+        os.makedirs(self.report_dir, exist_ok=True)
+        # utf-8-sig: Excel에서 바로 열어도 한글이 깨지지 않도록 BOM 포함
+        self._file = open(self.path, "w", encoding="utf-8-sig", newline="", buffering=1 << 20)
+        self._writer = csv.writer(self._file)
+        self._writer.writerow(REPORT_COLUMNS)
+
+    def add(self, excel_row, field, error_code, message, value=''):
+        """
+        오류 한 건을 기록합니다.
+
+        Args:
+            excel_row (int): Excel 기준 행 번호
+            field (str): 오류가 발생한 컬럼명
+            error_code (str): 오류 코드 (예: MISSING_FIELD)
+            message (str): 사람이 읽을 수 있는 오류 설명
+            value: 원본 값 (선택)
+        """
+        if self._writer is None:
+            self._open()
+        value = '' if value is None else value
+        self._writer.writerow([excel_row, field, error_code, value, message])
+        self.counts[error_code] += 1
+        examples = self.examples.setdefault(error_code, [])
+        if len(examples) < self.max_examples:
+            examples.append(f"Excel 행 {excel_row}: {message}")
+
+    def add_entries(self, entries):
+        """다른 곳에서 수집된 (excel_row, field, error_code, message, value) 튜플들을 순서대로 기록합니다."""
+        for entry in entries:
+            self.add(*entry)
+
+    def print_summary(self, error_codes=None):
+        """
+        오류 코드별 건수와 예시를 출력합니다.
+
+        Args:
+            error_codes (Iterable[str], optional): 지정하면 해당 오류 코드만 출력
+        """
+        codes = [c for c in (error_codes or self.counts) if self.counts.get(c)]
+        if not codes:
+            return
+        for code in codes:
+            examples = self.examples.get(code, [])
+            print(f"\n❗ {ERROR_LABELS.get(code, code)} ({code}): {self.counts[code]}건")
+            for example in examples:
+                print(f" - {example}")
+            if self.counts[code] > len(examples):
+                print(f" - ... 외 {self.counts[code] - len(examples)}건")
+
+    def total(self) -> int:
+        return sum(self.counts.values())
+
+    def close(self):
+        """버퍼를 비우고 파일을 닫습니다. 기록된 오류가 있으면 파일 경로를 출력합니다."""
+        if self._file is not None:
+            self._file.close()
+            self._file = None
+            self._writer = None
+            print(f"📁 유효성 검증 오류 {self.total()}건의 상세 내역은 '{self.path}'에 저장되었습니다.")
@@ -0,0 +1,266 @@
+# src/voc_daemon.py
+import os
+import shutil
+import threading
+import time
+import traceback
+from concurrent.futures import ThreadPoolExecutor
+
+from src.config.config import (
+    VOC_ARCHIVE_DIR, VOC_FAILED_DIR, DAEMON_MAX_CONCURRENT_FILES,
+    DAEMON_POLL_INTERVAL, DAEMON_STABLE_SECONDS, DAEMON_SESSION_MAX_AGE, GEMINI_SCHEDULER_MAX_WAIT
+)
+from src.auth import AuthService
+from src.run_summary import RunSummary
+from src.resilience import add_resilience_stats
+from src.ai.model_tiers import add_tier_stats, print_tier_stats
+from src.ai.inference_scheduler import PendingInferenceQueue
+from src.session_manager import SessionManager
+from src.voc_pipeline import is_voc_file, load_voc_file, process_voc_dataframe
+from src.stream_pipeline import process_voc_dataframe_streaming
+
+try:
+    # watchdog이 설치되어 있으면 inotify 등 OS 파일 이벤트를 사용하고, 없으면 폴링만 사용
+    from watchdog.observers import Observer
+    from watchdog.events import FileSystemEventHandler
+except ImportError:
+    Observer = None
+    FileSystemEventHandler = object
+
+
+class _WakeHandler(FileSystemEventHandler):
+    """파일 이벤트가 오면 감시 루프를 즉시 깨우는 핸들러"""
+    def __init__(self, wake_event: threading.Event):
+        self.wake_event = wake_event
+
+    def on_any_event(self, event):
+        self.wake_event.set()
+
+
+class _WorkerSession:
+    """
+    작업 스레드별 로그인 세션. 로그인은 처음 필요할 때 한 번 수행하고,
+    DAEMON_SESSION_MAX_AGE가 지나면 다시 로그인합니다.
+    """
+    def __init__(self, session_manager: SessionManager):
+        self.session_manager = session_manager
+        self.auth_service = None
+        self.session = None
+        self.logged_in_at = 0
+
+    def get(self):
+        if self.session is not None and time.monotonic() - self.logged_in_at < DAEMON_SESSION_MAX_AGE:
+            return self.session
+        if self.auth_service is None:
+            self.auth_service = AuthService(self.session_manager.create_session())
+        self.session = self.auth_service.login_and_fetch_voc_page()
+        self.logged_in_at = time.monotonic()
+        return self.session
+
+    def invalidate(self):
+        self.session = None
+
+
+class VocDaemon:
+    """
+    데이터 폴더를 감시하다가 새로 들어오거나 변경된 VOC 파일을 처리하는 상주 실행 모드입니다.
+
+    - 인사 정보/코드 매핑(resources)과 DB 저장소, 로그인 세션은 계속 유지하여 파일마다 다시 불러오지 않습니다.
+    - 파일 크기와 수정 시각이 DAEMON_STABLE_SECONDS 동안 바뀌지 않아야(복사 완료) 처리합니다.
+    - 동시에 최대 max_concurrent개의 파일만 처리하며, 처리 후 성공 파일은 archive, 실패 파일은 failed 폴더로 옮깁니다.
+    - Gemini 할당량 부족으로 추론 대기열에 넘어간 행은 할당량이 다시 생기면(다음 분/다음 날) 자동으로 이어서 처리합니다.
+    """
+    def __init__(self, watch_dir, resources, db_repo, max_concurrent=DAEMON_MAX_CONCURRENT_FILES,
+                 archive_dir=VOC_ARCHIVE_DIR, failed_dir=VOC_FAILED_DIR, workers: int = 1, stream: bool = False):
+        self.watch_dir = watch_dir
+        self.resources = resources
+        self.db_repo = db_repo
+        self.max_concurrent = max(1, max_concurrent)
+        self.archive_dir = archive_dir
+        self.failed_dir = failed_dir
+        self.workers = workers
+        self.process = process_voc_dataframe_streaming if stream else process_voc_dataframe
+        self.run_summary = RunSummary()
+        self._summary_lock = threading.Lock()
+        self._session_manager = SessionManager()
+        self._thread_local = threading.local()
+        self._in_flight = set()
+        self._in_flight_lock = threading.Lock()
+        self._seen = {}  # 경로 -> (크기, 수정 시각, 처음 관찰된 시각)
+        self._wake = threading.Event()
+        self._stop = threading.Event()
+        self._pending_queue = PendingInferenceQueue()
+        self._pending_next_try = 0.0 # 추론 대기열을 다시 확인할 시각 (monotonic)
+
+    def stop(self):
+        self._stop.set()
+        self._wake.set()
+
+    def _scan(self) -> list[str]:
+        """크기/수정 시각이 안정된(복사가 끝난) 처리 대기 파일 목록을 반환합니다."""
+        now = time.monotonic()
+        ready = []
+        current = set()
+        try:
+            entries = list(os.scandir(self.watch_dir))
+        except FileNotFoundError:
+            return []
+        for entry in entries:
+            if not entry.is_file() or not is_voc_file(entry.name):
+                continue
+            path = entry.path
+            current.add(path)
+            try:
+                st = entry.stat()
+            except FileNotFoundError:
+                continue
+            signature = (st.st_size, st.st_mtime_ns)
+            prev = self._seen.get(path)
+            if prev is None or prev[:2] != signature:
+                self._seen[path] = (*signature, now)
+                continue
+            with self._in_flight_lock:
+                busy = path in self._in_flight
+            if not busy and now - prev[2] >= DAEMON_STABLE_SECONDS:
+                ready.append(path)
+        # 사라진 파일은 추적 목록에서 제거
+        for path in list(self._seen):
+            if path not in current:
+                self._seen.pop(path, None)
+        return sorted(ready, key=lambda p: self._seen[p][2])
+
+    def _worker_session(self) -> _WorkerSession:
+        ws = getattr(self._thread_local, 'session', None)
+        if ws is None:
+            ws = _WorkerSession(self._session_manager)
+            self._thread_local.session = ws
+        return ws
+
+    def _move(self, path, target_dir) -> str:
+        os.makedirs(target_dir, exist_ok=True)
+        base, ext = os.path.splitext(os.path.basename(path))
+        target = os.path.join(target_dir, f"{base}_{time.strftime('%Y%m%d_%H%M%S')}{ext}")
+        shutil.move(path, target)
+        return target
+
+    def _process_file(self, path):
+        print(f"\n📥 [데몬] 파일 처리 시작: {path}")
+        file_summary = RunSummary()
+        ok = False
+        error = None
+        try:
+            df_voc = load_voc_file(path)
+            ws = self._worker_session()
+            ok = self.process(
+                df_voc, self.resources, self.db_repo, file_summary, ws.get, workers=self.workers
+            )
+            if not ok:
+                # 전송 실패가 있으면 세션 만료 가능성이 있으므로 다음 파일에서 다시 로그인
+                ws.invalidate()
+        except Exception as e:
+            error = e
+            traceback.print_exc()
+        finally:
+            try:
+                if ok:
+                    target = self._move(path, self.archive_dir)
+                    print(f"📦 [데몬] 처리 완료, 보관 폴더로 이동: {target}")
+                else:
+                    target = self._move(path, self.failed_dir)
+                    if error is not None:
+                        with open(f"{target}.error.txt", "w", encoding="utf-8") as f:
+                            f.write(f"{type(error).__name__}: {error}\n")
+                    print(f"❗ [데몬] 처리 실패, 실패 폴더로 이동: {target}")
+            except OSError as e:
+                print(f"❌ [데몬] 처리된 파일 이동 실패 ({path}): {e}")
+            with self._in_flight_lock:
+                self._in_flight.discard(path)
+                self._seen.pop(path, None)
+            with self._summary_lock:
+                for key, count in file_summary.as_dict().items():
+                    self.run_summary.add(key, count)
+                self.run_summary.add("처리 파일(성공)" if ok else "처리 파일(실패)")
+            file_summary.print_summary()
+
+    def _take_pending(self):
+        """처리 중인 대기열 작업이 없고 Gemini 할당량이 생겼으면 추론 대기열의 행을 꺼냅니다."""
+        now = time.monotonic()
+        if now < self._pending_next_try:
+            return None
+        with self._in_flight_lock:
+            if self._pending_queue.path in self._in_flight or len(self._in_flight) >= self.max_concurrent:
+                return None
+            df_pending = self._pending_queue.take()
+            if df_pending is None:
+                return None
+            self._in_flight.add(self._pending_queue.path)
+        # 회로 차단 등으로 곧바로 다시 미뤄지는 경우 매 주기 반복하지 않도록 간격을 둠
+        self._pending_next_try = now + GEMINI_SCHEDULER_MAX_WAIT
+        return df_pending
+
+    def _process_pending(self, df_pending):
+        print(f"\n🗓️ [데몬] 추론 대기열 {len(df_pending)}건 처리 시작")
+        pending_summary = RunSummary()
+        try:
+            ws = self._worker_session()
+            if not process_voc_dataframe_streaming(
+                df_pending, self.resources, self.db_repo, pending_summary, ws.get, workers=self.workers
+            ):
+                ws.invalidate()
+        except Exception:
+            traceback.print_exc()
+            print("❗ [데몬] 추론 대기열 처리 실패, 대기열에 다시 저장합니다.")
+            self._pending_queue.release()
+        else:
+            self._pending_queue.complete()
+        finally:
+            with self._in_flight_lock:
+                self._in_flight.discard(self._pending_queue.path)
+            with self._summary_lock:
+                for key, count in pending_summary.as_dict().items():
+                    self.run_summary.add(key, count)
+                self.run_summary.add("추론 대기열 처리")
+            pending_summary.print_summary()
+
+    def run(self):
+        """Ctrl+C(또는 stop())까지 폴더를 감시하며 파일을 처리합니다."""
+        os.makedirs(self.watch_dir, exist_ok=True)
+        observer = None
+        if Observer is not None:
+            observer = Observer()
+            observer.schedule(_WakeHandler(self._wake), self.watch_dir, recursive=False)
+            observer.start()
+            print(f"👀 [데몬] '{self.watch_dir}' 감시 시작 (파일 이벤트 + {DAEMON_POLL_INTERVAL}초 폴링, 동시 처리 {self.max_concurrent}개)")
+        else:
+            print(f"👀 [데몬] '{self.watch_dir}' 감시 시작 ({DAEMON_POLL_INTERVAL}초 폴링, 동시 처리 {self.max_concurrent}개)")
+
+        executor = ThreadPoolExecutor(max_workers=self.max_concurrent, thread_name_prefix="voc-daemon")
+        try:
+            while not self._stop.is_set():
+                for path in self._scan():
+                    with self._in_flight_lock:
+                        if path in self._in_flight or len(self._in_flight) >= self.max_concurrent:
+                            continue
+                        self._in_flight.add(path)
+                    executor.submit(self._process_file, path)
+                # 🗓️ 할당량이 생기면 추론 대기열의 행을 이어서 처리
+                df_pending = self._take_pending()
+                if df_pending is not None:
+                    executor.submit(self._process_pending, df_pending)
+                # 파일 이벤트가 오면 즉시, 아니면 폴링 주기마다 다시 스캔
+                # (안정화 대기 중인 파일이 있으면 짧게 대기)
+                timeout = min(DAEMON_POLL_INTERVAL, DAEMON_STABLE_SECONDS) if self._seen else DAEMON_POLL_INTERVAL
+                self._wake.wait(timeout)
+                self._wake.clear()
+        except KeyboardInterrupt:
+            print("\n🛑 [데몬] 종료 요청을 받았습니다. 처리 중인 파일을 마무리합니다...")
+        finally:
+            if observer is not None:
+                observer.stop()
+                observer.join()
+            executor.shutdown(wait=True)
+            self._session_manager.close_all_sessions()
+            add_resilience_stats(self.run_summary)
+            add_tier_stats(self.run_summary)
+            print_tier_stats()
+            self.run_summary.print_summary()
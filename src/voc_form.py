@@ -0,0 +1,86 @@
+# src/voc_form.py
+from urllib.parse import urlencode
+
+# 모든 행에서 동일한 폼 필드 (빈 VOC 번호, 등록자/작업자 정보, 실패 시간, 수정일시)
+CONSTANT_FIELDS = (
+    "voc_no", "voc_date", "voc_seq",
+    "register_empno", "register_empnm", "register_deptcd", "register_deptnm",
+    "register_office_phone", "register_mobile_phone",
+    "work_empno", "work_empnm", "work_deptcd", "work_deptnm",
+    "work_office_phone", "work_mobile_phone",
+    "fail_minute", "update_date",
+)
+
+# 행마다 달라지는 폼 필드 (insert_date는 request_date와 같은 값이므로 저장하지 않음)
+ROW_FIELDS = (
+    "service_cd", "receive_cd", "voc_cd",
+    "request_empno", "request_empnm", "request_deptcd", "request_deptnm",
+    "request_office_phone", "request_mobile_phone",
+    "work_yn", "work_status", "work_minute",
+    "request_date", "finish_date",
+    "voc_contents", "work_contents",
+)
+
+FORM_CONTENT_TYPE = "application/x-www-form-urlencoded"
+
+
+def _encode(pairs) -> str:
+    # requests와 동일하게 None 값 필드는 전송하지 않음
+    return urlencode([(k, v) for k, v in pairs if v is not None])
+
+
+class VocFormTemplate:
+    """
+    모든 폼 레코드가 공유하는 상수 필드와, 미리 URL 인코딩해 둔 상수 부분을 보관합니다.
+    """
+    __slots__ = ("fields", "encoded")
+
+    def __init__(self, fields: dict):
+        self.fields = {k: fields.get(k, "") for k in CONSTANT_FIELDS}
+        self.encoded = _encode(self.fields.items())
+
+
+class VocFormRecord:
+    """
+    VOC 등록 폼 한 건. 행마다 다른 필드만 슬롯에 저장하고 상수 필드는 공유 템플릿을 참조합니다.
+    요청 본문(URL 인코딩 문자열)은 to_body() 호출 시점에 생성됩니다.
+    기존 딕셔너리처럼 record['voc_contents'] 형태로도 읽을 수 있습니다.
+    """
+    __slots__ = ROW_FIELDS + ("template",)
+
+    def __init__(self, template: VocFormTemplate, **row_fields):
+        self.template = template
+        for name in ROW_FIELDS:
+            setattr(self, name, row_fields.get(name, ""))
+
+    def __getitem__(self, key):
+        if key == "insert_date":
+            return self.request_date
+        if key in ROW_FIELDS:
+            return getattr(self, key)
+        return self.template.fields[key]
+
+    def get(self, key, default=None):
+        try:
+            return self[key]
+        except KeyError:
+            return default
+
+    def row_items(self):
+        for name in ROW_FIELDS:
+            yield name, getattr(self, name)
+        yield "insert_date", self.request_date
+
+    def to_dict(self) -> dict:
+        """상수 필드와 행 필드를 합친 전체 폼 딕셔너리 (디버깅/호환용)"""
+        return {**self.template.fields, **dict(self.row_items())}
+
+    def to_body(self) -> str:
+        """POST 요청 본문. 미리 인코딩된 상수 부분 뒤에 행 필드만 인코딩하여 붙입니다."""
+        row_encoded = _encode(self.row_items())
+        if not self.template.encoded:
+            return row_encoded
+        return f"{self.template.encoded}&{row_encoded}" if row_encoded else self.template.encoded
+
+    def __repr__(self):
+        return f"VocFormRecord({self.to_dict()!r})"
@@ -0,0 +1,220 @@
+# src/voc_pipeline.py
+import contextlib
+import os
+
+import pandas as pd
+
+from src.valid_voc_data import (
+    load_voc_code_mappings,
+    validate_voc_data,
+    validate_voc_type_only,
+    filter_valid_voc_rows
+)
+from src.config.config import (
+    VOC_TYPE_FILE_PATH, VOC_RECV_TYPE_FILE_PATH, VOC_SERVICE_FILE_PATH,
+    VOC_DEDUP_CHECK_DB
+)
+from src.dedup_voc import (
+    VOC_KEY_COLUMN,
+    add_excel_row_numbers,
+    excel_row_numbers,
+    drop_duplicate_voc_rows,
+    load_registered_voc_keys,
+    load_registered_voc_keys_from_db,
+    append_registered_voc_keys,
+    VocKeyReservation
+)
+from src.validation_report import ValidationReport, FORM_CONSTRAINT
+from src.sharded_pipeline import ShardedExecutor
+from src.insert_voc import set_qry_params, send_voc_data_to_api
+from src.ai.gemini_api import infer_voc_type_with_gemini
+from src.profiler import NullProfiler
+from src.form_constraints import check_form_records
+from src.excel_reader import EXCEL_EXTENSIONS, is_excel_file, read_voc_workbook
+
+# ✅ 필수 필드 정의
+REQUIRED_FIELDS = [
+    '제기자', '접수유형', '소분류',
+    '요청일시/등록일시', '완료일시', '작업시간', 'VOC내용'
+]
+
+# ✅ 파이프라인에서 사용하는 전체 컬럼 (Excel 파일은 이 컬럼만 읽음)
+VOC_COLUMNS = REQUIRED_FIELDS + ['VOC유형', '조치계획 및 진행상황', '조치가능여부', '조치여부']
+
+# ✅ 처리 가능한 VOC 파일 확장자
+VOC_FILE_EXTENSIONS = ('.csv',) + EXCEL_EXTENSIONS
+
+
+class VocResources:
+    """
+    실행 동안 변하지 않는 읽기 전용 자료(인사 정보, 코드 매핑)를 묶어 두는 클래스입니다.
+    데몬 모드에서는 한 번 불러와서 모든 파일 처리에 재사용합니다.
+    """
+    def __init__(self, insa_info_map, voc_type_map, voc_recv_map, voc_service_map):
+        self.insa_info_map = insa_info_map
+        self.voc_type_map = voc_type_map
+        self.voc_recv_map = voc_recv_map
+        self.voc_service_map = voc_service_map
+
+
+def load_resources(db_repo) -> VocResources | None:
+    """
+    인사 정보와 VOC 코드 매핑을 불러옵니다. 실패 시 None을 반환합니다.
+    """
+    # 📋 인사 정보 조회
+    insa_info_map = db_repo.get_insa_info()
+    if not insa_info_map:
+        print("❌ 인사 정보를 불러오지 못했습니다.")
+        return None
+
+    # 🔄 코드 매핑 로딩
+    try:
+        voc_type_map, voc_recv_map, voc_service_map = load_voc_code_mappings(
+            VOC_TYPE_FILE_PATH,
+            VOC_RECV_TYPE_FILE_PATH,
+            VOC_SERVICE_FILE_PATH
+        )
+    except Exception as e:
+        print(f"❌ 코드 매핑 로딩 실패: {e}")
+        return None
+
+    return VocResources(insa_info_map, voc_type_map, voc_recv_map, voc_service_map)
+
+
+def is_voc_file(file_name) -> bool:
+    """처리 대상 VOC 파일인지 확인합니다. (Excel이 열려 있을 때 생기는 '~$' 잠금 파일은 제외)"""
+    base_name = os.path.basename(file_name)
+    return base_name.lower().endswith(VOC_FILE_EXTENSIONS) and not base_name.startswith('~$')
+
+
+def load_voc_file(voc_data_file_path):
+    """VOC 데이터 파일(CSV 또는 Excel)을 DataFrame으로 불러옵니다."""
+    if is_excel_file(voc_data_file_path):
+        return read_voc_workbook(voc_data_file_path, VOC_COLUMNS)
+    return pd.read_csv(voc_data_file_path)
+
+
+def validate_and_dedup(df_voc, resources: VocResources, db_repo, run_summary, sharded=None,
+                       reservation: VocKeyReservation | None = None):
+    """
+    유효성 검증 후 유효하지 않은 행과 중복 행(파일 내 중복, 기존 등록 건)을 제외합니다.
+    reservation을 주면 남은 행의 키를 예약하여, 동시에 처리 중인 다른 파일의 같은 행은 중복으로 제외되게 합니다.
+
+    Returns:
+        tuple: (남은 행 DataFrame - 인덱스 reset됨, 이후 VOC유형 검증에도 사용할 ValidationReport)
+    """
+    r = resources
+    # 행을 제외하면 인덱스가 reset되므로 원본 Excel 행 번호를 컬럼으로 보관
+    df_voc = add_excel_row_numbers(df_voc)
+    # 🔍 데이터 검증 (오류 상세 내역은 validation_report 파일에 기록)
+    validation_report = ValidationReport()
+    if sharded:
+        invalid_indexes = sharded.validate(df_voc, validation_report)
+    else:
+        invalid_indexes = validate_voc_data(df_voc, REQUIRED_FIELDS, r.voc_recv_map, r.voc_service_map, r.voc_type_map, r.insa_info_map, validation_report)
+
+    # ❗ 유효하지 않은 행 건수 출력
+    if invalid_indexes:
+        print(f"\n❗ 유효하지 않은 행 {len(invalid_indexes)}건을 제외합니다. (상세 내역: '{validation_report.path}')")
+    else:
+        print("\n✅ 모든 VOC 행이 유효합니다.")
+
+    run_summary.add("전체 행", len(df_voc))
+    run_summary.add("유효성 검증 제외", len(invalid_indexes))
+
+    # ✅ 유효한 행만 남기기
+    df_voc = filter_valid_voc_rows(df_voc, invalid_indexes)
+
+    # 🔁 중복 검사 (파일 내 중복 및 기존 등록 건 제외)
+    registered_keys = set()
+    if VOC_DEDUP_CHECK_DB:
+        registered_keys = load_registered_voc_keys_from_db(db_repo, df_voc)
+    if reservation is not None:
+        # 이력 인덱스는 예약과 같은 잠금 안에서 다시 읽음 (동시에 처리 중인 파일의 전송/예약 반영)
+        df_voc, dedup_stats = reservation.claim(df_voc, registered_keys)
+    else:
+        df_voc, dedup_stats = drop_duplicate_voc_rows(df_voc, load_registered_voc_keys() | registered_keys)
+    run_summary.add("중복 제외(파일 내)", dedup_stats['in_file'])
+    run_summary.add("중복 제외(기존 등록)", dedup_stats['registered'])
+
+    return df_voc, validation_report
+
+
+def process_voc_dataframe(df_voc, resources: VocResources, db_repo, run_summary,
+                          active_session, workers: int = 1, profiler=None) -> bool:
+    """
+    VOC DataFrame 하나를 검증 -> 중복 검사 -> (유형 추론) -> 유형 검증 -> 폼 생성 -> 전송까지 처리합니다.
+
+    Args:
+        df_voc (pd.DataFrame): 불러온 VOC 데이터
+        resources (VocResources): 인사 정보 및 코드 매핑
+        db_repo (Repository): 기존 등록 건 조회에 사용할 저장소
+        run_summary (RunSummary): 단계별 건수를 기록할 실행 요약
+        active_session: 로그인 및 VOC 페이지 요청이 완료된 세션, 또는 폼 생성 직후 세션을 반환하는 함수
+        workers (int): 검증~폼 생성 단계 프로세스 수 (1이면 단일 프로세스)
+        profiler (StageProfiler): 단계별 프로파일 기록 (--profile 모드, 없으면 기록하지 않음)
+
+    Returns:
+        bool: 전송 대상 레코드가 모두 전송되었으면 True
+    """
+    r = resources
+    profiler = profiler or NullProfiler()
+
+    # ⚙️ 샤드 병렬 실행 (workers 1이면 기존 단일 프로세스 방식)
+    sharded = None
+    if workers != 1:
+        sharded = ShardedExecutor(workers, REQUIRED_FIELDS, r.voc_type_map, r.voc_recv_map, r.voc_service_map, r.insa_info_map)
+
+    # 🔒 중복 검사를 통과한 행은 전송이 끝날 때까지 예약 (데몬 모드에서 같은 행이 든 파일을 동시에 처리해도 한 번만 전송)
+    # 샤드 프로세스 풀은 단계가 끝나면 바로 닫고, 도중에 오류가 나도 with 블록을 벗어날 때 닫힘
+    with VocKeyReservation() as reservation, sharded or contextlib.nullcontext():
+        with profiler.stage("validation"):
+            df_voc, validation_report = validate_and_dedup(df_voc, resources, db_repo, run_summary, sharded, reservation)
+
+        # 🔍 VOC유형 추론 (Gemini API 사용, 필요시 주석 해제 - 스트림 모드는 추론 단계 스레드에서 'inference' 단계로 기록)
+        # with profiler.stage("inference"):
+        #     df_voc = infer_voc_type_with_gemini(df_voc, r.voc_type_map)
+
+        with profiler.stage("forms"):
+            if sharded:
+                # ❗ VOC유형 검증 + 📊 폼 데이터 추출을 샤드별로 함께 수행
+                invalid_voc_type_indexes, voc_form_data_list = sharded.build_forms(df_voc, validation_report)
+                sharded.close()
+                df_voc = filter_valid_voc_rows(df_voc, invalid_voc_type_indexes)
+            else:
+                # ❗ VOC유형만 검증 (추론 이후 VOC 유형 코드가 유효한지 확인)
+                invalid_voc_type_indexes = validate_voc_type_only(df_voc, r.voc_type_map, validation_report)
+                df_voc = filter_valid_voc_rows(df_voc, invalid_voc_type_indexes)
+
+                # 📊 API 전송을 위한 폼 데이터 추출
+                voc_form_data_list = set_qry_params(df_voc, r.voc_type_map, r.voc_recv_map, r.voc_service_map, r.insa_info_map)
+        run_summary.add("VOC유형 검증 제외", len(invalid_voc_type_indexes))
+        print(f"\n✅ 입력 준비 완료된 VOC 목록: {len(voc_form_data_list)}건")
+
+        with profiler.stage("submission"):
+            # 웹 로그인 및 VOC 페이지 요청이 끝난 세션으로 전송
+            if callable(active_session):
+                active_session = active_session()
+
+            # 📝 로그인 시 갱신된 VOC 화면 폼 제약으로 전송 전 확인 (서버에서 거부될 레코드는 보내지 않음)
+            invalid_form_indexes = check_form_records(voc_form_data_list, validation_report,
+                                                      excel_rows=excel_row_numbers(df_voc).tolist())
+            validation_report.print_summary([FORM_CONSTRAINT])
+            validation_report.close()
+            if invalid_form_indexes:
+                voc_form_data_list = [f for i, f in enumerate(voc_form_data_list) if i not in invalid_form_indexes]
+                df_voc = filter_valid_voc_rows(df_voc, invalid_form_indexes)
+            run_summary.add("폼 제약 위반 제외", len(invalid_form_indexes))
+
+            if active_session is None and voc_form_data_list:
+                print("❌ 로그인된 세션이 없어 전송하지 않습니다.")
+                run_summary.add("전송 실패", len(voc_form_data_list))
+                return False
+            sent_indexes = send_voc_data_to_api(voc_form_data_list, active_session)
+            run_summary.add("전송 성공", len(sent_indexes))
+            run_summary.add("전송 실패", len(voc_form_data_list) - len(sent_indexes))
+
+            # 📁 전송 성공 건은 이력 인덱스에 기록하여 다음 실행에서 중복으로 제외
+            append_registered_voc_keys(df_voc[VOC_KEY_COLUMN].iloc[sent_indexes].tolist())
+
+        return len(sent_indexes) == len(voc_form_data_list)
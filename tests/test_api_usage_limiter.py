@@ -0,0 +1,25 @@
+import datetime
+from zoneinfo import ZoneInfo
+
+import pytest
+
+pytest.importorskip("google.generativeai")  # src.config.config가 genai를 불러옴
+
+from src.ai import api_usage_limiter
+
+
+@pytest.mark.parametrize("now, expected_utc", [
+    # 태평양 서머타임(UTC-7): 한국 시간 16시에 초기화
+    ("2025-07-01 10:00", "2025-07-02 07:00"),
+    # 태평양 표준시(UTC-8): 한국 시간 17시에 초기화
+    ("2025-12-01 23:59", "2025-12-02 08:00"),
+])
+def test_rpd_resets_at_pacific_midnight(monkeypatch, now, expected_utc):
+    """일일 사용량(RPD) 초기화 시각은 로컬 0시가 아니라 GEMINI_QUOTA_RESET_TZ(태평양 시간) 0시여야 합니다."""
+    tz = ZoneInfo("America/Los_Angeles")
+    fixed_now = datetime.datetime.strptime(now, "%Y-%m-%d %H:%M").replace(tzinfo=tz)
+    monkeypatch.setattr(api_usage_limiter, "_quota_now", lambda: fixed_now)
+
+    reset_at = datetime.datetime.fromtimestamp(api_usage_limiter.next_quota_reset(), datetime.timezone.utc)
+
+    assert reset_at.strftime("%Y-%m-%d %H:%M") == expected_utc
@@ -0,0 +1,28 @@
+import pandas as pd
+import pytest
+
+pytest.importorskip("google.generativeai")  # src.config.config가 genai를 불러옴
+
+from src.dedup_voc import VOC_KEY_COLUMN, add_voc_keys, build_voc_key
+from src.insert_voc import to_voc_html
+
+
+@pytest.mark.parametrize("voc_content", [
+    "메일 발송 오류",
+    "A&B 시스템 접속 불가",
+    "조건이 a < b > c 일 때 오류",
+    "<첨부> 파일이 열리지 않음",
+    "화면에 &amp; 가 그대로 표시됨",
+])
+def test_stored_voc_key_matches_file_row_key(voc_content):
+    """이스케이프하여 저장한 VOC내용으로 만든 DB 키가 원본 파일 행의 키와 같아야 합니다."""
+    df_voc = add_voc_keys(pd.DataFrame({
+        '제기자': ["홍길동"],
+        '요청일시/등록일시': ["2025-08-01 10:00"],
+        'VOC내용': [voc_content],
+    }))
+
+    stored = to_voc_html(voc_content)
+    db_key = build_voc_key("홍길동", "2025-08-01 10:00:00", stored)
+
+    assert db_key == df_voc[VOC_KEY_COLUMN].iloc[0]
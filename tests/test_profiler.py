@@ -0,0 +1,57 @@
+import os
+import pstats
+import threading
+
+import pytest
+
+pytest.importorskip("google.generativeai")  # src.config.config가 genai를 불러옴
+
+from src.profiler import PROCESS_WIDE_CPROFILE, StageProfiler
+
+
+def _busy_stage_work():
+    return sum(i * i for i in range(50000))
+
+
+def _profiled_functions(prof_path) -> set:
+    return {func_name for (_, _, func_name) in pstats.Stats(prof_path).stats}
+
+
+def test_concurrent_stages_both_recorded(tmp_path):
+    """두 단계를 서로 다른 스레드에서 동시에 실행해도 두 단계 모두 시간/메모리/CPU 프로파일이 남아야 합니다."""
+    profiler = StageProfiler(profile_dir=str(tmp_path), top_n=5)
+    both_started = threading.Barrier(2)
+
+    def run_stage(name):
+        with profiler.stage(name):
+            both_started.wait(timeout=5)
+            _busy_stage_work()
+            both_started.wait(timeout=5)
+
+    with profiler.concurrent("stream"):
+        threads = [threading.Thread(target=run_stage, args=(name,)) for name in ("first", "second")]
+        for t in threads:
+            t.start()
+        for t in threads:
+            t.join()
+    profiler.close()
+
+    stages = {name: prof_path for name, _, _, _, prof_path in profiler.stages}
+    assert set(stages) == {"first", "second"}
+    files = os.listdir(profiler.path)
+    for name in stages:
+        assert any(f.endswith(f"_{name}_memory.txt") for f in files)
+
+    if PROCESS_WIDE_CPROFILE:
+        # 3.12 이상: 두 스레드가 하나의 프로세스 전체 프로파일에 기록됨
+        assert [name for name, _ in profiler.shared_profiles] == ["stream"]
+        assert "_busy_stage_work" in _profiled_functions(profiler.shared_profiles[0][1])
+    else:
+        # 3.11 이하: 단계 스레드마다 CPU 프로파일을 따로 저장
+        for prof_path in stages.values():
+            assert prof_path is not None
+            assert "_busy_stage_work" in _profiled_functions(prof_path)
+
+    with open(os.path.join(profiler.path, "summary.txt"), encoding="utf-8") as f:
+        summary = f.read()
+    assert "first" in summary and "second" in summary